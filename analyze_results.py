@@ -0,0 +1,256 @@
+import csv
+import glob
+import math
+import os
+import re
+import sys
+
+from harness import RESULT_COLUMNS, RESULTS_DIR
+
+# Modele wzrostu czasu z liczbą rekordów n, od najtańszego: t = a + b * f(n)
+GROWTH_MODELS = {
+    "n": lambda n: n,
+    "n log n": lambda n: n * math.log(n),
+    "n^2": lambda n: n * n,
+}
+# Model oczekiwany dla operacji - CRUD liniowo, zapytania złożone (sortowanie, joiny) n log n
+EXPECTED_MODELS = {"complex": "n log n"}
+DEFAULT_EXPECTED_MODEL = "n"
+# Scenariusz jest oznaczany, gdy najlepiej pasuje model gorszy od oczekiwanego
+# i wykładnik z dopasowania log-log przekracza ten próg (zabezpieczenie przed szumem)
+MAX_EXPONENT = 1.2
+# Minimalna liczba rozmiarów zbioru, od której dopasowujemy modele
+MIN_POINTS = 3
+# Regresja: czas gorszy od bazowego o więcej niż REGRESSION_THRESHOLD (ułamek)
+REGRESSION_THRESHOLD = 0.2
+# Scenariusze krótsze niż MIN_TIME sekund są pomijane w bramce regresji (dominuje szum)
+MIN_TIME = 0.01
+# Kod wyjścia, gdy któryś scenariusz zregresował względem bazowego przebiegu
+EXIT_REGRESSION = 1
+
+CURVE_COLUMNS = ["series", "operation", "entity", "records", "total_time", "fitted_time"]
+REPORT_COLUMNS = ["series", "operation", "entity", "points", "exponent", "best_model", "expected_model",
+                  "r2_n", "r2_n_log_n", "r2_n2", "flagged"]
+BASELINE_COLUMNS = ["series", "operation", "entity", "records", "total_time"]
+
+
+def series_name(path):
+    """Seria = nazwa pliku bez _results.csv (mongo4_without_indexes i mongo4 mają tę samą kolumnę database)"""
+    name = os.path.basename(path)[:-len(".csv")]
+    return name[:-len("_results")] if name.endswith("_results") else name
+
+
+def read_rows(path):
+    """Wiersze pliku wyników scenariuszy jako słowniki (pusta lista dla plików w innym formacie).
+
+    Wiersz o długości RESULT_COLUMNS czytany jest według RESULT_COLUMNS, nawet gdy plik ma
+    jeszcze stary, 6-kolumnowy nagłówek, a nowsze wiersze zostały do niego dopisane.
+    """
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    if not rows or rows[0][:6] != RESULT_COLUMNS[:6]:
+        return []
+    header = rows[0]
+    return [dict(zip(RESULT_COLUMNS if len(row) == len(RESULT_COLUMNS) else header, row)) for row in rows[1:]]
+
+
+def load_results(results_dir):
+    """Ostatnie wyniki z results/records_N/*.csv, osobno udane i nieudane.
+
+    Zwraca (curves, failures): curves to (seria, operacja, encja) -> {N: czas} z ostatniego
+    wiersza ze statusem ok (pusty status - wiersz sprzed kolumny status - też jest ok),
+    failures to (seria, operacja, encja) -> {N: status} tam, gdzie ostatni wiersz nie ma
+    statusu ok (przerwany albo nieudany ostatni przebieg).
+    """
+    curves, latest = {}, {}
+    for result_dir in glob.glob(os.path.join(results_dir, "records_*")):
+        match = re.fullmatch(r"records_(\d+)", os.path.basename(result_dir))
+        if not match or int(match.group(1)) == 0:
+            continue
+        records = int(match.group(1))
+        for path in sorted(glob.glob(os.path.join(result_dir, "*.csv"))):
+            for row in read_rows(path):
+                key = (series_name(path), row["operation"], row["entity"])
+                total_time = float(row["total_time"])
+                status = "error" if math.isnan(total_time) else row.get("status") or "ok"
+                latest[key, records] = status
+                if status == "ok":
+                    curves.setdefault(key, {})[records] = total_time
+
+    failures = {}
+    for (key, records), status in latest.items():
+        if status != "ok":
+            failures.setdefault(key, {})[records] = status
+    return curves, failures
+
+
+def fit_model(points, model):
+    """Najmniejsze kwadraty t = a + b * f(n); zwraca (a, b, R²) albo None, gdy b <= 0"""
+    xs = [GROWTH_MODELS[model](n) for n, _ in points]
+    ts = [t for _, t in points]
+    mean_x, mean_t = sum(xs) / len(xs), sum(ts) / len(ts)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        return None
+    b = sum((x - mean_x) * (t - mean_t) for x, t in zip(xs, ts)) / sxx
+    if b <= 0:
+        return None
+    a = mean_t - b * mean_x
+    sst = sum((t - mean_t) ** 2 for t in ts)
+    sse = sum((t - (a + b * x)) ** 2 for x, t in zip(xs, ts))
+    return a, b, 1 - sse / sst if sst else 1.0
+
+
+def growth_exponent(points):
+    """Nachylenie prostej w skali log-log: t ~ n^k (k=1 liniowo, k=2 kwadratowo)"""
+    logs = [(math.log(n), math.log(t)) for n, t in points if t > 0]
+    if len(logs) < 2:
+        return None
+    mean_x = sum(x for x, _ in logs) / len(logs)
+    mean_y = sum(y for _, y in logs) / len(logs)
+    sxx = sum((x - mean_x) ** 2 for x, _ in logs)
+    if sxx == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in logs) / sxx
+
+
+def analyze_curve(operation, curve, max_exponent):
+    points = sorted(curve.items())
+    fits = {model: fit_model(points, model) for model in GROWTH_MODELS}
+    valid = {model: fit for model, fit in fits.items() if fit is not None}
+    best = max(valid, key=lambda model: valid[model][2]) if valid else "const"
+    expected = EXPECTED_MODELS.get(operation, DEFAULT_EXPECTED_MODEL)
+    exponent = growth_exponent(points)
+    worse = best in GROWTH_MODELS and list(GROWTH_MODELS).index(best) > list(GROWTH_MODELS).index(expected)
+    return {
+        "points": points,
+        "fits": fits,
+        "best_model": best,
+        "expected_model": expected,
+        "exponent": exponent,
+        "flagged": worse and exponent is not None and exponent > max_exponent,
+    }
+
+
+def write_csv(path, columns, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def r2_value(fit):
+    return round(fit[2], 4) if fit else ""
+
+
+def write_scaling(results_dir, analyses):
+    """Krzywe skalowania (z czasem z najlepszego modelu) i podsumowanie dopasowań"""
+    curve_rows, report_rows = [], []
+    for (series, operation, entity), analysis in sorted(analyses.items()):
+        best_fit = analysis["fits"].get(analysis["best_model"])
+        for n, total_time in analysis["points"]:
+            fitted = best_fit[0] + best_fit[1] * GROWTH_MODELS[analysis["best_model"]](n) if best_fit else ""
+            curve_rows.append([series, operation, entity, n, total_time, round(fitted, 4) if best_fit else ""])
+        exponent = analysis["exponent"]
+        report_rows.append([
+            series, operation, entity, len(analysis["points"]),
+            round(exponent, 3) if exponent is not None else "",
+            analysis["best_model"], analysis["expected_model"],
+            r2_value(analysis["fits"]["n"]), r2_value(analysis["fits"]["n log n"]), r2_value(analysis["fits"]["n^2"]),
+            analysis["flagged"]
+        ])
+    write_csv(os.path.join(results_dir, "scaling_curves.csv"), CURVE_COLUMNS, curve_rows)
+    write_csv(os.path.join(results_dir, "scaling_report.csv"), REPORT_COLUMNS, report_rows)
+
+
+def save_baseline(path, curves):
+    write_csv(path, BASELINE_COLUMNS, [
+        [series, operation, entity, n, total_time]
+        for (series, operation, entity), curve in sorted(curves.items())
+        for n, total_time in sorted(curve.items())
+    ])
+
+
+def load_baseline(path):
+    with open(path, newline="") as f:
+        return {(row["series"], row["operation"], row["entity"], int(row["records"])): float(row["total_time"])
+                for row in csv.DictReader(f)}
+
+
+def find_regressions(curves, failures, baseline, threshold):
+    """Porównanie z bazowym przebiegiem: lista (klucz, N, bazowy czas, bieżący czas albo status, ratio).
+
+    Regresją jest scenariusz wolniejszy o więcej niż threshold, ale też scenariusz z bazowego
+    przebiegu, którego teraz brak albo który nie ma statusu ok - awaria nie może przejść bramki
+    jako przyspieszenie (ratio to wtedy None).
+    """
+    regressions = []
+    for (series, operation, entity, n), base_time in sorted(baseline.items()):
+        key = (series, operation, entity)
+        total_time = curves.get(key, {}).get(n)
+        if total_time is None or n in failures.get(key, {}):
+            regressions.append((key, n, base_time, failures.get(key, {}).get(n, "missing"), None))
+            continue
+        if max(base_time, total_time) < MIN_TIME or base_time <= 0:
+            continue
+        ratio = total_time / base_time
+        if ratio > 1 + threshold:
+            regressions.append((key, n, base_time, total_time, ratio))
+    return regressions
+
+
+def main(results_dir, baseline_path, save_baseline_path, threshold, max_exponent):
+    curves, failures = load_results(results_dir)
+    if not curves and not failures:
+        raise SystemExit(f"❌ Brak wyników w '{results_dir}/records_*/'")
+    print(f"🔄 Wczytano {len(curves)} scenariuszy z '{results_dir}' "
+          f"(pominięte wyniki bez statusu ok: {sum(len(points) for points in failures.values())})")
+
+    analyses = {key: analyze_curve(key[1], curve, max_exponent)
+                for key, curve in curves.items() if len(curve) >= MIN_POINTS}
+    write_scaling(results_dir, analyses)
+    flagged = [(key, analysis) for key, analysis in sorted(analyses.items()) if analysis["flagged"]]
+    print(f"📈 Dopasowano modele dla {len(analyses)} scenariuszy (co najmniej {MIN_POINTS} rozmiary zbioru)")
+    for (series, operation, entity), analysis in flagged:
+        print(f"⚠️ {series} {operation} {entity}: skaluje się jak {analysis['best_model']} "
+              f"(wykładnik {analysis['exponent']:.2f}, oczekiwano {analysis['expected_model']})")
+    if not flagged:
+        print("✅ Żaden scenariusz nie skaluje się gorzej niż oczekiwano")
+    print(f"✅ Krzywe i raport zapisane w '{results_dir}/scaling_curves.csv' i '{results_dir}/scaling_report.csv'")
+
+    if save_baseline_path:
+        save_baseline(save_baseline_path, curves)
+        print(f"💾 Bazowy przebieg zapisany w '{save_baseline_path}'")
+
+    if baseline_path:
+        regressions = find_regressions(curves, failures, load_baseline(baseline_path), threshold)
+        for (series, operation, entity), n, base_time, current, ratio in regressions:
+            if ratio is None:
+                print(f"❌ Regresja {series} {operation} {entity} (N={n}): {base_time:.4f} s -> {current}")
+            else:
+                print(f"❌ Regresja {series} {operation} {entity} (N={n}): "
+                      f"{base_time:.4f} s -> {current:.4f} s (x{ratio:.2f})")
+        if regressions:
+            print(f"❌ {len(regressions)} scenariuszy wolniejszych o ponad {threshold * 100:.0f}%, "
+                  f"brakujących albo nieudanych względem '{baseline_path}'")
+            sys.exit(EXIT_REGRESSION)
+        print(f"✅ Brak regresji względem '{baseline_path}' (próg {threshold * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Krzywe skalowania wyników i bramka regresji względem bazowego przebiegu")
+    parser.add_argument("--results-dir", default=RESULTS_DIR,
+                        help="Katalog z podkatalogami records_<N>")
+    parser.add_argument("--baseline", default=None,
+                        help="Plik CSV z bazowym przebiegiem - przy regresji kod wyjścia 1")
+    parser.add_argument("--save-baseline", default=None,
+                        help="Zapisuje bieżące wyniki jako bazowy przebieg do podanego pliku CSV")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="Dopuszczalne spowolnienie względem bazowego przebiegu (ułamek, 0.2 = 20%%)")
+    parser.add_argument("--max-exponent", type=float, default=MAX_EXPONENT,
+                        help="Wykładnik log-log, powyżej którego scenariusz gorszy od oczekiwanego jest oznaczany")
+    args = parser.parse_args()
+
+    main(args.results_dir, args.baseline, args.save_baseline, args.threshold, args.max_exponent)
@@ -0,0 +1,32 @@
+import asyncio
+import time
+
+import latency
+
+# Domyślna liczba zapytań utrzymywanych jednocześnie w locie
+ASYNC_IN_FLIGHT = 16
+
+
+async def measure_each_async(func, values, in_flight=ASYNC_IN_FLIGHT):
+    """Asynchroniczny odpowiednik latency.measure_each.
+
+    func(value) to korutyna wykonująca jedno zapytanie; semafor utrzymuje najwyżej
+    in_flight zapytań w locie. Błędy są liczone w histogram.errors, jak w measure_each.
+    Zwraca (czas całkowity w sekundach, histogram).
+    """
+    histogram = latency.LatencyHistogram()
+    semaphore = asyncio.Semaphore(in_flight)
+
+    async def run(value):
+        async with semaphore:
+            start = time.perf_counter_ns()
+            try:
+                await func(value)
+            except Exception as e:
+                histogram.record_error(e)
+                return
+            histogram.record(time.perf_counter_ns() - start)
+
+    start = time.perf_counter_ns()
+    await asyncio.gather(*(run(value) for value in values))
+    return latency.elapsed_or_nan(start, histogram), histogram
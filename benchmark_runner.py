@@ -2,10 +2,21 @@ import subprocess
 import time
 import os
 import sys
+from datetime import date
+from dataset_cache import cache_dir, verify_dataset
+from harness import EXIT_OVER_LIMIT
 
 MAX_DURATION_SECONDS = 20 * 60  # 20 minut
 count = 20000
 step = 20000
+SEED = 42  # stałe ziarno - te same zbiory danych są ponownie używane z cache
+GENERATOR_WORKERS = os.cpu_count() or 1
+GENERATOR_ENGINE = "faker"
+# Data odniesienia ustalana raz na przebieg - wznowienie innego dnia generuje nowe zbiory
+REFERENCE_DATE = date.today().isoformat()
+# Silniki uruchamiane przez harness.py w jednym procesie (dane wczytywane raz na krok)
+# ENGINES = ["mysql", "mariadb", "postgresql", "mongo", "sqlite"]
+ENGINES = ["mongo"]
 
 # Ścieżka do katalogu z venv
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -15,37 +26,40 @@ if not os.path.isfile(VENV_PYTHON):
     print("❌ Nie znaleziono pliku venv/bin/python3. Upewnij się, że venv jest poprawnie utworzony.")
     sys.exit(1)
 
-def run_command(cmd):
+def run_command(cmd, env=None):
     print(f"\n▶️  Running: {cmd}")
-    start = time.time()
-    result = subprocess.run(cmd, shell=False)
-    duration = time.time() - start
+    start = time.perf_counter_ns()
+    result = subprocess.run(cmd, shell=False, env=env)
+    duration = (time.perf_counter_ns() - start) / 1e9
     print(f"⏱  Finished in {round(duration / 60, 2)} minutes")
     return result.returncode, duration
 
 while True:
     print(f"\n🔁 Generating and testing for count = {count}")
 
-    # 1. Generowanie danych
-    code, gen_time = run_command([VENV_PYTHON, "generate_data.py", "--count", str(count)])
-    if code != 0:
-        print("❌ Data generation failed.")
-        break
-
-    # 2. Testy CRUD
-    durations = []
-    # for script in ["mysql_crud_test.py", "mariadb_crud_test.py", "postgresql_crud_test.py", "mongo_crud_test.py"]:
-    for script in ["mongo_crud_test.py"]:
-        code, duration = run_command([VENV_PYTHON, script])
-        durations.append(duration)
+    # 1. Generowanie danych (pomijane, jeśli zbiór jest już w cache)
+    data_dir = cache_dir(count, SEED, GENERATOR_ENGINE, REFERENCE_DATE)
+    if verify_dataset(data_dir, count=count, seed=SEED, engine=GENERATOR_ENGINE, reference_date=REFERENCE_DATE):
+        print(f"♻️  Using cached dataset from {data_dir}")
+    else:
+        code, gen_time = run_command([VENV_PYTHON, "generate_data.py", "--count", str(count), "--seed", str(SEED),
+                                      "--engine", GENERATOR_ENGINE, "--reference-date", REFERENCE_DATE,
+                                      "--workers", str(GENERATOR_WORKERS), "--output-dir", data_dir, "--columns"])
         if code != 0:
-            print(f"❌ Script {script} failed.")
+            print("❌ Data generation failed.")
             break
+    env = dict(os.environ, BENCH_DATA_DIR=data_dir)
+
+    # 2. Testy CRUD - wszystkie silniki w jednym procesie, zbiór danych wczytywany raz
+    code, duration = run_command([VENV_PYTHON, "harness.py", "--engines", *ENGINES,
+                                  "--max-duration", str(MAX_DURATION_SECONDS)], env=env)
 
     # 3. Czy którykolwiek test przekroczył limit?
-    if any(d >= MAX_DURATION_SECONDS for d in durations):
+    if code == EXIT_OVER_LIMIT:
         print("⛔ At least one test exceeded 20 minutes. Stopping loop.")
         break
+    if code != 0:
+        print("❌ Benchmark harness failed.")
 
     # 4. Zwiększ count i kontynuuj
     count += step
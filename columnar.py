@@ -0,0 +1,122 @@
+import csv
+import os
+from collections.abc import Sequence
+
+try:
+    import numpy as np
+except ImportError:  # bez numpy skrypty wczytują dane z CSV
+    np = None
+
+COLUMNS_DIR = "columns"
+# Wiersze materializowane naraz przy iteracji po tabeli i przy konwersji CSV -> .npy
+ITER_CHUNK_SIZE = 10000
+
+# Typy kolumn w formacie kolumnowym ("str" - napis o szerokości dopasowanej do danych).
+# Znaczniki czasu w mikrosekundach - faker zapisuje je z ułamkiem sekundy, a kolumny muszą
+# zawierać te same wartości co CSV ładowany przez COPY / LOAD DATA
+SCHEMA = {
+    "users": {"id": "int64", "first_name": "str", "last_name": "str", "email": "str",
+              "password": "str", "registration_date": "datetime64[us]"},
+    "products": {"id": "int64", "name": "str", "description": "str", "price": "float64", "stock": "int64"},
+    "orders": {"id": "int64", "user_id": "int64", "order_date": "datetime64[us]", "status": "str"},
+    "order_items": {"id": "int64", "order_id": "int64", "product_id": "int64", "quantity": "int64",
+                    "price": "float64"},
+    "reviews": {"id": "int64", "product_id": "int64", "user_id": "int64", "rating": "int64",
+                "comment": "str", "created_at": "datetime64[us]"},
+}
+
+
+def table_dir(data_dir, table):
+    return os.path.join(data_dir, COLUMNS_DIR, table)
+
+
+def scan_csv(path, header_types):
+    """Pierwszy przebieg: liczba wierszy i szerokość każdej kolumny napisowej (w znakach)"""
+    rows = 0
+    widths = {index: 1 for index, dtype in enumerate(header_types) if dtype == "str"}
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            rows += 1
+            for index in widths:
+                widths[index] = max(widths[index], len(row[index]))
+    return rows, widths
+
+
+def csv_to_columns(data_dir, table):
+    """Zapisuje tabelę z pliku CSV jako osobny plik .npy dla każdej kolumny.
+
+    Dwa przebiegi po CSV: pierwszy ustala liczbę wierszy i szerokości napisów (nagłówek
+    .npy zna wtedy pełny kształt), drugi konwertuje paczki po ITER_CHUNK_SIZE wierszy
+    i dopisuje je sekwencyjnie za nagłówkiem - pamięć nie rośnie z rozmiarem tabeli.
+    """
+    csv_path = os.path.join(data_dir, f"{table}.csv")
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        header = next(csv.reader(f))
+    types = [SCHEMA[table][name] for name in header]
+    rows, widths = scan_csv(csv_path, types)
+    dtypes = [f"<U{widths[index]}" if dtype == "str" else dtype for index, dtype in enumerate(types)]
+
+    out_dir = table_dir(data_dir, table)
+    os.makedirs(out_dir, exist_ok=True)
+    paths = [os.path.join(out_dir, f"{name}.npy") for name in header]
+    targets = [open(path, "wb") for path in paths]
+    try:
+        for target, dtype in zip(targets, dtypes):
+            np.lib.format.write_array_header_1_0(target, {
+                "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": (rows,)})
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            while True:
+                chunk = [row for _, row in zip(range(ITER_CHUNK_SIZE), reader)]
+                if not chunk:
+                    break
+                for target, dtype, values in zip(targets, dtypes, zip(*chunk)):
+                    target.write(np.array(values).astype(dtype).tobytes())
+    finally:
+        for target in targets:
+            target.close()
+    return [os.path.relpath(path, data_dir) for path in paths]
+
+
+def has_columns(data_dir, table):
+    return np is not None and os.path.isdir(table_dir(data_dir, table))
+
+
+class ColumnTable(Sequence):
+    """Tabela wczytana z plików .npy przez mmap - wiersze powstają dopiero przy dostępie.
+
+    Zachowuje się jak lista słowników z load_csv (len, indeksowanie, random.sample),
+    ale wartości mają już właściwe typy, a wycinki nie kopiują danych.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.names = list(columns)
+        self._length = len(columns[self.names[0]]) if self.names else 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ColumnTable({name: column[index] for name, column in self.columns.items()})
+        return {name: column[index].item() for name, column in self.columns.items()}
+
+    def __iter__(self):
+        for start in range(0, self._length, ITER_CHUNK_SIZE):
+            chunk = [self.columns[name][start:start + ITER_CHUNK_SIZE].tolist() for name in self.names]
+            for values in zip(*chunk):
+                yield dict(zip(self.names, values))
+
+    def column(self, name):
+        return self.columns[name]
+
+
+def load_table(data_dir, table):
+    directory = table_dir(data_dir, table)
+    columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+               for name in SCHEMA[table]}
+    return ColumnTable(columns)
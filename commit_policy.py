@@ -0,0 +1,39 @@
+# Polityki zatwierdzania transakcji w fazach po INSERT:
+#   single     - wszystko w jednej transakcji, commit na końcu main() (dotychczasowe zachowanie)
+#   autocommit - każda instrukcja jest osobną transakcją
+#   every_n    - commit co COMMIT_EVERY operacji
+COMMIT_POLICIES = ["single", "autocommit", "every_n"]
+COMMIT_EVERY = 100
+
+
+class CommitPolicy:
+    """Dokłada commity do mierzonych operacji - czas commitu (i fsync logu) wlicza się do pomiaru"""
+
+    def __init__(self, policy="single", every=COMMIT_EVERY):
+        self.policy = policy
+        self.every = every
+        self.conn = None
+        self.pending = 0
+
+    def attach(self, conn):
+        """Wywoływane po fazie INSERT, gdy nie ma otwartej transakcji"""
+        self.conn = conn
+        if self.policy == "autocommit":
+            conn.autocommit = True
+
+    def tick(self):
+        if self.policy != "every_n" or self.conn is None:
+            return
+        self.pending += 1
+        if self.pending >= self.every:
+            self.conn.commit()
+            self.pending = 0
+
+    def wrap(self, func):
+        if self.policy != "every_n":
+            return func
+
+        def run(value):
+            func(value)
+            self.tick()
+        return run
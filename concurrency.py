@@ -0,0 +1,87 @@
+import os
+import threading
+import time
+
+import harness
+import latency
+
+# Liczby równoległych klientów sprawdzane w teście skalowania
+CONCURRENCY_LEVELS = [1, 2, 4, 8, 16, 32, 64]
+# Liczba zapytań wykonywanych przez każdego klienta na danym poziomie
+OPS_PER_CLIENT = 200
+
+SWEEP_COLUMNS = (["scenario", "database", "clients", "operations", "total_time", "ops_per_sec"]
+                 + latency.LATENCY_COLUMNS + ["errors", "status"])
+
+
+def run_clients(open_client, values_per_client):
+    """Uruchamia każdego klienta w osobnym wątku z własnym połączeniem.
+
+    open_client() zwraca parę (operation, close); operation(value) wykonuje jedno
+    zapytanie. Klienci startują jednocześnie (bariera), a czas liczony jest od startu
+    do zakończenia ostatniego z nich. Błędy operacji (i wszystkie operacje klienta, który
+    nie zdołał się połączyć) są liczone w histogram.errors. Zwraca (czas w sekundach albo
+    nan, gdy nie udała się żadna operacja, histogram zbiorczy).
+    """
+    clients = len(values_per_client)
+    histograms = [latency.LatencyHistogram() for _ in range(clients)]
+    barrier = threading.Barrier(clients + 1)
+
+    def worker(index):
+        histogram = histograms[index]
+        try:
+            operation, close = open_client()
+        except Exception as e:
+            for _ in values_per_client[index]:
+                histogram.record_error(e)
+            barrier.wait()
+            return
+        try:
+            barrier.wait()
+            for value in values_per_client[index]:
+                start = time.perf_counter_ns()
+                try:
+                    operation(value)
+                except Exception as e:
+                    histogram.record_error(e)
+                    continue
+                histogram.record(time.perf_counter_ns() - start)
+        finally:
+            close()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter_ns()
+    for thread in threads:
+        thread.join()
+
+    merged = latency.LatencyHistogram()
+    for histogram in histograms:
+        merged.merge(histogram)
+    return latency.elapsed_or_nan(start, merged), merged
+
+
+def log_sweep_result(result_dir, database, scenario, clients, total_time, histogram):
+    ops_per_sec = histogram.count / total_time if total_time else 0
+    label = f"{scenario} {clients} klientów"
+    harness.append_row(os.path.join(result_dir, f"{database}_concurrency.csv"), SWEEP_COLUMNS, [
+        scenario, database, clients, histogram.count,
+        round(total_time, 4), round(ops_per_sec, 2)
+    ] + latency.latency_columns(histogram) + harness.error_columns(label, total_time, histogram.errors, histogram))
+    return ops_per_sec
+
+
+def run_sweep(result_dir, database, scenario, open_client, sample, levels=CONCURRENCY_LEVELS,
+              ops_per_client=OPS_PER_CLIENT):
+    """Dla każdego poziomu współbieżności N uruchamia N klientów i zapisuje ops/s oraz percentyle.
+
+    sample(count) zwraca listę wartości (kluczy) dla jednego klienta.
+    """
+    for clients in levels:
+        values_per_client = [sample(ops_per_client) for _ in range(clients)]
+        total_time, histogram = run_clients(open_client, values_per_client)
+        ops_per_sec = log_sweep_result(result_dir, database, scenario, clients, total_time, histogram)
+        print(f"   {scenario}: {clients} klientów -> {ops_per_sec:.0f} ops/s, "
+              f"p99 {histogram.percentile(99) / 1e6:.2f} ms")
@@ -0,0 +1,66 @@
+import hashlib
+import json
+import os
+
+CACHE_DIR = os.path.join("data", "cache")
+MANIFEST_FILE = "manifest.json"
+
+
+def cache_dir(count, seed, engine, reference_date):
+    """Katalog zbioru danych w cache, identyfikowany przez (count, seed, silnik generatora, datę odniesienia)"""
+    return os.path.join(CACHE_DIR, f"{count}_{seed}_{engine}_{reference_date}")
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_rows(path):
+    with open(path, "rb") as f:
+        return sum(1 for _ in f) - 1
+
+
+def write_manifest(data_dir, filenames, **metadata):
+    """Zapisuje manifest z sumami kontrolnymi - zapisywany na końcu, więc przerwane generowanie go nie tworzy"""
+    files = {}
+    for name in filenames:
+        path = os.path.join(data_dir, name)
+        files[name] = {
+            "sha256": file_sha256(path),
+            "rows": count_rows(path),
+            "bytes": os.path.getsize(path),
+        }
+    manifest = dict(metadata, files=files)
+    with open(os.path.join(data_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_manifest(data_dir):
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def verify_dataset(data_dir, **expected):
+    """Sprawdza, czy zbiór danych istnieje i zgadza się z sumami kontrolnymi z manifestu.
+
+    expected to parametry generowania (count, seed, engine, reference_date), które muszą
+    zgadzać się z zapisanymi w manifeście.
+    """
+    manifest = load_manifest(data_dir)
+    if manifest is None:
+        return False
+    if any(manifest.get(key) != value for key, value in expected.items()):
+        return False
+    for name, info in manifest["files"].items():
+        path = os.path.join(data_dir, name)
+        if not os.path.isfile(path) or file_sha256(path) != info["sha256"]:
+            return False
+    return True
@@ -1,107 +1,339 @@
 import csv
+import hashlib
 import os
 import random
+import shutil
 import string
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from faker import Faker # type: ignore
+from dataset_cache import write_manifest
+import columnar
+
+try:
+    import numpy as np
+except ImportError:  # numpy jest potrzebny tylko dla silnika "fast"
+    np = None
 
 fake = Faker("pl_PL")
 DATA_DIR = "data"
+PARTS_DIR = "parts"
 os.makedirs(DATA_DIR, exist_ok=True)
 
+# Liczba identyfikatorów generowanych z jednego ziarna. Podział na bloki nie zależy
+# od liczby procesów, więc wynik zależy wyłącznie od (count, seed)
+BLOCK_SIZE = 10000
+# Liczba wartości losowanych z Fakera do słowników silnika "fast"
+POOL_SIZE = 5000
+PRODUCT_CATEGORIES = ['Laptop', 'Telefon', 'Monitor', 'Tablet', 'Kamera']
+ORDER_STATUSES = ["Pending", "Shipped", "Cancelled", "Completed"]
+PASSWORD_ALPHABET = string.ascii_letters + string.digits
+
+USER_FIELDS = ["id", "first_name", "last_name", "email", "password", "registration_date"]
+PRODUCT_FIELDS = ["id", "name", "description", "price", "stock"]
+ORDER_FIELDS = ["id", "user_id", "order_date", "status"]
+ORDER_ITEM_FIELDS = ["id", "order_id", "product_id", "quantity", "price"]
+REVIEW_FIELDS = ["id", "product_id", "user_id", "rating", "comment", "created_at"]
+
 
-def generate_users(n):
-    users = []
-    for i in range(1, n + 1):
-        users.append({
+def random_timestamp(reference_time):
+    # Odpowiednik fake.date_time_this_year() liczony względem stałego punktu odniesienia
+    year_start = reference_time.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    return fake.date_time_between(start_date=year_start, end_date=reference_time).isoformat()
+
+
+def generate_users(first_id, last_id, reference_time):
+    for i in range(first_id, last_id + 1):
+        yield {
             "id": i,
             "first_name": fake.first_name(),
             "last_name": fake.last_name(),
             "email": f"user{i}@example.com",
-            "password": ''.join(random.choices(string.ascii_letters + string.digits, k=12)),
-            "registration_date": fake.date_time_this_year().isoformat()
-        })
-    return users
+            "password": ''.join(random.choices(PASSWORD_ALPHABET, k=12)),
+            "registration_date": random_timestamp(reference_time)
+        }
 
 
-def generate_products(n):
-    products = []
-    for i in range(1, n + 1):
-        products.append({
+def generate_products(first_id, last_id):
+    for i in range(first_id, last_id + 1):
+        yield {
             "id": i,
-            "name": f"{fake.color_name()} {random.choice(['Laptop', 'Telefon', 'Monitor', 'Tablet', 'Kamera'])}",
+            "name": f"{fake.color_name()} {random.choice(PRODUCT_CATEGORIES)}",
             "description": fake.sentence(nb_words=6),
             "price": round(random.uniform(10.0, 5000.0), 2),
             "stock": random.randint(1, 100)
-        })
-    return products
+        }
 
 
-def generate_orders(n, user_ids, product_ids):
-    orders = []
-    order_items = []
-    for i in range(1, n + 1):
+def generate_orders(first_id, last_id, user_ids, product_ids, reference_time):
+    # Zwraca kolejno pary (zamówienie, pozycje zamówienia). Identyfikatory pozycji
+    # są lokalne dla bloku i zostają przenumerowane przy scalaniu plików
+    item_id = 0
+    for i in range(first_id, last_id + 1):
         uid = random.choice(user_ids)
         order_id = i
-        orders.append({
+        order = {
             "id": order_id,
             "user_id": uid,
-            "order_date": fake.date_time_this_year().isoformat(),
-            "status": random.choice(["Pending", "Shipped", "Cancelled", "Completed"])
-        })
+            "order_date": random_timestamp(reference_time),
+            "status": random.choice(ORDER_STATUSES)
+        }
 
+        order_items = []
         num_items = random.randint(1, 5)
         for _ in range(num_items):
             pid = random.choice(product_ids)
             qty = random.randint(1, 3)
             price = round(random.uniform(10.0, 5000.0), 2)
+            item_id += 1
             order_items.append({
-                "id": len(order_items) + 1,
+                "id": item_id,
                 "order_id": order_id,
                 "product_id": pid,
                 "quantity": qty,
                 "price": price
             })
 
-    return orders, order_items
+        yield order, order_items
 
 
-def generate_reviews(n, user_ids, product_ids):
-    reviews = []
-    for i in range(1, n + 1):
-        reviews.append({
+def generate_reviews(first_id, last_id, user_ids, product_ids, reference_time):
+    for i in range(first_id, last_id + 1):
+        yield {
             "id": i,
             "product_id": random.choice(product_ids),
             "user_id": random.choice(user_ids),
             "rating": random.randint(1, 5),
             "comment": fake.sentence(),
-            "created_at": fake.date_time_this_year().isoformat()
-        })
-    return reviews
+            "created_at": random_timestamp(reference_time)
+        }
 
 
-def write_csv(filename, fieldnames, data):
+def write_csv(filename, fieldnames, data, header=True):
+    # data może być generatorem - wiersze trafiają do pliku na bieżąco
     with open(os.path.join(DATA_DIR, filename), "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
+        if header:
+            writer.writeheader()
         writer.writerows(data)
 
 
-def main(count=1000):
-    print(f"🔄 Generowanie {count} rekordów dla każdej kategorii...")
+def write_orders_csv(orders_filename, items_filename, orders_with_items, header=True):
+    with open(os.path.join(DATA_DIR, orders_filename), "w", newline="", encoding="utf-8") as orders_file, \
+         open(os.path.join(DATA_DIR, items_filename), "w", newline="", encoding="utf-8") as items_file:
+        orders_writer = csv.DictWriter(orders_file, fieldnames=ORDER_FIELDS)
+        items_writer = csv.DictWriter(items_file, fieldnames=ORDER_ITEM_FIELDS)
+        if header:
+            orders_writer.writeheader()
+            items_writer.writeheader()
+        for order, order_items in orders_with_items:
+            orders_writer.writerow(order)
+            items_writer.writerows(order_items)
+
+
+def derive_seed(seed, entity, block_index):
+    digest = hashlib.sha256(f"{seed}:{entity}:{block_index}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def part_name(entity, block_index):
+    return os.path.join(PARTS_DIR, f"{entity}_{block_index:05d}.csv")
+
+
+_vocabulary_pools = {}
+
+
+def vocabulary_pools(seed):
+    """Jednorazowo losuje z Fakera słowniki wartości używane przez silnik "fast" """
+    if seed not in _vocabulary_pools:
+        fake.seed_instance(derive_seed(seed, "pools", 0))
+        _vocabulary_pools[seed] = {
+            "first_name": np.array([fake.first_name() for _ in range(POOL_SIZE)]),
+            "last_name": np.array([fake.last_name() for _ in range(POOL_SIZE)]),
+            "color_name": np.array([fake.color_name() for _ in range(POOL_SIZE)]),
+            "description": np.array([fake.sentence(nb_words=6) for _ in range(POOL_SIZE)]),
+            "comment": np.array([fake.sentence() for _ in range(POOL_SIZE)]),
+        }
+    return _vocabulary_pools[seed]
+
+
+def pick(rng, pool, n):
+    return pool[rng.integers(0, len(pool), size=n)]
+
+
+def random_passwords(rng, n):
+    alphabet = np.array(list(PASSWORD_ALPHABET))
+    # Macierz (n, 12) pojedynczych znaków widziana jako n napisów po 12 znaków
+    return alphabet[rng.integers(0, len(alphabet), size=(n, 12))].view("U12").ravel()
+
+
+def random_timestamps(rng, n, reference_time):
+    year_start = reference_time.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    start = np.datetime64(year_start, "s").astype(np.int64)
+    end = np.datetime64(reference_time, "s").astype(np.int64)
+    # endpoint=True - jak w fakerze koniec przedziału jest dozwolony (1 stycznia start == end)
+    # datetime_as_string daje ten sam format co datetime.isoformat() dla pełnych sekund
+    return np.datetime_as_string(rng.integers(start, end, size=n, endpoint=True).astype("datetime64[s]"), unit="s")
+
+
+def random_prices(rng, n):
+    return rng.uniform(10.0, 5000.0, size=n).round(2)
+
+
+def write_columns(filename, columns):
+    """Zapisuje kolumny (tablice NumPy) jako wiersze CSV bez nagłówka"""
+    with open(os.path.join(DATA_DIR, filename), "w", newline="", encoding="utf-8") as f:
+        csv.writer(f).writerows(zip(*[column.tolist() for column in columns]))
+
+
+def generate_block_fast(entity, block_index, first_id, last_id, count, seed, reference_time):
+    rng = np.random.default_rng(derive_seed(seed, entity, block_index))
+    pools = vocabulary_pools(seed)
+    n = last_id - first_id + 1
+    ids = np.arange(first_id, last_id + 1)
+
+    if entity == "users":
+        emails = np.char.add(np.char.add("user", ids.astype(str)), "@example.com")
+        write_columns(part_name("users", block_index), [
+            ids,
+            pick(rng, pools["first_name"], n),
+            pick(rng, pools["last_name"], n),
+            emails,
+            random_passwords(rng, n),
+            random_timestamps(rng, n, reference_time),
+        ])
+    elif entity == "products":
+        names = np.char.add(np.char.add(pick(rng, pools["color_name"], n), " "),
+                            pick(rng, np.array(PRODUCT_CATEGORIES), n))
+        write_columns(part_name("products", block_index), [
+            ids,
+            names,
+            pick(rng, pools["description"], n),
+            random_prices(rng, n),
+            rng.integers(1, 101, size=n),
+        ])
+    elif entity == "orders":
+        write_columns(part_name("orders", block_index), [
+            ids,
+            rng.integers(1, count + 1, size=n),
+            random_timestamps(rng, n, reference_time),
+            pick(rng, np.array(ORDER_STATUSES), n),
+        ])
+        items_per_order = rng.integers(1, 6, size=n)
+        total_items = int(items_per_order.sum())
+        write_columns(part_name("order_items", block_index), [
+            np.arange(1, total_items + 1),
+            np.repeat(ids, items_per_order),
+            rng.integers(1, count + 1, size=total_items),
+            rng.integers(1, 4, size=total_items),
+            random_prices(rng, total_items),
+        ])
+    elif entity == "reviews":
+        write_columns(part_name("reviews", block_index), [
+            ids,
+            rng.integers(1, count + 1, size=n),
+            rng.integers(1, count + 1, size=n),
+            rng.integers(1, 6, size=n),
+            pick(rng, pools["comment"], n),
+            random_timestamps(rng, n, reference_time),
+        ])
+
+
+def generate_block(task):
+    """Generuje jeden blok identyfikatorów do pliku częściowego (uruchamiane w puli procesów)"""
+    global DATA_DIR
+    entity, block_index, first_id, last_id, count, seed, reference_time, engine, DATA_DIR = task
+    if engine == "fast":
+        generate_block_fast(entity, block_index, first_id, last_id, count, seed, reference_time)
+        return
+
+    block_seed = derive_seed(seed, entity, block_index)
+    random.seed(block_seed)
+    fake.seed_instance(block_seed)
+
+    user_ids = range(1, count + 1)
+    product_ids = range(1, count + 1)
+
+    if entity == "users":
+        write_csv(part_name("users", block_index), USER_FIELDS,
+                  generate_users(first_id, last_id, reference_time), header=False)
+    elif entity == "products":
+        write_csv(part_name("products", block_index), PRODUCT_FIELDS,
+                  generate_products(first_id, last_id), header=False)
+    elif entity == "orders":
+        write_orders_csv(part_name("orders", block_index), part_name("order_items", block_index),
+                         generate_orders(first_id, last_id, user_ids, product_ids, reference_time), header=False)
+    elif entity == "reviews":
+        write_csv(part_name("reviews", block_index), REVIEW_FIELDS,
+                  generate_reviews(first_id, last_id, user_ids, product_ids, reference_time), header=False)
+
+
+def merge_parts(filename, fieldnames, parts, renumber=False):
+    """Scala pliki częściowe w kolejności bloków, opcjonalnie nadając ciągłe identyfikatory"""
+    with open(os.path.join(DATA_DIR, filename), "w", newline="", encoding="utf-8") as out:
+        writer = csv.writer(out)
+        writer.writerow(fieldnames)
+        next_id = 1
+        for part in parts:
+            path = os.path.join(DATA_DIR, part)
+            with open(path, newline="", encoding="utf-8") as f:
+                if renumber:
+                    for row in csv.reader(f):
+                        row[0] = next_id
+                        next_id += 1
+                        writer.writerow(row)
+                else:
+                    shutil.copyfileobj(f, out)
+            os.remove(path)
+
+
+def main(count=1000, workers=1, seed=None, reference_date=None, engine="faker", output_dir=None, columns=False):
+    global DATA_DIR
+    DATA_DIR = output_dir or DATA_DIR
+    if engine == "fast" and np is None:
+        raise SystemExit("❌ Silnik 'fast' wymaga pakietu numpy (pip install numpy).")
+    if columns and np is None:
+        raise SystemExit("❌ Format kolumnowy wymaga pakietu numpy (pip install numpy).")
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 32)
+    reference_time = datetime.combine(reference_date or datetime.now().date(), datetime.min.time())
+
+    print(f"🔄 Generowanie {count} rekordów dla każdej kategorii (seed={seed}, procesy={workers}, silnik={engine})...")
+
+    blocks = [(start, min(start + BLOCK_SIZE - 1, count)) for start in range(1, count + 1, BLOCK_SIZE)]
+    entities = ["users", "products", "orders", "reviews"]
+    tasks = [(entity, index, first_id, last_id, count, seed, reference_time, engine, DATA_DIR)
+             for entity in entities
+             for index, (first_id, last_id) in enumerate(blocks)]
+
+    os.makedirs(os.path.join(DATA_DIR, PARTS_DIR), exist_ok=True)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(generate_block, tasks))
+    else:
+        for task in tasks:
+            generate_block(task)
+
+    def parts(entity):
+        return [part_name(entity, index) for index in range(len(blocks))]
+
+    merge_parts("users.csv", USER_FIELDS, parts("users"))
+    merge_parts("products.csv", PRODUCT_FIELDS, parts("products"))
+    merge_parts("orders.csv", ORDER_FIELDS, parts("orders"))
+    merge_parts("order_items.csv", ORDER_ITEM_FIELDS, parts("order_items"), renumber=True)
+    merge_parts("reviews.csv", REVIEW_FIELDS, parts("reviews"))
+    os.rmdir(os.path.join(DATA_DIR, PARTS_DIR))
 
-    users = generate_users(count)
-    products = generate_products(count)
-    orders, order_items = generate_orders(count, [u["id"] for u in users], [p["id"] for p in products])
-    reviews = generate_reviews(count, [u["id"] for u in users], [p["id"] for p in products])
+    files = ["users.csv", "products.csv", "orders.csv", "order_items.csv", "reviews.csv"]
+    if columns:
+        print("🧱 Zapisywanie danych w formacie kolumnowym (.npy)...")
+        for table in columnar.SCHEMA:
+            files += columnar.csv_to_columns(DATA_DIR, table)
 
-    write_csv("users.csv", users[0].keys(), users)
-    write_csv("products.csv", products[0].keys(), products)
-    write_csv("orders.csv", orders[0].keys(), orders)
-    write_csv("order_items.csv", order_items[0].keys(), order_items)
-    write_csv("reviews.csv", reviews[0].keys(), reviews)
+    write_manifest(DATA_DIR, files,
+                   count=count, seed=seed, engine=engine, reference_date=reference_time.date().isoformat())
 
-    print("✅ Dane testowe wygenerowane i zapisane w folderze 'data/'.")
+    print(f"✅ Dane testowe wygenerowane i zapisane w folderze '{DATA_DIR}/'.")
 
 
 if __name__ == "__main__":
@@ -109,6 +341,15 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Generator danych testowych dla systemu e-commerce")
     parser.add_argument("--count", type=int, default=1000, help="Liczba rekordów do wygenerowania dla każdej kategorii")
+    parser.add_argument("--workers", type=int, default=1, help="Liczba procesów generujących dane równolegle")
+    parser.add_argument("--seed", type=int, default=None, help="Ziarno losowania - te same (count, seed) dają identyczne pliki")
+    parser.add_argument("--reference-date", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(), default=None,
+                        help="Data odniesienia dla znaczników czasu (domyślnie dzisiaj), format RRRR-MM-DD")
+    parser.add_argument("--engine", choices=["faker", "fast"], default="faker",
+                        help="faker - wywołania Fakera dla każdego wiersza, fast - wektorowe generowanie w NumPy")
+    parser.add_argument("--output-dir", default=DATA_DIR, help="Katalog docelowy dla plików CSV")
+    parser.add_argument("--columns", action="store_true",
+                        help="Dodatkowo zapisz dane jako pliki .npy (jeden na kolumnę) do wczytywania przez mmap")
     args = parser.parse_args()
 
-    main(args.count)
+    main(args.count, args.workers, args.seed, args.reference_date, args.engine, args.output_dir, args.columns)
@@ -0,0 +1,243 @@
+import contextlib
+import csv
+import importlib
+import math
+import os
+import random
+import sys
+import time
+
+import columnar
+import latency
+
+# Katalog z danymi - benchmark_runner wskazuje nim zbiór z cache
+DATA_DIR = os.environ.get("BENCH_DATA_DIR", "data")
+RESULTS_DIR = "results"
+TABLES = ["users", "products", "orders", "order_items", "reviews"]
+RESULT_COLUMNS = (["operation", "database", "entity", "total_time", "avg_time", "record_count"]
+                  + latency.LATENCY_COLUMNS + ["errors", "status"])
+# Status wiersza wyników:
+#   ok       - wszystkie operacje scenariusza zakończone powodzeniem
+#   degraded - część operacji zakończyła się błędem (percentyle liczone tylko z udanych)
+#   error    - scenariusz się nie wykonał albo nie udała się żadna jego operacja (czas = nan)
+#   partial  - wiersz z przebiegu przerwanego wyjątkiem (kolejne scenariusze nie zostały zmierzone)
+STATUSES = ["ok", "degraded", "error", "partial"]
+
+# Adaptery silników: nazwa -> moduł z funkcją main(..., dataset=None) uruchamiającą wszystkie scenariusze
+ENGINES = {
+    "mysql": "mysql_crud_test",
+    "mariadb": "mariadb_crud_test",
+    "postgresql": "postgresql_crud_test",
+    "mongo": "mongo_crud_test",
+    "sqlite": "sqlite_crud_test",
+}
+# Kod wyjścia, gdy któryś silnik przekroczył --max-duration (benchmark_runner kończy wtedy pętlę)
+EXIT_OVER_LIMIT = 3
+# Pliki wyników zapisywane w bieżącym przebiegu: ścieżka -> indeks pierwszego wiersza tego przebiegu
+RUN_ROWS = {}
+
+
+def load_csv(file):
+    with open(os.path.join(DATA_DIR, file), newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def load_table(table):
+    """Wczytuje tabelę z plików .npy (mmap), a gdy ich brak - z CSV"""
+    if columnar.has_columns(DATA_DIR, table):
+        return columnar.load_table(DATA_DIR, table)
+    return load_csv(f"{table}.csv")
+
+
+def load_dataset():
+    """Wszystkie tabele zbioru danych - wczytywane raz i współdzielone przez silniki w jednym procesie"""
+    return {table: load_table(table) for table in TABLES}
+
+
+def get_record_count():
+    try:
+        with open(os.path.join(DATA_DIR, "users.csv"), 'r', encoding='utf-8') as f:
+            return sum(1 for _ in f) - 1
+    except FileNotFoundError:
+        return 0
+
+
+def setup_results_dir():
+    record_count = get_record_count()
+    result_dir = os.path.join(RESULTS_DIR, f"records_{record_count}")
+    os.makedirs(result_dir, exist_ok=True)
+    return result_dir
+
+
+def measure_time(func):
+    """Czas wykonania func w sekundach, mierzony monotonicznym zegarem ns.
+
+    Błąd nie może wyglądać jak najszybszy wynik: wyjątek jest wypisywany, a zwracany
+    czas to nan - write_result oznacza taki wiersz statusem error. Po błędzie wywoływany
+    jest hook silnika (latency.recover), żeby kolejne scenariusze nie dziedziczyły przerwanej transakcji.
+    """
+    start = time.perf_counter_ns()
+    try:
+        func()
+    except Exception as e:
+        print(f"❌ Błąd: {e!r}")
+        latency.recover(e)
+        return math.nan
+    return (time.perf_counter_ns() - start) / 1e9
+
+
+def sample_values(data, field, count, cast_fn=None):
+    if count == 0:
+        return []
+    sample_count = min(count, len(data), max(1000, int(len(data) * 0.1)))
+    sample = random.sample(data, sample_count)
+    return [cast_fn(item[field]) if cast_fn else item[field] for item in sample]
+
+
+def chunked(values, size):
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def scenario_status(total_time, errors):
+    if math.isnan(total_time):
+        return "error"
+    return "degraded" if errors else "ok"
+
+
+def count_rows(path):
+    with open(path, newline="") as f:
+        return sum(1 for _ in csv.reader(f))
+
+
+def error_columns(label, total_time, errors, histogram=None):
+    """Kolumny [errors, status] wiersza wyników; przy błędach wypisuje ostrzeżenie z pierwszym z nich"""
+    if math.isnan(total_time):
+        errors = max(errors, 1)
+    status = scenario_status(total_time, errors)
+    if errors:
+        first_error = f" ({histogram.first_error!r})" if histogram is not None and histogram.first_error else ""
+        print(f"⚠️ {label}: {errors} błędów, status {status}{first_error}")
+    return [errors, status]
+
+
+def upgrade_header(result_path, columns):
+    """Przepisuje plik ze starszym nagłówkiem (np. bez errors/status) na nagłówek columns.
+
+    Stare wiersze dostają puste wartości w nowych kolumnach - pusty status oznacza wynik
+    sprzed kolumny status. Wiersze już zapisane w nowym formacie zostają bez zmian.
+    """
+    with open(result_path, newline="") as f:
+        rows = list(csv.reader(f))
+    if not rows or rows[0] == columns:
+        return
+    header = rows[0]
+    upgraded = [columns]
+    for row in rows[1:]:
+        if len(row) == len(columns):
+            upgraded.append(row)
+        else:
+            values = dict(zip(header, row))
+            upgraded.append([values.get(column, "") for column in columns])
+    with open(result_path, "w", newline="") as f:
+        csv.writer(f).writerows(upgraded)
+    print(f"🔧 Nagłówek '{result_path}' uzupełniony do {len(columns)} kolumn")
+
+
+def append_row(result_path, columns, row):
+    """Dopisuje wiersz do pliku wyników (z nagłówkiem, gdy plik jest nowy).
+
+    Plik trafia do RUN_ROWS, więc przerwany przebieg oznaczy jego wiersze statusem partial.
+    """
+    file_exists = os.path.isfile(result_path)
+    if file_exists and result_path not in RUN_ROWS:
+        upgrade_header(result_path, columns)
+    if result_path not in RUN_ROWS:
+        RUN_ROWS[result_path] = count_rows(result_path) if file_exists else 1
+    with open(result_path, "a", newline="") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(columns)
+        writer.writerow(row)
+
+
+def write_result(result_dir, result_file, database, operation, entity, total_time, count, histogram=None,
+                 errors=None):
+    """Dopisuje wiersz do results/records_N/<result_file>.
+
+    Liczba błędów pochodzi z histogramu albo z parametru errors (scenariusze bez percentyli).
+    """
+    if errors is None:
+        errors = histogram.errors if histogram is not None else 0
+    avg_time = total_time / count if count else 0
+    append_row(os.path.join(result_dir, result_file), RESULT_COLUMNS, [
+        operation, database, entity,
+        round(total_time, 4), round(avg_time, 6), count
+    ] + latency.latency_columns(histogram) + error_columns(f"{operation} {entity}", total_time, errors, histogram))
+    latency.dump_samples(result_dir, database, operation, entity, histogram)
+
+
+def mark_partial(path, first_row):
+    """Zmienia status ok na partial we wszystkich wierszach od first_row"""
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    if "status" not in rows[0]:
+        return
+    status = rows[0].index("status")
+    for row in rows[first_row:]:
+        if len(row) == len(rows[0]) and row[status] == "ok":
+            row[status] = "partial"
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows(rows)
+
+
+@contextlib.contextmanager
+def tag_partial_run():
+    """Gdy przebieg zostanie przerwany wyjątkiem, jego wiersze w plikach wyników dostają status partial"""
+    RUN_ROWS.clear()
+    try:
+        yield
+    except BaseException:
+        for path, first_row in RUN_ROWS.items():
+            mark_partial(path, first_row)
+        print(f"⚠️ Przebieg przerwany - wiersze oznaczone statusem partial w {len(RUN_ROWS)} plikach wyników")
+        raise
+
+
+def run_engines(engines, max_duration=None):
+    """Uruchamia scenariusze kolejnych silników na jednym, raz wczytanym zbiorze danych.
+
+    Zwraca słownik silnik -> czas trwania w sekundach. Przy max_duration przerywa
+    po pierwszym silniku, który przekroczył limit.
+    """
+    print("🔄 Wczytywanie danych...")
+    start = time.perf_counter_ns()
+    dataset = load_dataset()
+    print(f"⏱  Dane wczytane w {(time.perf_counter_ns() - start) / 1e9:.2f} s")
+
+    durations = {}
+    for engine in engines:
+        print(f"\n▶️  Silnik: {engine}")
+        module = importlib.import_module(ENGINES[engine])
+        start = time.perf_counter_ns()
+        with tag_partial_run():
+            module.main(dataset=dataset)
+        durations[engine] = (time.perf_counter_ns() - start) / 1e9
+        print(f"⏱  {engine}: {round(durations[engine] / 60, 2)} min")
+        if max_duration and durations[engine] >= max_duration:
+            break
+    return durations
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Wspólny harness - te same scenariusze dla wielu silników w jednym procesie")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), default=list(ENGINES),
+                        help="Silniki uruchamiane po kolei na raz wczytanym zbiorze danych")
+    parser.add_argument("--max-duration", type=float, default=None,
+                        help="Limit czasu jednego silnika w sekundach (po przekroczeniu kod wyjścia 3)")
+    args = parser.parse_args()
+
+    durations = run_engines(args.engines, args.max_duration)
+    if args.max_duration and any(d >= args.max_duration for d in durations.values()):
+        sys.exit(EXIT_OVER_LIMIT)
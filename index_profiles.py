@@ -0,0 +1,97 @@
+# Profile indeksów drugorzędnych dla silników relacyjnych.
+# init_*.sql tworzą tylko klucze główne i UNIQUE(email); reszta zakładana jest tutaj
+# z prefiksem bench_idx_, żeby można ją było usunąć przed kolejnym uruchomieniem.
+INDEX_PREFIX = "bench_idx_"
+# Jawne indeksy FK zakładane w MySQL/MariaDB, gdy InnoDB usunął swój niejawny indeks
+FK_INDEX_PREFIX = "fk_idx_"
+
+# Indeksy kolumn kluczy obcych - InnoDB (MySQL/MariaDB) zakłada je sam przy tworzeniu FK
+FK_INDEXES = [
+    ("orders", ["user_id"]),
+    ("order_items", ["order_id"]),
+    ("order_items", ["product_id"]),
+    ("reviews", ["product_id"]),
+    ("reviews", ["user_id"]),
+]
+
+INDEX_PROFILES = {
+    "none": [],
+    "fk": FK_INDEXES,
+    # Jak ensure_indexes() w mongo_crud_test.py
+    "full": FK_INDEXES + [
+        ("products", ["name"]),
+        ("products", ["price"]),
+        ("products", ["stock"]),
+        ("orders", ["order_date"]),
+        ("orders", ["status"]),
+        ("reviews", ["rating"]),
+    ],
+    # Indeksy złożone pokrywające zapytania punktowe i złożone
+    "covering": [
+        ("products", ["name"]),
+        ("orders", ["user_id", "order_date", "status"]),
+        ("orders", ["order_date", "id"]),
+        ("order_items", ["order_id", "product_id", "quantity", "price"]),
+        ("order_items", ["product_id", "order_id"]),
+        ("reviews", ["product_id", "rating"]),
+        ("reviews", ["user_id", "product_id"]),
+    ],
+}
+
+
+def index_name(table, columns):
+    return f"{INDEX_PREFIX}{table}_{'_'.join(columns)}"
+
+
+def results_file(database, profile):
+    """Profil "none" zapisuje do domyślnego pliku, pozostałe do <db>_<profil>_indexes.csv"""
+    if profile == "none":
+        return f"{database}_results.csv"
+    return f"{database}_{profile}_indexes.csv"
+
+
+def ensure_fk_indexes(cursor):
+    """Zakłada zwykły indeks dla każdego FK, którego nie wspiera żaden indeks spoza bench_idx_*.
+
+    InnoDB usuwa swój niejawny indeks FK, gdy powstaje indeks złożony zaczynający się od
+    kolumny FK (profil covering). Taki indeks bench_idx_* staje się wtedy potrzebny dla
+    ograniczenia i DROP INDEX kończy się błędem 1553.
+    """
+    cursor.execute("SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND SEQ_IN_INDEX = 1 "
+                   "AND INDEX_NAME NOT LIKE 'bench\\_idx\\_%'")
+    backed = set(cursor.fetchall())
+    for table, columns in FK_INDEXES:
+        if (table, columns[0]) not in backed:
+            cursor.execute(f"CREATE INDEX {FK_INDEX_PREFIX}{table}_{columns[0]} ON {table} ({columns[0]})")
+
+
+def apply_profile(cursor, dialect, profile):
+    """Usuwa indeksy bench_idx_* z poprzednich uruchomień i zakłada indeksy wybranego profilu.
+
+    dialect: "postgresql", "mysql" (także MariaDB) albo "sqlite". W MySQL pomijane są
+    indeksy z FK_INDEXES, bo InnoDB utrzymuje je niejawnie niezależnie od profilu.
+    """
+    if dialect == "postgresql":
+        cursor.execute("SELECT tablename, indexname FROM pg_indexes "
+                       "WHERE schemaname = current_schema() AND indexname LIKE 'bench\\_idx\\_%'")
+        for _, name in cursor.fetchall():
+            cursor.execute(f"DROP INDEX {name}")
+    elif dialect == "sqlite":
+        cursor.execute("SELECT tbl_name, name FROM sqlite_master "
+                       "WHERE type = 'index' AND name LIKE 'bench\\_idx\\_%' ESCAPE '\\'")
+        for _, name in cursor.fetchall():
+            cursor.execute(f"DROP INDEX {name}")
+    else:
+        ensure_fk_indexes(cursor)
+        cursor.execute("SELECT DISTINCT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS "
+                       "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_NAME LIKE 'bench\\_idx\\_%'")
+        for table, name in cursor.fetchall():
+            cursor.execute(f"DROP INDEX {name} ON {table}")
+
+    indexes = INDEX_PROFILES[profile]
+    if dialect == "mysql":
+        indexes = [index for index in indexes if index not in FK_INDEXES]
+    for table, columns in indexes:
+        cursor.execute(f"CREATE INDEX {index_name(table, columns)} ON {table} ({', '.join(columns)})")
+    print(f"🗂️ Profil indeksów '{profile}': {len(indexes)} indeksów drugorzędnych")
@@ -0,0 +1,146 @@
+import csv
+import math
+import os
+import time
+
+PERCENTILES = [50, 95, 99]
+LATENCY_COLUMNS = ["p50_ms", "p95_ms", "p99_ms", "max_ms"]
+# Wywoływany po złapanym błędzie operacji - silnik przywraca w nim połączenie do używalnego stanu
+# (w PostgreSQL błąd przerywa transakcję i bez rollbacku każde kolejne zapytanie kończy się błędem)
+ERROR_HOOK = None
+
+
+class LatencyHistogram:
+    """Histogram opóźnień w stylu HDR.
+
+    Wartości (ns) trafiają do kubełków o szerokości rosnącej wykładniczo, ale każdy
+    przedział potęgi dwójki jest dzielony liniowo na 2^precision_bits części, więc
+    błąd względny percentyli nie przekracza 2^-precision_bits.
+    """
+
+    def __init__(self, precision_bits=7, keep_samples=False):
+        self.precision_bits = precision_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        # Operacje zakończone wyjątkiem - nie trafiają do percentyli
+        self.errors = 0
+        self.first_error = None
+        # Surowe pomiary trzymane tylko na potrzeby zrzutu do pliku
+        self.samples = [] if keep_samples else None
+
+    def record(self, value_ns):
+        value = int(value_ns)
+        shift = max(0, value.bit_length() - self.precision_bits - 1)
+        bucket = (value >> shift) << shift
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+        if self.samples is not None:
+            self.samples.append(value)
+
+    def record_error(self, error):
+        self.errors += 1
+        if self.first_error is None:
+            self.first_error = error
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.errors += other.errors
+        if self.first_error is None:
+            self.first_error = other.first_error
+        if self.samples is not None and other.samples is not None:
+            self.samples.extend(other.samples)
+        return self
+
+    def _highest_equivalent(self, bucket):
+        shift = max(0, bucket.bit_length() - self.precision_bits - 1)
+        return bucket + (1 << shift) - 1
+
+    def percentile(self, p):
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self._highest_equivalent(bucket), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+
+def set_error_hook(hook):
+    """Ustawia hook silnika (np. conn.rollback) albo usuwa go przy None"""
+    global ERROR_HOOK
+    ERROR_HOOK = hook
+
+
+def recover(error):
+    """Wywołuje hook silnika po błędzie; błąd samego hooka nie przesłania pierwotnego"""
+    if ERROR_HOOK is None:
+        return
+    try:
+        ERROR_HOOK()
+    except Exception as e:
+        print(f"⚠️ Nie udało się przywrócić połączenia po {error!r}: {e!r}")
+
+
+def measure_each(func, values, keep_samples=False):
+    """Wywołuje func(value) dla każdej wartości, mierząc każde wywołanie osobno.
+
+    Wyjątek nie przerywa scenariusza - jest liczony w histogram.errors. Zwraca
+    (czas całkowity w sekundach, LatencyHistogram); czas to nan, gdy nie udała się
+    żadna operacja.
+    """
+    histogram = LatencyHistogram(keep_samples=keep_samples)
+    start = time.perf_counter_ns()
+    for value in values:
+        op_start = time.perf_counter_ns()
+        try:
+            func(value)
+        except Exception as e:
+            histogram.record_error(e)
+            recover(e)
+            continue
+        histogram.record(time.perf_counter_ns() - op_start)
+    return elapsed_or_nan(start, histogram), histogram
+
+
+def elapsed_or_nan(start, histogram):
+    """Czas od start (ns) w sekundach albo nan, gdy wszystkie operacje zakończyły się błędem"""
+    if histogram.errors and not histogram.count:
+        return math.nan
+    return (time.perf_counter_ns() - start) / 1e9
+
+
+def latency_columns(histogram):
+    """Wartości kolumn p50/p95/p99/max w milisekundach (puste, gdy brak histogramu)"""
+    if histogram is None or not histogram.count:
+        return [""] * len(LATENCY_COLUMNS)
+    values = [histogram.percentile(p) for p in PERCENTILES] + [histogram.max]
+    return [round(v / 1e6, 4) for v in values]
+
+
+def dump_samples(result_dir, database, operation, entity, histogram):
+    """Zapisuje surowe pomiary (ns) do results/records_N/latency/<db>_<operacja>_<encja>.csv"""
+    if histogram is None or histogram.samples is None:
+        return
+    latency_dir = os.path.join(result_dir, "latency")
+    os.makedirs(latency_dir, exist_ok=True)
+    with open(os.path.join(latency_dir, f"{database}_{operation}_{entity}.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["latency_ns"])
+        writer.writerows([value] for value in histogram.samples)
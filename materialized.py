@@ -0,0 +1,42 @@
+import csv
+import os
+
+# Liczba odczytów każdego widoku/tabeli podsumowań w pomiarze czasu odczytu
+MATERIALIZED_READS = 100
+
+# Paczka nowych pozycji zamówień (~1% tabeli) dopisywana przed pomiarem nieaktualności
+WRITE_BURST_SQL = '''
+    INSERT INTO order_items (order_id, product_id, quantity, price)
+    SELECT order_id, product_id, quantity, price FROM order_items WHERE id % 100 = 0
+'''
+# Usunięcie paczki po pomiarze (id > największe id sprzed paczki) - faza DELETE widzi te same dane co bez --materialized
+WRITE_BURST_CLEANUP_SQL = "DELETE FROM order_items WHERE id > %s"
+
+MATERIALIZED_COLUMNS = ["view", "database", "build_time", "read_avg_time",
+                        "stale_rows", "total_rows", "stale_pct", "refresh_time"]
+
+
+def rows_by_key(rows):
+    """Wiersze agregatu jako słownik klucz -> pozostałe kolumny (zaokrąglone, żeby float i Decimal były porównywalne)"""
+    return {row[0]: tuple(round(float(value), 2) for value in row[1:]) for row in rows}
+
+
+def stale_rows(live, stored):
+    """Liczba kluczy, dla których zapisany agregat różni się od wyliczonego na bieżąco"""
+    return sum(1 for key in set(live) | set(stored) if live.get(key) != stored.get(key))
+
+
+def log_view(result_dir, database, view, build_time, read_avg_time, stale, total, refresh_time):
+    result_file = os.path.join(result_dir, f"{database}_materialized.csv")
+    file_exists = os.path.isfile(result_file)
+    stale_pct = stale / total * 100 if total else 0
+    with open(result_file, "a", newline="") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(MATERIALIZED_COLUMNS)
+        writer.writerow([
+            view, database, round(build_time, 4), round(read_avg_time, 6),
+            stale, total, round(stale_pct, 2), round(refresh_time, 4)
+        ])
+    print(f"   {view}: odczyt {read_avg_time * 1000:.2f} ms, nieaktualne {stale_pct:.1f}%, "
+          f"odświeżenie {refresh_time:.3f} s")
@@ -1,77 +1,71 @@
-import csv
+import asyncio
+import json
+import math
 import os
-import time
-import random
 import mysql.connector
+import mysql.connector.pooling
+import harness
+from harness import DATA_DIR, chunked, get_record_count, sample_values, setup_results_dir
+import latency
+import concurrency
+import pooling
+import materialized
+import commit_policy
+import repetitions
+import plans
+import index_profiles
+import prepared
+import async_runner
+
+try:
+    import aiomysql
+except ImportError:  # potrzebny tylko w trybie --execution async/both
+    aiomysql = None
 from datetime import datetime, timezone
 from pathlib import Path
 import shutil
 
-DATA_DIR = "data"
-RESULTS_DIR = "results"
-os.makedirs(RESULTS_DIR, exist_ok=True)
-
 # 🔐 Dane połączenia z MySQL
 DB_CONFIG = {
     'host': 'localhost',
     'user': 'admin',
     'password': 'admin123',
     'database': 'shop',
-    'port': 3308
+    'port': 3308,
+    'allow_local_infile': True
 }
 
-
-def load_csv(file):
-    with open(os.path.join(DATA_DIR, file), newline='', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
-
-
-def get_record_count():
-    """Określa liczbę rekordów na podstawie pliku users.csv"""
-    try:
-        with open(os.path.join(DATA_DIR, "users.csv"), 'r', encoding='utf-8') as f:
-            # Odejmujemy 1 dla pominięcia nagłówka
-            return sum(1 for _ in f) - 1
-    except FileNotFoundError:
-        return 0
-
-
-def setup_results_dir():
-    """Tworzy katalog wyników na podstawie liczby rekordów"""
-    record_count = get_record_count()
-    result_dir = os.path.join(RESULTS_DIR, f"records_{record_count}")
-    os.makedirs(result_dir, exist_ok=True)
-    return result_dir
+# Tryby ładowania danych w fazie INSERT (executemany, multirow, load_data)
+INSERT_MODES = ["executemany"]
+# Rozmiary paczek kluczy w scenariuszu odczytu wsadowego
+READ_BATCH_SIZES = [10, 100, 1000]
+# Liczba wierszy w jednej instrukcji UPDATE/DELETE wsadowego
+BULK_BATCH_SIZE = 1000
+# Czy zapisywać surowe czasy pojedynczych zapytań do results/records_N/latency/
+LATENCY_DUMP = False
+# Plik wyników w results/records_N/ - zależy od profilu indeksów
+RESULTS_FILE = "mysql_results.csv"
+# Przebiegi faz: do pliku wyników trafia tylko pierwszy (zimny), statystyki powtórzeń do <db>_stats.csv
+REPEATS = repetitions.Repetitions()
+# Polityka zatwierdzania transakcji w fazach po INSERT (ustawiana w main)
+COMMITS = commit_policy.CommitPolicy()
+# Liczba wierszy w jednym poleceniu INSERT ... VALUES (...),(...)
+MULTIROW_BATCH_SIZE = 1000
 
 
 def measure_time(func):
-    start = time.time()
-    func()
-    return time.time() - start
+    return harness.measure_time(lambda: (func(), COMMITS.tick()))
 
 
-def sample_values(data, field, count):
-    if count == 0:
-        return []
-    # Ograniczamy liczbę próbek do maximum 1000 lub 10% rekordów dla dużych zbiorów danych
-    sample_count = min(count, len(data), max(1000, int(len(data) * 0.1)))
-    return [item[field] for item in random.sample(data, sample_count)]
+def measure_each(func, values):
+    return latency.measure_each(COMMITS.wrap(func), values, keep_samples=LATENCY_DUMP)
 
 
-def log_result(result_dir, operation, entity, total_time, count):
-    avg_time = total_time / count if count else 0
-    result_file = os.path.join(result_dir, "mysql_results.csv")
-    
-    # Sprawdź czy plik istnieje, jeśli nie - utwórz z nagłówkiem
-    file_exists = os.path.isfile(result_file)
-    with open(result_file, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["operation", "database", "entity", "total_time", "avg_time", "record_count"])
-        writer.writerow([
-            operation, "mysql", entity,
-            round(total_time, 4), round(avg_time, 6), count
-        ])
+def log_result(result_dir, operation, entity, total_time, count, histogram=None, errors=None):
+    REPEATS.record(operation, entity, total_time / count if count else 0)
+    if REPEATS.is_cold:
+        harness.write_result(result_dir, RESULTS_FILE, "mysql", operation, entity, total_time, count, histogram,
+                             errors)
 
 
 def connect():
@@ -92,16 +86,52 @@ def insert_all(cursor, table, data, columns):
     cursor.executemany(sql, values)
 
 
-def test_insert(cursor, result_dir, users, products, orders, order_items, reviews):
-    print("📝 INSERT...")
-    log_result(result_dir, "insert", "users", measure_time(lambda: insert_all(cursor, "users", users, users[0].keys())), len(users))
-    log_result(result_dir, "insert", "products", measure_time(lambda: insert_all(cursor, "products", products, products[0].keys())), len(products))
-    log_result(result_dir, "insert", "orders", measure_time(lambda: insert_all(cursor, "orders", orders, orders[0].keys())), len(orders))
-    log_result(result_dir, "insert", "order_items", measure_time(lambda: insert_all(cursor, "order_items", order_items, order_items[0].keys())), len(order_items))
-    log_result(result_dir, "insert", "reviews", measure_time(lambda: insert_all(cursor, "reviews", reviews, reviews[0].keys())), len(reviews))
-
-
-def test_read(cursor, result_dir, users, products, orders, reviews):
+def insert_multirow(cursor, table, data, columns, batch_size):
+    columns = list(columns)
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    for start in range(0, len(data), batch_size):
+        batch = data[start:start + batch_size]
+        sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([row_placeholder] * len(batch))
+        cursor.execute(sql, [row[col] for row in batch for col in columns])
+
+
+def load_data_infile(cursor, table, columns):
+    # Pliki CSV z generate_data.py mają nagłówek i wiersze zakończone \r\n
+    path = os.path.abspath(os.path.join(DATA_DIR, f"{table}.csv")).replace("\\", "/")
+    cursor.execute(f"""
+        LOAD DATA LOCAL INFILE '{path}'
+        INTO TABLE {table}
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+        LINES TERMINATED BY '\\r\\n'
+        IGNORE 1 LINES
+        ({', '.join(columns)})
+    """)
+
+
+def insert_table(cursor, mode, table, data, batch_size):
+    if mode == "executemany":
+        insert_all(cursor, table, data, data[0].keys())
+    elif mode == "multirow":
+        insert_multirow(cursor, table, data, data[0].keys(), batch_size)
+    elif mode == "load_data":
+        load_data_infile(cursor, table, data[0].keys())
+    else:
+        raise ValueError(f"Nieznany tryb INSERT: {mode}")
+
+
+def test_insert(cursor, result_dir, users, products, orders, order_items, reviews,
+                mode="executemany", batch_size=MULTIROW_BATCH_SIZE):
+    print(f"📝 INSERT ({mode})...")
+    # executemany zachowuje dotychczasowe etykiety, pozostałe tryby dostają sufiks
+    suffix = "" if mode == "executemany" else f"_{mode}"
+    tables = [("users", users), ("products", products), ("orders", orders),
+              ("order_items", order_items), ("reviews", reviews)]
+    for table, data in tables:
+        log_result(result_dir, "insert", f"{table}{suffix}",
+                   measure_time(lambda: insert_table(cursor, mode, table, data, batch_size)), len(data))
+
+
+def test_read(cursor, result_dir, users, products, orders, reviews, read_keys):
     print("🔍 READ...")
     # Ograniczamy liczbę próbek dla dużych zbiorów danych
     record_count = get_record_count()
@@ -112,26 +142,57 @@ def test_read(cursor, result_dir, users, products, orders, reviews):
     o_count = min(len(orders) // 10, sample_size)
     r_count = min(len(reviews) // 10, sample_size)
     
-    log_result(result_dir, "read", "users", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM users WHERE email = %s", (email,)), cursor.fetchall())
-        for email in sample_values(users, "email", u_count)
-    ]), u_count)
-    log_result(result_dir, "read", "products", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM products WHERE name = %s", (name,)), cursor.fetchall())
-        for name in sample_values(products, "name", p_count)
-    ]), p_count)
-    log_result(result_dir, "read", "products_by_id", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM products WHERE id = %s", (pid,)), cursor.fetchall())
-        for pid in sample_values(products, "id", p_count)
-    ]), p_count)
-    log_result(result_dir, "read", "orders", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM orders WHERE user_id = %s", (uid,)), cursor.fetchall())
-        for uid in sample_values(orders, "user_id", o_count)
-    ]), o_count)
-    log_result(result_dir, "read", "reviews", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM reviews WHERE product_id = %s", (pid,)), cursor.fetchall())
-        for pid in sample_values(reviews, "product_id", r_count)
-    ]), r_count)
+    # Klucze zapamiętywane w read_keys - test_batched_read pobiera paczkami dokładnie te same
+    read_keys.update({
+        "users": sample_values(users, "email", u_count),
+        "products": sample_values(products, "name", p_count),
+        "products_by_id": sample_values(products, "id", p_count),
+        "orders": sample_values(orders, "user_id", o_count),
+        "reviews": sample_values(reviews, "product_id", r_count),
+    })
+
+    total_time, histogram = measure_each(
+        lambda email: (cursor.execute("SELECT * FROM users WHERE email = %s", (email,)), cursor.fetchall()),
+        read_keys["users"])
+    log_result(result_dir, "read", "users", total_time, u_count, histogram)
+    total_time, histogram = measure_each(
+        lambda name: (cursor.execute("SELECT * FROM products WHERE name = %s", (name,)), cursor.fetchall()),
+        read_keys["products"])
+    log_result(result_dir, "read", "products", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: (cursor.execute("SELECT * FROM products WHERE id = %s", (pid,)), cursor.fetchall()),
+        read_keys["products_by_id"])
+    log_result(result_dir, "read", "products_by_id", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda uid: (cursor.execute("SELECT * FROM orders WHERE user_id = %s", (uid,)), cursor.fetchall()),
+        read_keys["orders"])
+    log_result(result_dir, "read", "orders", total_time, o_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: (cursor.execute("SELECT * FROM reviews WHERE product_id = %s", (pid,)), cursor.fetchall()),
+        read_keys["reviews"])
+    log_result(result_dir, "read", "reviews", total_time, r_count, histogram)
+
+
+def test_batched_read(cursor, result_dir, read_keys, batch_sizes):
+    print("📦 BATCHED READ...")
+    # Te same klucze co w ostatnim przebiegu test_read, pobierane paczkami (IN (...))
+    scenarios = [
+        ("users", "SELECT * FROM users WHERE email IN ({keys})"),
+        ("products", "SELECT * FROM products WHERE name IN ({keys})"),
+        ("products_by_id", "SELECT * FROM products WHERE id IN ({keys})"),
+        ("orders", "SELECT * FROM orders WHERE user_id IN ({keys})"),
+        ("reviews", "SELECT * FROM reviews WHERE product_id IN ({keys})"),
+    ]
+    for entity, sql in scenarios:
+        count = len(read_keys[entity])
+        for batch_size in batch_sizes:
+            total_time, histogram = measure_each(
+                lambda batch: (cursor.execute(sql.format(keys=", ".join(["%s"] * len(batch))), batch),
+                               cursor.fetchall()),
+                chunked(read_keys[entity], batch_size))
+            # avg_time liczony na klucz - porównywalny z pojedynczymi odczytami
+            log_result(result_dir, "read", f"{entity}_batch{batch_size}", total_time, count,
+                       errors=histogram.errors)
 
 
 def test_update(cursor, result_dir, users, products, orders, reviews):
@@ -145,27 +206,266 @@ def test_update(cursor, result_dir, users, products, orders, reviews):
     o_count = min(len(orders) // 10, sample_size)
     r_count = min(len(reviews) // 10, sample_size)
     
-    log_result(result_dir, "update", "users", measure_time(lambda: [
-        cursor.execute("UPDATE users SET registration_date = %s WHERE email = %s",
-                       (datetime.now(timezone.utc), email))
-        for email in sample_values(users, "email", u_count)
-    ]), u_count)
-    log_result(result_dir, "update", "products", measure_time(lambda: [
-        cursor.execute("UPDATE products SET stock = stock + 1 WHERE name = %s", (name,))
-        for name in sample_values(products, "name", p_count)
-    ]), p_count)
-    log_result(result_dir, "update", "products_by_id", measure_time(lambda: [
-        cursor.execute("UPDATE products SET stock = stock + 1 WHERE id = %s", (pid,))
-        for pid in sample_values(products, "id", p_count)
-    ]), p_count)
-    log_result(result_dir, "update", "orders", measure_time(lambda: [
-        cursor.execute("UPDATE orders SET status = 'Completed' WHERE id = %s", (oid,))
-        for oid in sample_values(orders, "id", o_count)
-    ]), o_count)
-    log_result(result_dir, "update", "reviews", measure_time(lambda: [
-        cursor.execute("UPDATE reviews SET rating = 5 WHERE id = %s", (rid,))
-        for rid in sample_values(reviews, "id", r_count)
-    ]), r_count)
+    total_time, histogram = measure_each(
+        lambda email: cursor.execute("UPDATE users SET registration_date = %s WHERE email = %s",
+                                     (datetime.now(timezone.utc), email)),
+        sample_values(users, "email", u_count))
+    log_result(result_dir, "update", "users", total_time, u_count, histogram)
+    total_time, histogram = measure_each(
+        lambda name: cursor.execute("UPDATE products SET stock = stock + 1 WHERE name = %s", (name,)),
+        sample_values(products, "name", p_count))
+    log_result(result_dir, "update", "products", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: cursor.execute("UPDATE products SET stock = stock + 1 WHERE id = %s", (pid,)),
+        sample_values(products, "id", p_count))
+    log_result(result_dir, "update", "products_by_id", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("UPDATE orders SET status = 'Completed' WHERE id = %s", (oid,)),
+        sample_values(orders, "id", o_count))
+    log_result(result_dir, "update", "orders", total_time, o_count, histogram)
+    total_time, histogram = measure_each(
+        lambda rid: cursor.execute("UPDATE reviews SET rating = 5 WHERE id = %s", (rid,)),
+        sample_values(reviews, "id", r_count))
+    log_result(result_dir, "update", "reviews", total_time, r_count, histogram)
+
+
+def bulk_update_scenarios(users, products, orders, reviews, count_fn):
+    """Scenariusze UPDATE wsadowego: (encja, tabela, klucz, kolumna, przypisanie, klucze, wartość)"""
+    now = datetime.now(timezone.utc)
+    return [
+        ("users", "users", "email", "registration_date", "{value}",
+         sample_values(users, "email", count_fn(users)), now),
+        ("products", "products", "name", "stock", "stock + {value}",
+         sample_values(products, "name", count_fn(products)), 1),
+        ("products_by_id", "products", "id", "stock", "stock + {value}",
+         sample_values(products, "id", count_fn(products)), 1),
+        ("orders", "orders", "id", "status", "{value}",
+         sample_values(orders, "id", count_fn(orders)), "Completed"),
+        ("reviews", "reviews", "id", "rating", "{value}",
+         sample_values(reviews, "id", count_fn(reviews)), 5),
+    ]
+
+
+def bulk_delete_scenarios(users, products, orders, reviews, count_fn):
+    """Scenariusze DELETE wsadowego: (encja, tabela, klucz, klucze)"""
+    return [
+        ("reviews", "reviews", "id", sample_values(reviews, "id", count_fn(reviews))),
+        ("order_items", "order_items", "order_id", sample_values(orders, "id", count_fn(orders))),
+        ("orders", "orders", "id", sample_values(orders, "id", count_fn(orders))),
+        ("products_by_id", "products", "id", sample_values(products, "id", count_fn(products))),
+        ("users", "users", "email", sample_values(users, "email", count_fn(users))),
+    ]
+
+
+def update_case_batch(cursor, table, key, column, assignment, keys, value):
+    """Jeden UPDATE z wyrażeniem CASE dla całej paczki kluczy"""
+    case = f"CASE {key} {' '.join(['WHEN %s THEN %s'] * len(keys))} END"
+    placeholders = ", ".join(["%s"] * len(keys))
+    params = [p for k in keys for p in (k, value)] + list(keys)
+    cursor.execute(f"UPDATE {table} SET {column} = {assignment.format(value=case)} "
+                   f"WHERE {key} IN ({placeholders})", params)
+
+
+def test_bulk_update(cursor, result_dir, users, products, orders, reviews, batch_size):
+    print("📦 BULK UPDATE...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 10, 1000)  # jak w test_update
+    scenarios = bulk_update_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 10, sample_size))
+
+    for entity, table, key, column, assignment, keys, value in scenarios:
+        # executemany - sterownik wysyła UPDATE dla każdego wiersza osobno
+        sql = f"UPDATE {table} SET {column} = {assignment.format(value='%s')} WHERE {key} = %s"
+        total_time = measure_time(lambda: cursor.executemany(sql, [(value, k) for k in keys]))
+        log_result(result_dir, "update", f"{entity}_executemany", total_time, len(keys))
+
+        # CASE - jedna instrukcja na batch_size wierszy
+        total_time = measure_time(lambda: [
+            update_case_batch(cursor, table, key, column, assignment, batch, value)
+            for batch in chunked(keys, batch_size)])
+        log_result(result_dir, "update", f"{entity}_case", total_time, len(keys))
+
+
+def test_bulk_delete(cursor, result_dir, users, products, orders, reviews, batch_size):
+    print("📦 BULK DELETE...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 20, 500)  # jak w test_delete
+    scenarios = bulk_delete_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 20, sample_size))
+
+    for entity, table, key, keys in scenarios:
+        # executemany - sterownik wysyła DELETE dla każdego klucza osobno
+        total_time = measure_time(lambda: cursor.executemany(
+            f"DELETE FROM {table} WHERE {key} = %s", [(k,) for k in keys]))
+        log_result(result_dir, "delete", f"{entity}_executemany", total_time, len(keys))
+
+    # Druga próbka, żeby wariant paczkowy nie trafiał w usunięte już wiersze
+    scenarios = bulk_delete_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 20, sample_size))
+    for entity, table, key, keys in scenarios:
+        # IN (...) - jedna instrukcja na batch_size kluczy
+        total_time = measure_time(lambda: [
+            cursor.execute(f"DELETE FROM {table} WHERE {key} IN ({', '.join(['%s'] * len(batch))})", batch)
+            for batch in chunked(keys, batch_size)])
+        log_result(result_dir, "delete", f"{entity}_in_list", total_time, len(keys))
+
+
+def execute_query(cursor, sql, params, fetch):
+    cursor.execute(sql, params)
+    if fetch:
+        cursor.fetchall()
+
+
+def test_prepared(conn, cursor, result_dir, dataset):
+    print("📌 PREPARED STATEMENTS...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 10, 1000)  # jak w test_read/test_update
+
+    # Kursor binarny (COM_STMT_PREPARE) przygotowuje zapytanie raz i wykonuje je dla kolejnych kluczy
+    # Po rozgrzewce, w naprzemiennej kolejności trybów - żaden nie dostaje zawsze cieplejszych buforów
+    prepared_cursor = conn.cursor(prepared=True)
+    for index, (operation, entity, table, field, sql, params) in enumerate(prepared.POINT_QUERIES):
+        data = dataset[table]
+        count = min(len(data) // 10, sample_size)
+        keys = sample_values(data, field, count)
+        fetch = operation == "read"
+        text_time, total_time, histogram = prepared.measure_modes(
+            measure_each,
+            lambda key: execute_query(cursor, sql, params(key), fetch),
+            lambda key: execute_query(prepared_cursor, sql, params(key), fetch),
+            keys, index % 2 == 1)
+
+        log_result(result_dir, operation, f"{entity}_prepared", total_time, count, histogram)
+        prepared.log_saving(result_dir, "mysql", operation, entity, count, text_time, total_time)
+    prepared_cursor.close()
+
+
+def sweep_client(sql, fetch=False):
+    """Fabryka klientów testu współbieżności - każdy ma własne połączenie w trybie autocommit"""
+    def open_client():
+        conn = connect()
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        def operation(value):
+            cursor.execute(sql, (value,))
+            if fetch:
+                cursor.fetchall()
+
+        def close():
+            cursor.close()
+            conn.close()
+
+        return operation, close
+    return open_client
+
+
+def test_concurrency(result_dir, users, products, orders, levels, ops_per_client):
+    print("👥 CONCURRENCY...")
+    scenarios = [
+        ("read_users", "SELECT * FROM users WHERE email = %s", True, users, "email"),
+        ("read_products_by_id", "SELECT * FROM products WHERE id = %s", True, products, "id"),
+        ("update_products_by_id", "UPDATE products SET stock = stock + 1 WHERE id = %s", False, products, "id"),
+        ("update_orders", "UPDATE orders SET status = 'Completed' WHERE id = %s", False, orders, "id"),
+    ]
+    for scenario, sql, fetch, data, field in scenarios:
+        concurrency.run_sweep(result_dir, "mysql", scenario, sweep_client(sql, fetch),
+                              lambda count: sample_values(data, field, count), levels, ops_per_client)
+
+
+def make_pool(size):
+    # mysql.connector ogranicza rozmiar puli do CNX_POOL_MAXSIZE (32)
+    size = min(size, mysql.connector.pooling.CNX_POOL_MAXSIZE)
+    my_pool = mysql.connector.pooling.MySQLConnectionPool(pool_name=f"bench_pool_{size}", pool_size=size)
+    my_pool.set_config(autocommit=True, **DB_CONFIG)
+    # Połączenia zakładamy sami i zapamiętujemy - close() na połączeniu z puli tylko zwraca je do puli
+    connections = [mysql.connector.connect(autocommit=True, **DB_CONFIG) for _ in range(size)]
+    for cnx in connections:
+        my_pool.add_connection(cnx)
+    # Pierwsze pobranie łączy połączenie ponownie z konfiguracją puli - robimy je przed pomiarem
+    for conn in [my_pool.get_connection() for _ in range(size)]:
+        conn.close()
+
+    def close_all():
+        for cnx in connections:
+            cnx.close()
+
+    return pooling.BlockingPool(size, my_pool.get_connection, lambda conn: conn.close(), close_all)
+
+
+def pool_query(sql, fetch=False):
+    def query(conn, value):
+        cursor = conn.cursor()
+        cursor.execute(sql, (value,))
+        if fetch:
+            cursor.fetchall()
+        cursor.close()
+    return query
+
+
+def test_pool_sweep(result_dir, users, products, pool_sizes, client_levels, ops_per_client):
+    print("🏊 POOL SWEEP...")
+    scenarios = [
+        ("read_users", pool_query("SELECT * FROM users WHERE email = %s", fetch=True), users, "email"),
+        ("update_products_by_id", pool_query("UPDATE products SET stock = stock + 1 WHERE id = %s"), products, "id"),
+    ]
+    for scenario, query, data, field in scenarios:
+        pooling.run_pool_sweep(result_dir, "mysql", scenario, make_pool, query,
+                               lambda count: sample_values(data, field, count), pool_sizes, client_levels,
+                               ops_per_client)
+
+
+# Scenariusze trybu asyncio: (encja, zapytanie, tabela z danymi, pole klucza)
+ASYNC_SCENARIOS = {
+    "read": [
+        ("users", "SELECT * FROM users WHERE email = %s", "users", "email"),
+        ("products", "SELECT * FROM products WHERE name = %s", "products", "name"),
+        ("products_by_id", "SELECT * FROM products WHERE id = %s", "products", "id"),
+        ("orders", "SELECT * FROM orders WHERE user_id = %s", "orders", "user_id"),
+        ("reviews", "SELECT * FROM reviews WHERE product_id = %s", "reviews", "product_id"),
+    ],
+    "update": [
+        ("users", "UPDATE users SET registration_date = NOW() WHERE email = %s", "users", "email"),
+        ("products", "UPDATE products SET stock = stock + 1 WHERE name = %s", "products", "name"),
+        ("products_by_id", "UPDATE products SET stock = stock + 1 WHERE id = %s", "products", "id"),
+        ("orders", "UPDATE orders SET status = 'Completed' WHERE id = %s", "orders", "id"),
+        ("reviews", "UPDATE reviews SET rating = 5 WHERE id = %s", "reviews", "id"),
+    ],
+    "delete": [
+        ("reviews", "DELETE FROM reviews WHERE id = %s", "reviews", "id"),
+        ("order_items", "DELETE FROM order_items WHERE order_id = %s", "orders", "id"),
+        ("orders", "DELETE FROM orders WHERE id = %s", "orders", "id"),
+        ("products", "DELETE FROM products WHERE name = %s", "products", "name"),
+        ("products_by_id", "DELETE FROM products WHERE id = %s", "products", "id"),
+        ("users", "DELETE FROM users WHERE email = %s", "users", "email"),
+    ],
+}
+
+
+async def test_async(result_dir, phase, dataset, in_flight):
+    """Faza READ/UPDATE/DELETE wykonywana przez aiomysql z in_flight zapytaniami w locie"""
+    print(f"⚡ {phase.upper()} (asyncio, {in_flight} w locie)...")
+    pool = await aiomysql.create_pool(host=DB_CONFIG['host'], port=DB_CONFIG['port'], user=DB_CONFIG['user'],
+                                      password=DB_CONFIG['password'], db=DB_CONFIG['database'],
+                                      minsize=in_flight, maxsize=in_flight, autocommit=True)
+    divisor, limit = (20, 500) if phase == "delete" else (10, 1000)
+    try:
+        for entity, sql, table, field in ASYNC_SCENARIOS[phase]:
+            data = dataset[table]
+            count = min(len(data) // divisor, limit)
+
+            async def run(value, sql=sql):
+                async with pool.acquire() as conn:
+                    async with conn.cursor() as cursor:
+                        await cursor.execute(sql, (value,))
+                        await cursor.fetchall()
+
+            total_time, histogram = await async_runner.measure_each_async(
+                run, sample_values(data, field, count), in_flight)
+            log_result(result_dir, phase, f"{entity}_async", total_time, count, histogram)
+    finally:
+        pool.close()
+        await pool.wait_closed()
 
 
 def test_delete(cursor, result_dir, users, products, orders, reviews, order_items):
@@ -180,176 +480,424 @@ def test_delete(cursor, result_dir, users, products, orders, reviews, order_item
     r_count = min(len(reviews) // 20, sample_size)
     oi_count = min(len(order_items) // 20, sample_size)
     
-    log_result(result_dir, "delete", "reviews", measure_time(lambda: [
-        cursor.execute("DELETE FROM reviews WHERE id = %s", (rid,))
-        for rid in sample_values(reviews, "id", r_count)
-    ]), r_count)
-
-    log_result(result_dir, "delete", "order_items", measure_time(lambda: [
-        cursor.execute("DELETE FROM order_items WHERE order_id = %s", (oid,))
-        for oid in sample_values(orders, "id", oi_count)
-    ]), oi_count)
-
-    log_result(result_dir, "delete", "orders", measure_time(lambda: [
-        cursor.execute("DELETE FROM orders WHERE id = %s", (oid,))
-        for oid in sample_values(orders, "id", o_count)
-    ]), o_count)
-
-    log_result(result_dir, "delete", "products", measure_time(lambda: [
-        cursor.execute("DELETE FROM products WHERE name = %s", (name,))
-        for name in sample_values(products, "name", p_count)
-    ]), p_count)
-
-    log_result(result_dir, "delete", "products_by_id", measure_time(lambda: [
-        cursor.execute("DELETE FROM products WHERE id = %s", (pid,))
-        for pid in sample_values(products, "id", p_count)
-    ]), p_count)
-
-    log_result(result_dir, "delete", "users", measure_time(lambda: [
-        cursor.execute("DELETE FROM users WHERE email = %s", (email,))
-        for email in sample_values(users, "email", u_count)
-    ]), u_count)
+    total_time, histogram = measure_each(
+        lambda rid: cursor.execute("DELETE FROM reviews WHERE id = %s", (rid,)),
+        sample_values(reviews, "id", r_count))
+    log_result(result_dir, "delete", "reviews", total_time, r_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("DELETE FROM order_items WHERE order_id = %s", (oid,)),
+        sample_values(orders, "id", oi_count))
+    log_result(result_dir, "delete", "order_items", total_time, oi_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("DELETE FROM orders WHERE id = %s", (oid,)),
+        sample_values(orders, "id", o_count))
+    log_result(result_dir, "delete", "orders", total_time, o_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda name: cursor.execute("DELETE FROM products WHERE name = %s", (name,)),
+        sample_values(products, "name", p_count))
+    log_result(result_dir, "delete", "products", total_time, p_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda pid: cursor.execute("DELETE FROM products WHERE id = %s", (pid,)),
+        sample_values(products, "id", p_count))
+    log_result(result_dir, "delete", "products_by_id", total_time, p_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda email: cursor.execute("DELETE FROM users WHERE email = %s", (email,)),
+        sample_values(users, "email", u_count))
+    log_result(result_dir, "delete", "users", total_time, u_count, histogram)
+
+
+# Zapytania złożone - te same teksty służą do pomiaru czasu i do przechwytywania planów
+COMPLEX_QUERIES = {
+    # 1. Najpopularniejsze produkty
+    "popular_products": '''
+        SELECT p.id, p.name, COUNT(oi.product_id) as order_count
+        FROM products p
+        JOIN order_items oi ON p.id = oi.product_id
+        GROUP BY p.id, p.name
+        ORDER BY order_count DESC
+        LIMIT 10
+    ''',
+    # 2. Średnia ocena produktów
+    "avg_product_rating": '''
+        SELECT p.id, p.name, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
+        FROM products p
+        JOIN reviews r ON p.id = r.product_id
+        GROUP BY p.id, p.name
+        HAVING COUNT(r.id) >= 5
+        ORDER BY avg_rating DESC
+        LIMIT 10
+    ''',
+    # 3. Analiza wartości zamówień klientów
+    "customer_spending": '''
+        SELECT u.id, u.email, SUM(oi.price * oi.quantity) as total_spent
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        JOIN order_items oi ON o.id = oi.order_id
+        GROUP BY u.id, u.email
+        ORDER BY total_spent DESC
+        LIMIT 20
+    ''',
+    # 4. Wyszukiwanie produktów z filtrowaniem
+    "product_search": '''
+        SELECT p.id, p.name, p.price
+        FROM products p
+        WHERE (p.name LIKE '%laptop%' OR p.description LIKE '%laptop%')
+        AND p.price BETWEEN 100 AND 500
+        AND p.stock > 0
+        ORDER BY p.price ASC
+    ''',
+    # 5. Dashboard sprzedażowy
+    "sales_dashboard": '''
+        SELECT DATE(o.order_date) as date, 
+              COUNT(o.id) as order_count, 
+              SUM(oi.price * oi.quantity) as revenue
+        FROM orders o
+        JOIN order_items oi ON o.id = oi.order_id
+        WHERE o.order_date >= DATE_SUB(NOW(), INTERVAL 30 DAY)
+        GROUP BY DATE(o.order_date)
+        ORDER BY date
+    ''',
+    # 6. Rekomendacje produktów
+    "product_recommendations": '''
+        SELECT oi1.product_id, oi2.product_id, COUNT(*) as frequency
+        FROM order_items oi1
+        JOIN order_items oi2 ON oi1.order_id = oi2.order_id AND oi1.product_id < oi2.product_id
+        GROUP BY oi1.product_id, oi2.product_id
+        ORDER BY frequency DESC
+        LIMIT 10
+    ''',
+    # 7. Wyświetla tylko recenzje od użytkowników, którzy kupili dany produkt
+    "join_with_comments": '''
+        SELECT 
+            u.id AS user_id,
+            u.email,
+            o.id AS order_id,
+            o.order_date,
+            p.id AS product_id,
+            p.name AS product_name,
+            oi.quantity,
+            oi.price AS item_price,
+            r.rating,
+            r.comment
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        JOIN order_items oi ON o.id = oi.order_id
+        JOIN products p ON oi.product_id = p.id
+        INNER JOIN reviews r ON r.product_id = oi.product_id AND r.user_id = o.user_id
+    ''',
+}
 
 
 def test_complex_queries(cursor, result_dir):
     print("🔍 COMPLEX QUERIES...")
-    
-    # 1. Najpopularniejsze produkty
-    log_result(result_dir, "complex", "popular_products", measure_time(lambda: [
-        cursor.execute('''
-            SELECT p.id, p.name, COUNT(oi.product_id) as order_count
-            FROM products p
-            JOIN order_items oi ON p.id = oi.product_id
-            GROUP BY p.id, p.name
-            ORDER BY order_count DESC
-            LIMIT 10
-        '''), cursor.fetchall()
-    ]), 1)
-
-    
-    # 2. Średnia ocena produktów
-    log_result(result_dir, "complex", "avg_product_rating", measure_time(lambda: [
-        cursor.execute('''
-            SELECT p.id, p.name, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
-            FROM products p
-            JOIN reviews r ON p.id = r.product_id
-            GROUP BY p.id, p.name
-            HAVING COUNT(r.id) >= 5
-            ORDER BY avg_rating DESC
+    for name, sql in COMPLEX_QUERIES.items():
+        log_result(result_dir, "complex", name, measure_time(lambda: [cursor.execute(sql), cursor.fetchall()]), 1)
+
+
+# Indeksowane warianty product_search: nazwa -> ([(indeks, CREATE INDEX ...)], zapytanie)
+SEARCH_VARIANTS = {
+    # FULLTEXT dopasowuje całe słowa, a nie dowolne podciągi jak LIKE '%...%'
+    "fulltext": ([
+        ("bench_idx_products_search_fulltext",
+         "CREATE FULLTEXT INDEX bench_idx_products_search_fulltext ON products (name, description)"),
+    ], '''
+        SELECT p.id, p.name, p.price
+        FROM products p
+        WHERE MATCH(p.name, p.description) AGAINST ('laptop' IN NATURAL LANGUAGE MODE)
+        AND p.price BETWEEN 100 AND 500
+        AND p.stock > 0
+        ORDER BY p.price ASC
+    '''),
+}
+# Liczba wykonań każdego wariantu wyszukiwania
+SEARCH_QUERIES = 20
+
+
+def test_search(conn, cursor, result_dir):
+    print("🔎 PRODUCT SEARCH...")
+
+    def run_queries(variant, sql):
+        total_time, histogram = measure_each(lambda _: (cursor.execute(sql), cursor.fetchall()),
+                                             range(SEARCH_QUERIES))
+        log_result(result_dir, "complex", f"product_search_{variant}", total_time, SEARCH_QUERIES, histogram)
+
+    run_queries("scan", COMPLEX_QUERIES["product_search"])
+    for variant, (indexes, sql) in SEARCH_VARIANTS.items():
+        build_time = measure_time(lambda: [[cursor.execute(create) for _, create in indexes], conn.commit()])
+        log_result(result_dir, "index_build", f"product_search_{variant}", build_time, 1)
+        run_queries(variant, sql)
+        if math.isnan(build_time):
+            # Budowa się nie udała - nie ma czego usuwać
+            continue
+        # Usuwamy od razu, żeby indeksy nie wpływały na kolejne fazy
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name} ON products")
+        conn.commit()
+
+
+def status_counters(cursor):
+    """Liczniki Handler_read_* (sesja) i odczytów z bufora InnoDB (cały serwer)"""
+    cursor.execute("SHOW SESSION STATUS LIKE 'Handler_read%'")
+    counters = {name: int(value) for name, value in cursor.fetchall()}
+    # Innodb_buffer_pool_* nie mają wersji sesyjnej - przyrost obejmuje wszystkie połączenia serwera,
+    # więc jest miarodajny tylko wtedy, gdy w trakcie EXPLAIN ANALYZE serwer nie obsługuje innego ruchu
+    cursor.execute("SHOW GLOBAL STATUS WHERE Variable_name IN "
+                   "('Innodb_buffer_pool_read_requests', 'Innodb_buffer_pool_reads')")
+    counters.update({name: int(value) for name, value in cursor.fetchall()})
+    return counters
+
+
+def save_plan(cursor, result_dir, name, plan, before):
+    """Zapisuje plan z przyrostem liczników od wykonania zapytania (rows examined, trafienia w bufor)"""
+    after = status_counters(cursor)
+    delta = {key: after[key] - before.get(key, 0) for key in after}
+    rows_examined = sum(value for key, value in delta.items() if key.startswith("Handler_read"))
+    buffer_reads = delta.get("Innodb_buffer_pool_reads", 0)
+    buffer_hits = delta.get("Innodb_buffer_pool_read_requests", 0) - buffer_reads
+    plans.save_plan(result_dir, "mysql", name, plan, rows_examined, buffer_hits, buffer_reads)
+
+
+def capture_plans(cursor, result_dir):
+    print("🧭 PLANY ZAPYTAŃ...")
+    for name, sql in COMPLEX_QUERIES.items():
+        # FORMAT=JSON daje strukturę planu, EXPLAIN ANALYZE - rzeczywiste liczby wierszy i czasy
+        cursor.execute(f"EXPLAIN FORMAT=JSON {sql}")
+        plan = {"plan": json.loads(cursor.fetchone()[0])}
+        before = status_counters(cursor)
+        cursor.execute(f"EXPLAIN ANALYZE {sql}")
+        plan["analyze"] = cursor.fetchone()[0].splitlines()
+        save_plan(cursor, result_dir, name, plan, before)
+
+
+# Agregaty dashboardów w tabelach podsumowań odświeżanych wsadowo:
+# (definicja - klucz w pierwszej kolumnie, klucz, odczyt z tabeli podsumowań)
+SUMMARY_TABLES = {
+    "popular_products": (
+        "SELECT product_id, COUNT(*) AS order_count FROM order_items GROUP BY product_id",
+        "product_id",
+        '''
+            SELECT p.id, p.name, s.order_count
+            FROM summary_popular_products s
+            JOIN products p ON p.id = s.product_id
+            ORDER BY s.order_count DESC
             LIMIT 10
-        '''), cursor.fetchall()
-    ]), 1)
-
-    
-    # 3. Analiza wartości zamówień klientów
-    log_result(result_dir, "complex", "customer_spending", measure_time(lambda: [
-        cursor.execute('''
-            SELECT u.id, u.email, SUM(oi.price * oi.quantity) as total_spent
-            FROM users u
-            JOIN orders o ON u.id = o.user_id
+        '''),
+    "customer_spending": (
+        '''
+            SELECT o.user_id, SUM(oi.price * oi.quantity) AS total_spent
+            FROM orders o
             JOIN order_items oi ON o.id = oi.order_id
-            GROUP BY u.id, u.email
-            ORDER BY total_spent DESC
+            GROUP BY o.user_id
+        ''',
+        "user_id",
+        '''
+            SELECT u.id, u.email, s.total_spent
+            FROM summary_customer_spending s
+            JOIN users u ON u.id = s.user_id
+            ORDER BY s.total_spent DESC
             LIMIT 20
         '''),
-        cursor.fetchall()
-    ]), 1)
-    
-    # 4. Wyszukiwanie produktów z filtrowaniem
-    log_result(result_dir, "complex", "product_search", measure_time(lambda: [
-        cursor.execute('''
-            SELECT p.id, p.name, p.price
-            FROM products p
-            WHERE (p.name LIKE '%laptop%' OR p.description LIKE '%laptop%')
-            AND p.price BETWEEN 100 AND 500
-            AND p.stock > 0
-            ORDER BY p.price ASC
-        '''),
-        cursor.fetchall()
-    ]), 1)
-    
-    # 5. Dashboard sprzedażowy
-    log_result(result_dir, "complex", "sales_dashboard", measure_time(lambda: [
-        cursor.execute('''
-            SELECT DATE(o.order_date) as date, 
-                  COUNT(o.id) as order_count, 
-                  SUM(oi.price * oi.quantity) as revenue
+    "sales_dashboard": (
+        '''
+            SELECT DATE(o.order_date) AS date, COUNT(o.id) AS order_count, SUM(oi.price * oi.quantity) AS revenue
             FROM orders o
             JOIN order_items oi ON o.id = oi.order_id
-            WHERE o.order_date >= DATE_SUB(NOW(), INTERVAL 30 DAY)
             GROUP BY DATE(o.order_date)
+        ''',
+        "date",
+        '''
+            SELECT date, order_count, revenue
+            FROM summary_sales_dashboard
+            WHERE date >= DATE_SUB(CURDATE(), INTERVAL 30 DAY)
             ORDER BY date
         '''),
-        cursor.fetchall()
-    ]), 1)
-    
-    # 6. Rekomendacje produktów
-    log_result(result_dir, "complex", "product_recommendations", measure_time(lambda: [
-        cursor.execute('''
-            SELECT oi1.product_id, oi2.product_id, COUNT(*) as frequency
-            FROM order_items oi1
-            JOIN order_items oi2 ON oi1.order_id = oi2.order_id AND oi1.product_id < oi2.product_id
-            GROUP BY oi1.product_id, oi2.product_id
-            ORDER BY frequency DESC
-            LIMIT 10
-        '''), cursor.fetchall()
-    ]), 1)
+}
 
-    # 7. Wyświetla tylko recenzje od użytkowników, którzy kupili dany produkt
-    log_result(result_dir, "complex", "join_with_comments", measure_time(lambda: [
-        cursor.execute('''
-            SELECT 
-                u.id AS user_id,
-                u.email,
-                o.id AS order_id,
-                o.order_date,
-                p.id AS product_id,
-                p.name AS product_name,
-                oi.quantity,
-                oi.price AS item_price,
-                r.rating,
-                r.comment
-            FROM users u
-            JOIN orders o ON u.id = o.user_id
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN products p ON oi.product_id = p.id
-            INNER JOIN reviews r ON r.product_id = oi.product_id AND r.user_id = o.user_id
-        '''),
-        cursor.fetchall()
-    ]), 1)
 
+def test_materialized(conn, cursor, result_dir):
+    print("🧊 SUMMARY TABLES...")
+    build_times, read_times = {}, {}
+    for name, (definition, key, read_sql) in SUMMARY_TABLES.items():
+        build_times[name] = measure_time(lambda: [
+            cursor.execute(f"DROP TABLE IF EXISTS summary_{name}"),
+            cursor.execute(f"CREATE TABLE summary_{name} (PRIMARY KEY ({key})) {definition}"),
+            conn.commit()
+        ])
+        total_time, histogram = measure_each(lambda _: (cursor.execute(read_sql), cursor.fetchall()),
+                                             range(materialized.MATERIALIZED_READS))
+        log_result(result_dir, "complex", f"{name}_materialized", total_time,
+                   materialized.MATERIALIZED_READS, histogram)
+        read_times[name] = total_time / materialized.MATERIALIZED_READS
+
+    # Nowe dane po zbudowaniu tabel - mierzymy, jak bardzo są nieaktualne i ile kosztuje odświeżenie
+    cursor.execute("SELECT MAX(id) FROM order_items")
+    burst_from = cursor.fetchone()[0]
+    cursor.execute(materialized.WRITE_BURST_SQL)
+    conn.commit()
+    for name, (definition, key, read_sql) in SUMMARY_TABLES.items():
+        cursor.execute(definition)
+        live = materialized.rows_by_key(cursor.fetchall())
+        cursor.execute(f"SELECT * FROM summary_{name}")
+        stale = materialized.stale_rows(live, materialized.rows_by_key(cursor.fetchall()))
+        # Podmiana zawartości w jednej transakcji - czytelnicy widzą starą wersję do commitu
+        refresh_time = measure_time(lambda: [
+            cursor.execute(f"DELETE FROM summary_{name}"),
+            cursor.execute(f"INSERT INTO summary_{name} {definition}"),
+            conn.commit()
+        ])
+        materialized.log_view(result_dir, "mysql", name, build_times[name], read_times[name],
+                              stale, len(live), refresh_time)
+    cursor.execute(materialized.WRITE_BURST_CLEANUP_SQL, (burst_from,))
+    conn.commit()
 
-def main():
+
+def main(insert_modes=INSERT_MODES, batch_size=MULTIROW_BATCH_SIZE, latency_dump=LATENCY_DUMP,
+         concurrency_levels=None, ops_per_client=concurrency.OPS_PER_CLIENT,
+         execution="sync", async_in_flight=async_runner.ASYNC_IN_FLIGHT,
+         pool_sizes=None, pool_client_levels=pooling.POOL_CLIENT_LEVELS,
+         read_batch_sizes=READ_BATCH_SIZES, bulk_batch_size=BULK_BATCH_SIZE,
+         prepared_statements=False, index_profile="none", query_plans=True,
+         warmup=repetitions.WARMUP, repeat=repetitions.REPETITIONS,
+         commit_mode="single", commit_every=commit_policy.COMMIT_EVERY, materialized_views=False,
+         search=False, dataset=None):
+    if execution != "sync" and aiomysql is None:
+        raise SystemExit("❌ Tryb asyncio wymaga pakietu aiomysql (pip install aiomysql).")
+    global LATENCY_DUMP, RESULTS_FILE, COMMITS
+    LATENCY_DUMP = latency_dump
+    RESULTS_FILE = index_profiles.results_file("mysql", index_profile)
     result_dir = setup_results_dir()
     
-    print("🔄 Wczytywanie danych CSV...")
-    users = load_csv("users.csv")
-    products = load_csv("products.csv")
-    orders = load_csv("orders.csv")
-    order_items = load_csv("order_items.csv")
-    reviews = load_csv("reviews.csv")
+    if dataset is None:
+        print("🔄 Wczytywanie danych...")
+        dataset = harness.load_dataset()
+    users, products, orders = dataset["users"], dataset["products"], dataset["orders"]
+    order_items, reviews = dataset["order_items"], dataset["reviews"]
 
     print("🔌 Łączenie z bazą MySQL...")
     conn = connect()
     cursor = conn.cursor()
-
-    clear_tables(cursor)
-    test_insert(cursor, result_dir, users, products, orders, order_items, reviews)
+    index_profiles.apply_profile(cursor, "mysql", index_profile)
     conn.commit()
 
-    test_read(cursor, result_dir, users, products, orders, reviews)
-    test_update(cursor, result_dir, users, products, orders, reviews)
+    # Każdy tryb ładuje dane od zera, ostatni pozostawia je dla kolejnych testów
+    for mode in insert_modes:
+        clear_tables(cursor)
+        conn.commit()
+        test_insert(cursor, result_dir, users, products, orders, order_items, reviews, mode, batch_size)
+        conn.commit()
+
+    COMMITS = commit_policy.CommitPolicy(commit_mode, commit_every)
+    COMMITS.attach(conn)
+
+    if execution in ("sync", "both"):
+        # Fazy niszczące dane (INSERT, DELETE) nie są powtarzane
+        read_keys = {}
+        REPEATS.run_phase(lambda: test_read(cursor, result_dir, users, products, orders, reviews, read_keys), warmup, repeat)
+        REPEATS.run_phase(lambda: test_batched_read(cursor, result_dir, read_keys, read_batch_sizes), warmup, repeat)
+        REPEATS.run_phase(lambda: test_update(cursor, result_dir, users, products, orders, reviews), warmup, repeat)
+        REPEATS.run_phase(lambda: test_bulk_update(cursor, result_dir, users, products, orders, reviews,
+                                                   bulk_batch_size), warmup, repeat)
+        if prepared_statements:
+            test_prepared(conn, cursor, result_dir, dataset)
+    if execution in ("async", "both"):
+        # Połączenia z puli nie mogą czekać na blokady otwartej transakcji
+        conn.commit()
+        asyncio.run(test_async(result_dir, "read", dataset, async_in_flight))
+        asyncio.run(test_async(result_dir, "update", dataset, async_in_flight))
+
+    if concurrency_levels:
+        # Klienci testu współbieżności nie mogą czekać na blokady otwartej transakcji
+        conn.commit()
+        test_concurrency(result_dir, users, products, orders, concurrency_levels, ops_per_client)
+
+    if pool_sizes:
+        conn.commit()
+        test_pool_sweep(result_dir, users, products, pool_sizes, pool_client_levels, ops_per_client)
     
     # Testy złożonych zapytań
-    test_complex_queries(cursor, result_dir)
+    REPEATS.run_phase(lambda: test_complex_queries(cursor, result_dir), warmup, repeat)
+    if query_plans:
+        capture_plans(cursor, result_dir)
+    if search:
+        test_search(conn, cursor, result_dir)
+    if materialized_views:
+        test_materialized(conn, cursor, result_dir)
     
-    test_delete(cursor, result_dir, users, products, orders, reviews, order_items)
+    if execution in ("sync", "both"):
+        test_delete(cursor, result_dir, users, products, orders, reviews, order_items)
+        test_bulk_delete(cursor, result_dir, users, products, orders, reviews, bulk_batch_size)
     conn.commit()
+    if execution in ("async", "both"):
+        asyncio.run(test_async(result_dir, "delete", dataset, async_in_flight))
 
+    REPEATS.write_stats(result_dir, "mysql")
     cursor.close()
     conn.close()
-    print(f"✅ Testy zakończone. Wyniki zapisane w '{result_dir}/mysql_results.csv'")
+    print(f"✅ Testy zakończone. Wyniki zapisane w '{result_dir}/{RESULTS_FILE}'")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Testy wydajności CRUD dla MySQL")
+    parser.add_argument("--insert-modes", nargs="+", default=INSERT_MODES,
+                        choices=["executemany", "multirow", "load_data"],
+                        help="Tryby ładowania danych w fazie INSERT (uruchamiane po kolei)")
+    parser.add_argument("--batch-size", type=int, default=MULTIROW_BATCH_SIZE,
+                        help="Liczba wierszy w jednym wielowierszowym INSERT")
+    parser.add_argument("--latency-dump", action="store_true",
+                        help="Zapisz surowe czasy pojedynczych zapytań (ns) dla każdej encji")
+    parser.add_argument("--concurrency", action="store_true",
+                        help="Uruchom test skalowania READ/UPDATE dla wielu równoległych klientów")
+    parser.add_argument("--concurrency-levels", nargs="+", type=int, default=concurrency.CONCURRENCY_LEVELS,
+                        help="Liczby równoległych klientów w teście skalowania")
+    parser.add_argument("--ops-per-client", type=int, default=concurrency.OPS_PER_CLIENT,
+                        help="Liczba zapytań wykonywanych przez każdego klienta")
+    parser.add_argument("--execution", choices=["sync", "async", "both"], default="sync",
+                        help="Tryb wykonania faz READ/UPDATE/DELETE: synchroniczny, asyncio lub oba")
+    parser.add_argument("--async-in-flight", type=int, default=async_runner.ASYNC_IN_FLIGHT,
+                        help="Liczba zapytań w locie w trybie asyncio")
+    parser.add_argument("--pool-sweep", action="store_true",
+                        help="Uruchom test puli połączeń: rozmiar puli względem liczby klientów")
+    parser.add_argument("--pool-sizes", nargs="+", type=int, default=pooling.POOL_SIZES,
+                        help="Rozmiary puli połączeń w teście puli")
+    parser.add_argument("--pool-clients", nargs="+", type=int, default=pooling.POOL_CLIENT_LEVELS,
+                        help="Liczby równoległych klientów w teście puli")
+    parser.add_argument("--read-batch-sizes", nargs="*", type=int, default=READ_BATCH_SIZES,
+                        help="Rozmiary paczek kluczy w odczycie wsadowym (brak wartości wyłącza scenariusz)")
+    parser.add_argument("--bulk-batch-size", type=int, default=BULK_BATCH_SIZE,
+                        help="Liczba wierszy w jednej instrukcji UPDATE/DELETE wsadowego")
+    parser.add_argument("--prepared", action="store_true",
+                        help="Porównaj zapytania punktowe READ/UPDATE przez prepared statements z protokołem tekstowym")
+    parser.add_argument("--index-profile", choices=list(index_profiles.INDEX_PROFILES), default="none",
+                        help="Profil indeksów drugorzędnych (wyniki trafiają do <db>_<profil>_indexes.csv)")
+    parser.add_argument("--skip-plans", action="store_true",
+                        help="Nie zapisuj planów wykonania zapytań złożonych do results/records_N/plans/")
+    parser.add_argument("--warmup", type=int, default=repetitions.WARMUP,
+                        help="Liczba przebiegów rozgrzewkowych (odrzucanych) po pierwszym, zimnym przebiegu")
+    parser.add_argument("--repetitions", type=int, default=repetitions.REPETITIONS,
+                        help="Liczba mierzonych ciepłych powtórzeń faz READ/UPDATE/COMPLEX (statystyki w <db>_stats.csv)")
+    parser.add_argument("--commit-policy", choices=commit_policy.COMMIT_POLICIES, default="single",
+                        help="Zatwierdzanie transakcji po INSERT: jedna transakcja, autocommit lub commit co N operacji")
+    parser.add_argument("--commit-every", type=int, default=commit_policy.COMMIT_EVERY,
+                        help="Liczba operacji między commitami w polityce every_n")
+    parser.add_argument("--materialized", action="store_true",
+                        help="Porównaj agregaty dashboardów liczone z góry: odczyt, nieaktualność i koszt odświeżenia")
+    parser.add_argument("--search", action="store_true",
+                        help="Porównaj product_search (LIKE) z indeksowanymi wariantami wyszukiwania")
+    args = parser.parse_args()
+
+    with harness.tag_partial_run():
+        main(args.insert_modes, args.batch_size, args.latency_dump,
+             args.concurrency_levels if args.concurrency else None, args.ops_per_client,
+             args.execution, args.async_in_flight,
+             args.pool_sizes if args.pool_sweep else None, args.pool_clients,
+             args.read_batch_sizes, args.bulk_batch_size, args.prepared,
+             args.index_profile, not args.skip_plans, args.warmup, args.repetitions,
+             args.commit_policy, args.commit_every, args.materialized,
+             args.search)
\ No newline at end of file
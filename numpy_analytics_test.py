@@ -0,0 +1,178 @@
+import math
+import os
+
+import columnar
+import harness
+from harness import DATA_DIR, TABLES, measure_time, setup_results_dir, write_result
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def log_result(result_dir, operation, entity, total_time, count):
+    write_result(result_dir, "numpy_results.csv", "numpy", operation, entity, total_time, count)
+
+
+def load_columns(table):
+    """Wczytuje wszystkie kolumny tabeli do pamięci (bez mmap - liczymy same zapytania)"""
+    directory = columnar.table_dir(DATA_DIR, table)
+    return {name: np.load(os.path.join(directory, f"{name}.npy")) for name in columnar.SCHEMA[table]}
+
+
+def positions(ids, keys):
+    """Join po kluczu: pozycje wartości keys w kolumnie ids (searchsorted po argsort)"""
+    order = np.argsort(ids, kind="stable")
+    found = np.searchsorted(ids, keys, sorter=order)
+    return order[np.clip(found, 0, len(ids) - 1)]
+
+
+def top(values, count):
+    """Indeksy count największych wartości, malejąco"""
+    return np.argsort(-values, kind="stable")[:count]
+
+
+def popular_products(t):
+    # 1. Najpopularniejsze produkty
+    counts = np.bincount(t["order_items"]["product_id"])
+    best = top(counts, 10)
+    best = best[counts[best] > 0]
+    products = t["products"]
+    return best, products["name"][positions(products["id"], best)], counts[best]
+
+
+def avg_product_rating(t):
+    # 2. Średnia ocena produktów (co najmniej 5 recenzji)
+    reviews = t["reviews"]
+    counts = np.bincount(reviews["product_id"])
+    sums = np.bincount(reviews["product_id"], weights=reviews["rating"])
+    candidates = np.flatnonzero(counts >= 5)
+    averages = sums[candidates] / counts[candidates]
+    best = candidates[top(averages, 10)]
+    products = t["products"]
+    return best, products["name"][positions(products["id"], best)], sums[best] / counts[best], counts[best]
+
+
+def customer_spending(t):
+    # 3. Analiza wartości zamówień klientów
+    items, orders, users = t["order_items"], t["orders"], t["users"]
+    item_users = orders["user_id"][positions(orders["id"], items["order_id"])]
+    spent = np.bincount(item_users, weights=items["price"] * items["quantity"])
+    best = top(spent, 20)
+    best = best[spent[best] > 0]
+    return best, users["email"][positions(users["id"], best)], spent[best]
+
+
+def product_search(t):
+    # 4. Wyszukiwanie produktów z filtrowaniem (LIKE '%laptop%' - z rozróżnianiem wielkości liter)
+    products = t["products"]
+    matches = (np.char.find(products["name"], "laptop") >= 0) | (np.char.find(products["description"], "laptop") >= 0)
+    mask = matches & (products["price"] >= 100) & (products["price"] <= 500) & (products["stock"] > 0)
+    found = np.flatnonzero(mask)
+    found = found[np.argsort(products["price"][found], kind="stable")]
+    return products["id"][found], products["name"][found], products["price"][found]
+
+
+def sales_dashboard(t):
+    # 5. Dashboard sprzedażowy - ostatnie 30 dni
+    items, orders = t["order_items"], t["orders"]
+    item_dates = orders["order_date"][positions(orders["id"], items["order_id"])]
+    recent = item_dates >= np.datetime64("now") - np.timedelta64(30, "D")
+    days, day_index = np.unique(item_dates[recent].astype("datetime64[D]"), return_inverse=True)
+    revenue = np.bincount(day_index, weights=(items["price"] * items["quantity"])[recent], minlength=len(days))
+    return days, np.bincount(day_index, minlength=len(days)), revenue
+
+
+def product_recommendations(t):
+    # 6. Rekomendacje produktów - pary różnych produktów w tym samym zamówieniu
+    items = t["order_items"]
+    order = np.lexsort((items["product_id"], items["order_id"]))
+    order_ids, product_ids = items["order_id"][order], items["product_id"][order]
+    pair_keys = []
+    # Po sortowaniu (order_id, product_id) para (i, i + k) z tego samego zamówienia ma product_id[i] <= product_id[i + k]
+    for offset in range(1, len(order_ids)):
+        same = order_ids[:-offset] == order_ids[offset:]
+        if not same.any():
+            break
+        first, second = product_ids[:-offset][same], product_ids[offset:][same]
+        distinct = first < second
+        pair_keys.append(first[distinct] * (product_ids.max() + 1) + second[distinct])
+    keys, frequency = np.unique(np.concatenate(pair_keys) if pair_keys else np.array([], dtype=np.int64),
+                                return_counts=True)
+    best = top(frequency, 10)
+    return keys[best] // (product_ids.max() + 1), keys[best] % (product_ids.max() + 1), frequency[best]
+
+
+def join_with_comments(t):
+    # 7. Recenzje od użytkowników, którzy kupili dany produkt (join wiele-do-wielu po (user_id, product_id))
+    users, orders, items, products, reviews = (t["users"], t["orders"], t["order_items"],
+                                               t["products"], t["reviews"])
+    item_orders = positions(orders["id"], items["order_id"])
+    item_users = orders["user_id"][item_orders]
+    width = max(items["product_id"].max(), reviews["product_id"].max()) + 1
+    item_keys = item_users * width + items["product_id"]
+    review_keys = reviews["user_id"] * width + reviews["product_id"]
+
+    review_order = np.argsort(review_keys, kind="stable")
+    sorted_keys = review_keys[review_order]
+    starts = np.searchsorted(sorted_keys, item_keys, side="left")
+    counts = np.searchsorted(sorted_keys, item_keys, side="right") - starts
+    item_rows = np.repeat(np.arange(len(item_keys)), counts)
+    # Pozycje kolejnych dopasowanych recenzji w obrębie zakresu [start, start + count)
+    offsets = np.arange(len(item_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    review_rows = review_order[np.repeat(starts, counts) + offsets]
+
+    order_rows = item_orders[item_rows]
+    user_rows = positions(users["id"], item_users[item_rows])
+    product_rows = positions(products["id"], items["product_id"][item_rows])
+    return (users["id"][user_rows], users["email"][user_rows],
+            orders["id"][order_rows], orders["order_date"][order_rows],
+            products["id"][product_rows], products["name"][product_rows],
+            items["quantity"][item_rows], items["price"][item_rows],
+            reviews["rating"][review_rows], reviews["comment"][review_rows])
+
+
+# Zapytanie -> (funkcja, tabele, których potrzebuje)
+COMPLEX_QUERIES = {
+    "popular_products": (popular_products, ("order_items", "products")),
+    "avg_product_rating": (avg_product_rating, ("reviews", "products")),
+    "customer_spending": (customer_spending, ("order_items", "orders", "users")),
+    "product_search": (product_search, ("products",)),
+    "sales_dashboard": (sales_dashboard, ("order_items", "orders")),
+    "product_recommendations": (product_recommendations, ("order_items",)),
+    "join_with_comments": (join_with_comments, ("users", "orders", "order_items", "products", "reviews")),
+}
+
+
+def main():
+    if np is None:
+        raise SystemExit("❌ Silnik analityczny wymaga pakietu numpy (pip install numpy).")
+    result_dir = setup_results_dir()
+
+    print("🔄 Wczytywanie danych do kolumn NumPy...")
+    for table in TABLES:
+        if not columnar.has_columns(DATA_DIR, table):
+            columnar.csv_to_columns(DATA_DIR, table)
+    tables = {}
+    for table in TABLES:
+        total_time = measure_time(lambda: tables.__setitem__(table, load_columns(table)))
+        # Nieudane wczytanie daje wiersz z błędem (nan) - tabeli nie ma w tables
+        log_result(result_dir, "load", table, total_time, len(tables[table]["id"]) if table in tables else 0)
+
+    # Dolna granica "bez bazy danych" dla zapytań złożonych
+    print("🔍 COMPLEX QUERIES...")
+    for name, (query, needed) in COMPLEX_QUERIES.items():
+        missing = [table for table in needed if table not in tables]
+        if missing:
+            print(f"⏭️ Pomijam {name} - brak tabel: {', '.join(missing)}")
+            log_result(result_dir, "complex", name, math.nan, 1)
+            continue
+        log_result(result_dir, "complex", name, measure_time(lambda: query(tables)), 1)
+
+    print(f"✅ Testy zakończone. Wyniki zapisane w '{result_dir}/numpy_results.csv'")
+
+
+if __name__ == "__main__":
+    with harness.tag_partial_run():
+        main()
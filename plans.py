@@ -0,0 +1,71 @@
+import csv
+import hashlib
+import json
+import os
+
+# Klucze węzłów planu, z których budowany jest odcisk (kształt) planu:
+# PostgreSQL (Node Type, ...), MySQL/MariaDB FORMAT=JSON (table_name, access_type, key), MongoDB (stage, indexName),
+# SQLite EXPLAIN QUERY PLAN (detail)
+SHAPE_KEYS = ["Node Type", "Join Type", "Relation Name", "Index Name",
+              "table_name", "access_type", "key", "stage", "indexName", "detail"]
+# Poddrzewa z planami odrzuconymi przez optymalizator nie wchodzą do odcisku
+SKIPPED_KEYS = {"rejectedPlans", "allPlansExecution"}
+
+PLAN_COLUMNS = ["query", "database", "fingerprint", "rows_examined", "buffer_hits", "buffer_reads", "plan_shape"]
+
+
+def plan_shape(plan):
+    """Lista węzłów planu w kolejności przejścia w głąb, np. 'Seq Scan:products'"""
+    nodes = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            token = ":".join(str(node[key]) for key in SHAPE_KEYS if key in node)
+            if token:
+                nodes.append(token)
+            for key, value in node.items():
+                if key not in SKIPPED_KEYS:
+                    walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(plan)
+    return nodes
+
+
+def fingerprint(plan):
+    """Krótki skrót kształtu planu - zmienia się tylko wtedy, gdy zmienia się plan, a nie liczby w nim"""
+    return hashlib.sha1(" > ".join(plan_shape(plan)).encode()).hexdigest()[:12]
+
+
+def sum_key(node, key):
+    """Suma wszystkich wartości pola key w drzewie planu (poza planami odrzuconymi)"""
+    if isinstance(node, dict):
+        value = node.get(key)
+        total = value if isinstance(value, (int, float)) else 0
+        return total + sum(sum_key(child, key) for name, child in node.items() if name not in SKIPPED_KEYS)
+    if isinstance(node, list):
+        return sum(sum_key(item, key) for item in node)
+    return 0
+
+
+def save_plan(result_dir, database, query, plan, rows_examined, buffer_hits=None, buffer_reads=None):
+    """Zapisuje plan do results/records_N/plans/<db>_<zapytanie>.json i wiersz podsumowania do <db>_plans.csv"""
+    plans_dir = os.path.join(result_dir, "plans")
+    os.makedirs(plans_dir, exist_ok=True)
+    with open(os.path.join(plans_dir, f"{database}_{query}.json"), "w") as f:
+        json.dump(plan, f, indent=2, default=str)
+
+    result_file = os.path.join(result_dir, f"{database}_plans.csv")
+    file_exists = os.path.isfile(result_file)
+    with open(result_file, "a", newline="") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(PLAN_COLUMNS)
+        writer.writerow([
+            query, database, fingerprint(plan), rows_examined,
+            "" if buffer_hits is None else buffer_hits,
+            "" if buffer_reads is None else buffer_reads,
+            " > ".join(plan_shape(plan))
+        ])
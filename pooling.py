@@ -0,0 +1,127 @@
+import contextlib
+import os
+import threading
+import time
+
+import concurrency
+import harness
+import latency
+
+# Rozmiary puli i liczby klientów sprawdzane w teście puli połączeń
+POOL_SIZES = [1, 2, 4, 8, 16, 32]
+POOL_CLIENT_LEVELS = [1, 4, 16, 64]
+
+POOL_COLUMNS = (["scenario", "database", "pool_size", "clients", "operations", "total_time", "ops_per_sec"]
+                + [f"acquire_{c}" for c in latency.LATENCY_COLUMNS]
+                + [f"query_{c}" for c in latency.LATENCY_COLUMNS] + ["errors", "status"])
+
+
+class WaitRecorder:
+    """Histogram czasu oczekiwania na połączenie współdzielony przez wątki klientów"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait = latency.LatencyHistogram()
+
+    def record_wait(self, value_ns):
+        with self._lock:
+            self.wait.record(value_ns)
+
+    def reset_stats(self):
+        with self._lock:
+            self.wait = latency.LatencyHistogram()
+
+    def wait_inside_query(self):
+        """Czas oczekiwania na połączenie, który wypadł w trakcie pomiaru zapytania (w ns).
+
+        Pule pobierające połączenie przed zapytaniem mierzą oczekiwanie poza nim - stąd 0.
+        """
+        return 0
+
+
+class BlockingPool(WaitRecorder):
+    """Warstwa nad pulami sterowników SQL.
+
+    ThreadedConnectionPool i MySQLConnectionPool zgłaszają błąd, gdy brak wolnego
+    połączenia - tutaj klient czeka na semaforze, a czas oczekiwania razem z pobraniem
+    połączenia z puli jest mierzony osobno od czasu zapytania.
+    """
+
+    def __init__(self, size, acquire, release, close_all):
+        super().__init__()
+        self.size = size
+        self._slots = threading.BoundedSemaphore(size)
+        self._acquire = acquire
+        self._release = release
+        self._close_all = close_all
+
+    @contextlib.contextmanager
+    def connection(self):
+        start = time.perf_counter_ns()
+        self._slots.acquire()
+        try:
+            conn = self._acquire()
+        except Exception:
+            self._slots.release()
+            raise
+        self.record_wait(time.perf_counter_ns() - start)
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+            self._slots.release()
+
+    def close(self):
+        self._close_all()
+
+
+def log_pool_result(result_dir, database, scenario, pool_size, clients, total_time, overall,
+                    wait_histogram, query_histogram):
+    ops_per_sec = overall.count / total_time if total_time else 0
+    label = f"{scenario} pula {pool_size}, {clients} klientów"
+    harness.append_row(os.path.join(result_dir, f"{database}_pool.csv"), POOL_COLUMNS, [
+        scenario, database, pool_size, clients, overall.count,
+        round(total_time, 4), round(ops_per_sec, 2)
+    ] + latency.latency_columns(wait_histogram) + latency.latency_columns(query_histogram)
+        + harness.error_columns(label, total_time, overall.errors, overall))
+    return ops_per_sec
+
+
+def run_pool_sweep(result_dir, database, scenario, make_pool, query, sample, pool_sizes=POOL_SIZES,
+                   client_levels=POOL_CLIENT_LEVELS, ops_per_client=concurrency.OPS_PER_CLIENT):
+    """Dla każdej pary (rozmiar puli, liczba klientów) mierzy przepustowość oraz osobno
+    czas pobrania połączenia z puli i czas samego zapytania.
+
+    make_pool(size) zwraca pulę z metodami connection(), reset_stats(), close() i polem wait;
+    query(conn, value) wykonuje jedno zapytanie na pobranym połączeniu.
+    """
+    for pool_size in pool_sizes:
+        pool = make_pool(pool_size)
+        try:
+            for clients in client_levels:
+                pool.reset_stats()
+                query_histograms = []
+
+                def open_client():
+                    histogram = latency.LatencyHistogram()
+                    query_histograms.append(histogram)
+
+                    def operation(value):
+                        with pool.connection() as conn:
+                            start = time.perf_counter_ns()
+                            query(conn, value)
+                            histogram.record(time.perf_counter_ns() - start - pool.wait_inside_query())
+
+                    return operation, lambda: None
+
+                values_per_client = [sample(ops_per_client) for _ in range(clients)]
+                total_time, overall = concurrency.run_clients(open_client, values_per_client)
+                query_histogram = latency.LatencyHistogram()
+                for histogram in query_histograms:
+                    query_histogram.merge(histogram)
+                ops_per_sec = log_pool_result(result_dir, database, scenario, pool_size, clients, total_time,
+                                              overall, pool.wait, query_histogram)
+                print(f"   {scenario}: pula {pool_size}, {clients} klientów -> {ops_per_sec:.0f} ops/s, "
+                      f"oczekiwanie p99 {pool.wait.percentile(99) / 1e6:.2f} ms")
+        finally:
+            pool.close()
@@ -1,16 +1,34 @@
+import asyncio
 import csv
+import io
+import math
 import os
-import time
-import random
+import struct
 import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+import harness
+from harness import DATA_DIR, chunked, get_record_count, sample_values, setup_results_dir
+import latency
+import concurrency
+import pooling
+import materialized
+import commit_policy
+import repetitions
+import plans
+import index_profiles
+import prepared
+import async_runner
+
+try:
+    import asyncpg
+except ImportError:  # potrzebny tylko w trybie --execution async/both
+    asyncpg = None
 from datetime import datetime, timezone
+from decimal import Decimal
 from pathlib import Path
 import shutil
 
-DATA_DIR = "data"
-RESULTS_DIR = "results"
-os.makedirs(RESULTS_DIR, exist_ok=True)
-
 # 🔐 Dane połączenia z PostgreSQL
 DB_CONFIG = {
     'host': 'localhost',
@@ -20,52 +38,52 @@ DB_CONFIG = {
     'port': 5432
 }
 
+# Tryby ładowania danych w fazie INSERT (executemany, copy_text, copy_binary)
+INSERT_MODES = ["executemany"]
+# Rozmiary paczek kluczy w scenariuszu odczytu wsadowego
+READ_BATCH_SIZES = [10, 100, 1000]
+# Liczba wierszy w jednej instrukcji UPDATE/DELETE wsadowego
+BULK_BATCH_SIZE = 1000
+# Czy zapisywać surowe czasy pojedynczych zapytań do results/records_N/latency/
+LATENCY_DUMP = False
+# Plik wyników w results/records_N/ - zależy od profilu indeksów
+RESULTS_FILE = "postgresql_results.csv"
+# Przebiegi faz: do pliku wyników trafia tylko pierwszy (zimny), statystyki powtórzeń do <db>_stats.csv
+REPEATS = repetitions.Repetitions()
+# Polityka zatwierdzania transakcji w fazach po INSERT (ustawiana w main)
+COMMITS = commit_policy.CommitPolicy()
+# Liczba wierszy wysyłanych w jednym poleceniu COPY
+COPY_CHUNK_SIZE = 10000
+
+# Typy kolumn potrzebne do kodowania COPY w formacie binarnym
+COLUMN_TYPES = {
+    "users": {"id": "int4", "first_name": "text", "last_name": "text", "email": "text",
+              "password": "text", "registration_date": "timestamp"},
+    "products": {"id": "int4", "name": "text", "description": "text", "price": "numeric", "stock": "int4"},
+    "orders": {"id": "int4", "user_id": "int4", "order_date": "timestamp", "status": "text"},
+    "order_items": {"id": "int4", "order_id": "int4", "product_id": "int4", "quantity": "int4", "price": "numeric"},
+    "reviews": {"id": "int4", "product_id": "int4", "user_id": "int4", "rating": "int4",
+                "comment": "text", "created_at": "timestamp"},
+}
 
-def load_csv(file):
-    with open(os.path.join(DATA_DIR, file), newline='', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+PG_EPOCH = datetime(2000, 1, 1)
+PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+PGCOPY_TRAILER = struct.pack("!h", -1)
 
 
-def get_record_count():
-    try:
-        with open(os.path.join(DATA_DIR, "users.csv"), 'r', encoding='utf-8') as f:
-            return sum(1 for _ in f) - 1
-    except FileNotFoundError:
-        return 0
+def measure_time(func):
+    return harness.measure_time(lambda: (func(), COMMITS.tick()))
 
 
-def setup_results_dir():
-    record_count = get_record_count()
-    result_dir = os.path.join(RESULTS_DIR, f"records_{record_count}")
-    os.makedirs(result_dir, exist_ok=True)
-    return result_dir
+def measure_each(func, values):
+    return latency.measure_each(COMMITS.wrap(func), values, keep_samples=LATENCY_DUMP)
 
 
-def measure_time(func):
-    start = time.time()
-    func()
-    return time.time() - start
-
-
-def sample_values(data, field, count):
-    if count == 0:
-        return []
-    sample_count = min(count, len(data), max(1000, int(len(data) * 0.1)))
-    return [item[field] for item in random.sample(data, sample_count)]
-
-
-def log_result(result_dir, operation, entity, total_time, count):
-    avg_time = total_time / count if count else 0
-    result_file = os.path.join(result_dir, "postgresql_results.csv")
-    file_exists = os.path.isfile(result_file)
-    with open(result_file, "a", newline="") as f:
-        writer = csv.writer(f)
-        if not file_exists:
-            writer.writerow(["operation", "database", "entity", "total_time", "avg_time", "record_count"])
-        writer.writerow([
-            operation, "postgresql", entity,
-            round(total_time, 4), round(avg_time, 6), count
-        ])
+def log_result(result_dir, operation, entity, total_time, count, histogram=None, errors=None):
+    REPEATS.record(operation, entity, total_time / count if count else 0)
+    if REPEATS.is_cold:
+        harness.write_result(result_dir, RESULTS_FILE, "postgresql", operation, entity, total_time, count, histogram,
+                             errors)
 
 
 def connect():
@@ -89,16 +107,127 @@ def insert_all(cursor, table, data, columns):
     cursor.executemany(sql, values)
 
 
-def test_insert(cursor, result_dir, users, products, orders, order_items, reviews):
-    print("📝 INSERT...")
-    log_result(result_dir, "insert", "users", measure_time(lambda: insert_all(cursor, "users", users, users[0].keys())), len(users))
-    log_result(result_dir, "insert", "products", measure_time(lambda: insert_all(cursor, "products", products, products[0].keys())), len(products))
-    log_result(result_dir, "insert", "orders", measure_time(lambda: insert_all(cursor, "orders", orders, orders[0].keys())), len(orders))
-    log_result(result_dir, "insert", "order_items", measure_time(lambda: insert_all(cursor, "order_items", order_items, order_items[0].keys())), len(order_items))
-    log_result(result_dir, "insert", "reviews", measure_time(lambda: insert_all(cursor, "reviews", reviews, reviews[0].keys())), len(reviews))
+def read_csv_chunks(file, chunk_size):
+    """Strumieniowo czyta plik CSV i zwraca nagłówek oraz kolejne paczki wierszy"""
+    with open(os.path.join(DATA_DIR, file), newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        chunk = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield header, chunk
+                chunk = []
+        if chunk:
+            yield header, chunk
+
+
+def escape_copy_text(value):
+    return (value.replace("\\", "\\\\")
+                 .replace("\t", "\\t")
+                 .replace("\n", "\\n")
+                 .replace("\r", "\\r"))
+
+
+def copy_text_all(cursor, table, chunk_size):
+    for columns, chunk in read_csv_chunks(f"{table}.csv", chunk_size):
+        buffer = io.StringIO()
+        for row in chunk:
+            buffer.write("\t".join(escape_copy_text(value) for value in row))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT text)", buffer)
+
+
+def encode_int4(value):
+    return struct.pack("!ii", 4, int(value))
+
+
+def encode_text(value):
+    data = value.encode("utf-8")
+    return struct.pack("!i", len(data)) + data
+
+
+def encode_timestamp(value):
+    # Znacznik czasu w formacie binarnym to liczba mikrosekund od 2000-01-01
+    delta = datetime.fromisoformat(value) - PG_EPOCH
+    micros = (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+    return struct.pack("!iq", 8, micros)
+
+
+def encode_numeric(value):
+    # NUMERIC przesyłany jest jako cyfry w systemie o podstawie 10000
+    number = Decimal(value)
+    int_part, _, frac_part = format(abs(number), "f").partition(".")
+    int_part = int_part.lstrip("0")
+    int_part = int_part.zfill(-(-len(int_part) // 4) * 4)
+    padded_frac = frac_part + "0" * (-len(frac_part) % 4)
+    int_groups = [int(int_part[i:i + 4]) for i in range(0, len(int_part), 4)]
+    frac_groups = [int(padded_frac[i:i + 4]) for i in range(0, len(padded_frac), 4)]
+
+    digits = int_groups + frac_groups
+    weight = len(int_groups) - 1
+    while digits and digits[0] == 0:
+        digits.pop(0)
+        weight -= 1
+    while digits and digits[-1] == 0:
+        digits.pop()
+    if not digits:
+        weight = 0
+
+    sign = 0x4000 if number < 0 else 0x0000
+    payload = struct.pack("!hhhh", len(digits), weight, sign, len(frac_part))
+    payload += struct.pack(f"!{len(digits)}h", *digits)
+    return struct.pack("!i", len(payload)) + payload
+
+
+BINARY_ENCODERS = {
+    "int4": encode_int4,
+    "text": encode_text,
+    "timestamp": encode_timestamp,
+    "numeric": encode_numeric,
+}
 
 
-def test_read(cursor, result_dir, users, products, orders, reviews):
+def copy_binary_all(cursor, table, chunk_size):
+    for columns, chunk in read_csv_chunks(f"{table}.csv", chunk_size):
+        encoders = [BINARY_ENCODERS[COLUMN_TYPES[table][col]] for col in columns]
+        field_count = struct.pack("!h", len(columns))
+        buffer = io.BytesIO()
+        buffer.write(PGCOPY_HEADER)
+        for row in chunk:
+            buffer.write(field_count)
+            for encode, value in zip(encoders, row):
+                buffer.write(encode(value))
+        buffer.write(PGCOPY_TRAILER)
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT binary)", buffer)
+
+
+def insert_table(cursor, mode, table, data, chunk_size):
+    if mode == "executemany":
+        insert_all(cursor, table, data, data[0].keys())
+    elif mode == "copy_text":
+        copy_text_all(cursor, table, chunk_size)
+    elif mode == "copy_binary":
+        copy_binary_all(cursor, table, chunk_size)
+    else:
+        raise ValueError(f"Nieznany tryb INSERT: {mode}")
+
+
+def test_insert(cursor, result_dir, users, products, orders, order_items, reviews,
+                mode="executemany", chunk_size=COPY_CHUNK_SIZE):
+    print(f"📝 INSERT ({mode})...")
+    # executemany zachowuje dotychczasowe etykiety, pozostałe tryby dostają sufiks
+    suffix = "" if mode == "executemany" else f"_{mode}"
+    tables = [("users", users), ("products", products), ("orders", orders),
+              ("order_items", order_items), ("reviews", reviews)]
+    for table, data in tables:
+        log_result(result_dir, "insert", f"{table}{suffix}",
+                   measure_time(lambda: insert_table(cursor, mode, table, data, chunk_size)), len(data))
+
+
+def test_read(cursor, result_dir, users, products, orders, reviews, read_keys):
     print("🔍 READ...")
     # Ograniczamy liczbę próbek dla dużych zbiorów danych
     record_count = get_record_count()
@@ -109,26 +238,56 @@ def test_read(cursor, result_dir, users, products, orders, reviews):
     o_count = min(len(orders) // 10, sample_size)
     r_count = min(len(reviews) // 10, sample_size)
     
-    log_result(result_dir, "read", "users", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM users WHERE email = %s", (email,)), cursor.fetchall())
-        for email in sample_values(users, "email", u_count)
-    ]), u_count)
-    log_result(result_dir, "read", "products", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM products WHERE name = %s", (name,)), cursor.fetchall())
-        for name in sample_values(products, "name", p_count)
-    ]), p_count)
-    log_result(result_dir, "read", "products_by_id", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM products WHERE id = %s", (pid,)), cursor.fetchall())
-        for pid in sample_values(products, "id", p_count)
-    ]), p_count)
-    log_result(result_dir, "read", "orders", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM orders WHERE user_id = %s", (uid,)), cursor.fetchall())
-        for uid in sample_values(orders, "user_id", o_count)
-    ]), o_count)
-    log_result(result_dir, "read", "reviews", measure_time(lambda: [
-        (cursor.execute("SELECT * FROM reviews WHERE product_id = %s", (pid,)), cursor.fetchall())
-        for pid in sample_values(reviews, "product_id", r_count)
-    ]), r_count)
+    # Klucze zapamiętywane w read_keys - test_batched_read pobiera paczkami dokładnie te same
+    read_keys.update({
+        "users": sample_values(users, "email", u_count),
+        "products": sample_values(products, "name", p_count),
+        "products_by_id": sample_values(products, "id", p_count),
+        "orders": sample_values(orders, "user_id", o_count),
+        "reviews": sample_values(reviews, "product_id", r_count),
+    })
+
+    total_time, histogram = measure_each(
+        lambda email: (cursor.execute("SELECT * FROM users WHERE email = %s", (email,)), cursor.fetchall()),
+        read_keys["users"])
+    log_result(result_dir, "read", "users", total_time, u_count, histogram)
+    total_time, histogram = measure_each(
+        lambda name: (cursor.execute("SELECT * FROM products WHERE name = %s", (name,)), cursor.fetchall()),
+        read_keys["products"])
+    log_result(result_dir, "read", "products", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: (cursor.execute("SELECT * FROM products WHERE id = %s", (pid,)), cursor.fetchall()),
+        read_keys["products_by_id"])
+    log_result(result_dir, "read", "products_by_id", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda uid: (cursor.execute("SELECT * FROM orders WHERE user_id = %s", (uid,)), cursor.fetchall()),
+        read_keys["orders"])
+    log_result(result_dir, "read", "orders", total_time, o_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: (cursor.execute("SELECT * FROM reviews WHERE product_id = %s", (pid,)), cursor.fetchall()),
+        read_keys["reviews"])
+    log_result(result_dir, "read", "reviews", total_time, r_count, histogram)
+
+
+def test_batched_read(cursor, result_dir, read_keys, batch_sizes):
+    print("📦 BATCHED READ...")
+    # Te same klucze co w ostatnim przebiegu test_read, pobierane paczkami (= ANY(%s))
+    scenarios = [
+        ("users", "SELECT * FROM users WHERE email = ANY(%s)"),
+        ("products", "SELECT * FROM products WHERE name = ANY(%s)"),
+        ("products_by_id", "SELECT * FROM products WHERE id = ANY(%s::int[])"),
+        ("orders", "SELECT * FROM orders WHERE user_id = ANY(%s::int[])"),
+        ("reviews", "SELECT * FROM reviews WHERE product_id = ANY(%s::int[])"),
+    ]
+    for entity, sql in scenarios:
+        count = len(read_keys[entity])
+        for batch_size in batch_sizes:
+            total_time, histogram = measure_each(
+                lambda batch: (cursor.execute(sql, (batch,)), cursor.fetchall()),
+                chunked(read_keys[entity], batch_size))
+            # avg_time liczony na klucz - porównywalny z pojedynczymi odczytami
+            log_result(result_dir, "read", f"{entity}_batch{batch_size}", total_time, count,
+                       errors=histogram.errors)
 
 
 def test_update(cursor, result_dir, users, products, orders, reviews):
@@ -142,27 +301,242 @@ def test_update(cursor, result_dir, users, products, orders, reviews):
     o_count = min(len(orders) // 10, sample_size)
     r_count = min(len(reviews) // 10, sample_size)
     
-    log_result(result_dir, "update", "users", measure_time(lambda: [
-        cursor.execute("UPDATE users SET registration_date = %s WHERE email = %s",
-                       (datetime.now(timezone.utc), email))
-        for email in sample_values(users, "email", u_count)
-    ]), u_count)
-    log_result(result_dir, "update", "products", measure_time(lambda: [
-        cursor.execute("UPDATE products SET stock = stock + 1 WHERE name = %s", (name,))
-        for name in sample_values(products, "name", p_count)
-    ]), p_count)
-    log_result(result_dir, "update", "products_by_id", measure_time(lambda: [
-        cursor.execute("UPDATE products SET stock = stock + 1 WHERE id = %s", (pid,))
-        for pid in sample_values(products, "id", p_count)
-    ]), p_count)
-    log_result(result_dir, "update", "orders", measure_time(lambda: [
-        cursor.execute("UPDATE orders SET status = 'Completed' WHERE id = %s", (oid,))
-        for oid in sample_values(orders, "id", o_count)
-    ]), o_count)
-    log_result(result_dir, "update", "reviews", measure_time(lambda: [
-        cursor.execute("UPDATE reviews SET rating = 5 WHERE id = %s", (rid,))
-        for rid in sample_values(reviews, "id", r_count)
-    ]), r_count)
+    total_time, histogram = measure_each(
+        lambda email: cursor.execute("UPDATE users SET registration_date = %s WHERE email = %s",
+                                     (datetime.now(timezone.utc), email)),
+        sample_values(users, "email", u_count))
+    log_result(result_dir, "update", "users", total_time, u_count, histogram)
+    total_time, histogram = measure_each(
+        lambda name: cursor.execute("UPDATE products SET stock = stock + 1 WHERE name = %s", (name,)),
+        sample_values(products, "name", p_count))
+    log_result(result_dir, "update", "products", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: cursor.execute("UPDATE products SET stock = stock + 1 WHERE id = %s", (pid,)),
+        sample_values(products, "id", p_count))
+    log_result(result_dir, "update", "products_by_id", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("UPDATE orders SET status = 'Completed' WHERE id = %s", (oid,)),
+        sample_values(orders, "id", o_count))
+    log_result(result_dir, "update", "orders", total_time, o_count, histogram)
+    total_time, histogram = measure_each(
+        lambda rid: cursor.execute("UPDATE reviews SET rating = 5 WHERE id = %s", (rid,)),
+        sample_values(reviews, "id", r_count))
+    log_result(result_dir, "update", "reviews", total_time, r_count, histogram)
+
+
+def bulk_update_scenarios(users, products, orders, reviews, count_fn):
+    """Scenariusze UPDATE wsadowego: (encja, tabela, klucz, kolumna, przypisanie, klucze, wartość)"""
+    now = datetime.now(timezone.utc)
+    return [
+        ("users", "users", "email", "registration_date", "{value}",
+         sample_values(users, "email", count_fn(users)), now),
+        ("products", "products", "name", "stock", "stock + {value}",
+         sample_values(products, "name", count_fn(products)), 1),
+        ("products_by_id", "products", "id", "stock", "stock + {value}",
+         sample_values(products, "id", count_fn(products)), 1),
+        ("orders", "orders", "id", "status", "{value}",
+         sample_values(orders, "id", count_fn(orders)), "Completed"),
+        ("reviews", "reviews", "id", "rating", "{value}",
+         sample_values(reviews, "id", count_fn(reviews)), 5),
+    ]
+
+
+def bulk_delete_scenarios(users, products, orders, reviews, count_fn):
+    """Scenariusze DELETE wsadowego: (encja, tabela, klucz, klucze)"""
+    return [
+        ("reviews", "reviews", "id", sample_values(reviews, "id", count_fn(reviews))),
+        ("order_items", "order_items", "order_id", sample_values(orders, "id", count_fn(orders))),
+        ("orders", "orders", "id", sample_values(orders, "id", count_fn(orders))),
+        ("products_by_id", "products", "id", sample_values(products, "id", count_fn(products))),
+        ("users", "users", "email", sample_values(users, "email", count_fn(users))),
+    ]
+
+
+def key_cast(key):
+    # Klucze z CSV są tekstem - kolumny id/*_id trzeba rzutować w VALUES
+    return "" if key in ("email", "name") else "::int"
+
+
+def test_bulk_update(cursor, result_dir, users, products, orders, reviews, batch_size):
+    print("📦 BULK UPDATE...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 10, 1000)  # jak w test_update
+    scenarios = bulk_update_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 10, sample_size))
+
+    # UPDATE ... FROM (VALUES ...) - jedna instrukcja na batch_size wierszy
+    for entity, table, key, column, assignment, keys, value in scenarios:
+        sql = (f"UPDATE {table} SET {column} = {assignment.format(value='v.value')} "
+               f"FROM (VALUES %s) AS v(key, value) WHERE {table}.{key} = v.key")
+        rows = [(k, value) for k in keys]
+        total_time = measure_time(lambda: psycopg2.extras.execute_values(
+            cursor, sql, rows, template=f"(%s{key_cast(key)}, %s)", page_size=batch_size))
+        log_result(result_dir, "update", f"{entity}_execute_values", total_time, len(keys))
+
+
+def test_bulk_delete(cursor, result_dir, users, products, orders, reviews, batch_size):
+    print("📦 BULK DELETE...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 20, 500)  # jak w test_delete
+    scenarios = bulk_delete_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 20, sample_size))
+
+    # DELETE ... USING (VALUES ...) - jedna instrukcja na batch_size kluczy
+    for entity, table, key, keys in scenarios:
+        sql = f"DELETE FROM {table} USING (VALUES %s) AS v(key) WHERE {table}.{key} = v.key"
+        total_time = measure_time(lambda: psycopg2.extras.execute_values(
+            cursor, sql, [(k,) for k in keys], template=f"(%s{key_cast(key)})", page_size=batch_size))
+        log_result(result_dir, "delete", f"{entity}_execute_values", total_time, len(keys))
+
+
+def execute_query(cursor, sql, params, fetch):
+    cursor.execute(sql, params)
+    if fetch:
+        cursor.fetchall()
+
+
+def test_prepared(cursor, result_dir, dataset):
+    print("📌 PREPARED STATEMENTS...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 10, 1000)  # jak w test_read/test_update
+
+    # Te same klucze protokołem tekstowym i przez PREPARE/EXECUTE, po rozgrzewce i w naprzemiennej kolejności
+    for index, (operation, entity, table, field, sql, params) in enumerate(prepared.POINT_QUERIES):
+        data = dataset[table]
+        count = min(len(data) // 10, sample_size)
+        keys = sample_values(data, field, count)
+        fetch = operation == "read"
+
+        name = f"bench_{operation}_{entity}"
+        cursor.execute(f"PREPARE {name} AS {prepared.numbered_placeholders(sql)}")
+        execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * sql.count('%s'))})"
+        text_time, total_time, histogram = prepared.measure_modes(
+            measure_each,
+            lambda key: execute_query(cursor, sql, params(key), fetch),
+            lambda key: execute_query(cursor, execute_sql, params(key), fetch),
+            keys, index % 2 == 1)
+        cursor.execute(f"DEALLOCATE {name}")
+
+        log_result(result_dir, operation, f"{entity}_prepared", total_time, count, histogram)
+        prepared.log_saving(result_dir, "postgresql", operation, entity, count, text_time, total_time)
+
+
+def sweep_client(sql, fetch=False):
+    """Fabryka klientów testu współbieżności - każdy ma własne połączenie w trybie autocommit"""
+    def open_client():
+        conn = connect()
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        def operation(value):
+            cursor.execute(sql, (value,))
+            if fetch:
+                cursor.fetchall()
+
+        def close():
+            cursor.close()
+            conn.close()
+
+        return operation, close
+    return open_client
+
+
+def test_concurrency(result_dir, users, products, orders, levels, ops_per_client):
+    print("👥 CONCURRENCY...")
+    scenarios = [
+        ("read_users", "SELECT * FROM users WHERE email = %s", True, users, "email"),
+        ("read_products_by_id", "SELECT * FROM products WHERE id = %s", True, products, "id"),
+        ("update_products_by_id", "UPDATE products SET stock = stock + 1 WHERE id = %s", False, products, "id"),
+        ("update_orders", "UPDATE orders SET status = 'Completed' WHERE id = %s", False, orders, "id"),
+    ]
+    for scenario, sql, fetch, data, field in scenarios:
+        concurrency.run_sweep(result_dir, "postgresql", scenario, sweep_client(sql, fetch),
+                              lambda count: sample_values(data, field, count), levels, ops_per_client)
+
+
+def make_pool(size):
+    # minconn = maxconn, żeby czas zestawiania połączeń nie trafiał do pomiaru oczekiwania
+    pg_pool = psycopg2.pool.ThreadedConnectionPool(size, size, **DB_CONFIG)
+
+    def acquire():
+        conn = pg_pool.getconn()
+        conn.autocommit = True
+        return conn
+
+    return pooling.BlockingPool(size, acquire, pg_pool.putconn, pg_pool.closeall)
+
+
+def pool_query(sql, fetch=False):
+    def query(conn, value):
+        with conn.cursor() as cursor:
+            cursor.execute(sql, (value,))
+            if fetch:
+                cursor.fetchall()
+    return query
+
+
+def test_pool_sweep(result_dir, users, products, pool_sizes, client_levels, ops_per_client):
+    print("🏊 POOL SWEEP...")
+    scenarios = [
+        ("read_users", pool_query("SELECT * FROM users WHERE email = %s", fetch=True), users, "email"),
+        ("update_products_by_id", pool_query("UPDATE products SET stock = stock + 1 WHERE id = %s"), products, "id"),
+    ]
+    for scenario, query, data, field in scenarios:
+        pooling.run_pool_sweep(result_dir, "postgresql", scenario, make_pool, query,
+                               lambda count: sample_values(data, field, count), pool_sizes, client_levels,
+                               ops_per_client)
+
+
+# Scenariusze trybu asyncio: (encja, zapytanie, tabela z danymi, pole klucza, rzutowanie klucza)
+ASYNC_SCENARIOS = {
+    "read": [
+        ("users", "SELECT * FROM users WHERE email = $1", "users", "email", str),
+        ("products", "SELECT * FROM products WHERE name = $1", "products", "name", str),
+        ("products_by_id", "SELECT * FROM products WHERE id = $1", "products", "id", int),
+        ("orders", "SELECT * FROM orders WHERE user_id = $1", "orders", "user_id", int),
+        ("reviews", "SELECT * FROM reviews WHERE product_id = $1", "reviews", "product_id", int),
+    ],
+    "update": [
+        ("users", "UPDATE users SET registration_date = now() WHERE email = $1", "users", "email", str),
+        ("products", "UPDATE products SET stock = stock + 1 WHERE name = $1", "products", "name", str),
+        ("products_by_id", "UPDATE products SET stock = stock + 1 WHERE id = $1", "products", "id", int),
+        ("orders", "UPDATE orders SET status = 'Completed' WHERE id = $1", "orders", "id", int),
+        ("reviews", "UPDATE reviews SET rating = 5 WHERE id = $1", "reviews", "id", int),
+    ],
+    "delete": [
+        ("reviews", "DELETE FROM reviews WHERE id = $1", "reviews", "id", int),
+        ("order_items", "DELETE FROM order_items WHERE order_id = $1", "orders", "id", int),
+        ("orders", "DELETE FROM orders WHERE id = $1", "orders", "id", int),
+        ("products", "DELETE FROM products WHERE name = $1", "products", "name", str),
+        ("products_by_id", "DELETE FROM products WHERE id = $1", "products", "id", int),
+        ("users", "DELETE FROM users WHERE email = $1", "users", "email", str),
+    ],
+}
+
+
+async def test_async(result_dir, phase, dataset, in_flight):
+    """Faza READ/UPDATE/DELETE wykonywana przez asyncpg z in_flight zapytaniami w locie"""
+    print(f"⚡ {phase.upper()} (asyncio, {in_flight} w locie)...")
+    pool = await asyncpg.create_pool(host=DB_CONFIG['host'], port=DB_CONFIG['port'], user=DB_CONFIG['user'],
+                                     password=DB_CONFIG['password'], database=DB_CONFIG['dbname'],
+                                     min_size=in_flight, max_size=in_flight)
+    divisor, limit = (20, 500) if phase == "delete" else (10, 1000)
+    try:
+        for entity, sql, table, field, cast in ASYNC_SCENARIOS[phase]:
+            data = dataset[table]
+            count = min(len(data) // divisor, limit)
+
+            async def run(value, sql=sql):
+                if phase == "read":
+                    await pool.fetch(sql, value)
+                else:
+                    await pool.execute(sql, value)
+
+            total_time, histogram = await async_runner.measure_each_async(
+                run, [cast(v) for v in sample_values(data, field, count)], in_flight)
+            log_result(result_dir, phase, f"{entity}_async", total_time, count, histogram)
+    finally:
+        await pool.close()
 
 
 def test_delete(cursor, result_dir, users, products, orders, reviews, order_items):
@@ -177,176 +551,422 @@ def test_delete(cursor, result_dir, users, products, orders, reviews, order_item
     r_count = min(len(reviews) // 20, sample_size)
     oi_count = min(len(order_items) // 20, sample_size)
     
-    log_result(result_dir, "delete", "reviews", measure_time(lambda: [
-        cursor.execute("DELETE FROM reviews WHERE id = %s", (rid,))
-        for rid in sample_values(reviews, "id", r_count)
-    ]), r_count)
-
-    log_result(result_dir, "delete", "order_items", measure_time(lambda: [
-        cursor.execute("DELETE FROM order_items WHERE order_id = %s", (oid,))
-        for oid in sample_values(orders, "id", oi_count)
-    ]), oi_count)
-
-    log_result(result_dir, "delete", "orders", measure_time(lambda: [
-        cursor.execute("DELETE FROM orders WHERE id = %s", (oid,))
-        for oid in sample_values(orders, "id", o_count)
-    ]), o_count)
-
-    log_result(result_dir, "delete", "products", measure_time(lambda: [
-        cursor.execute("DELETE FROM products WHERE name = %s", (name,))
-        for name in sample_values(products, "name", p_count)
-    ]), p_count)
-
-    log_result(result_dir, "delete", "products_by_id", measure_time(lambda: [
-        cursor.execute("DELETE FROM products WHERE id = %s", (pid,))
-        for pid in sample_values(products, "id", p_count)
-    ]), p_count)
-
-    log_result(result_dir, "delete", "users", measure_time(lambda: [
-        cursor.execute("DELETE FROM users WHERE email = %s", (email,))
-        for email in sample_values(users, "email", u_count)
-    ]), u_count)
+    total_time, histogram = measure_each(
+        lambda rid: cursor.execute("DELETE FROM reviews WHERE id = %s", (rid,)),
+        sample_values(reviews, "id", r_count))
+    log_result(result_dir, "delete", "reviews", total_time, r_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("DELETE FROM order_items WHERE order_id = %s", (oid,)),
+        sample_values(orders, "id", oi_count))
+    log_result(result_dir, "delete", "order_items", total_time, oi_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("DELETE FROM orders WHERE id = %s", (oid,)),
+        sample_values(orders, "id", o_count))
+    log_result(result_dir, "delete", "orders", total_time, o_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda name: cursor.execute("DELETE FROM products WHERE name = %s", (name,)),
+        sample_values(products, "name", p_count))
+    log_result(result_dir, "delete", "products", total_time, p_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda pid: cursor.execute("DELETE FROM products WHERE id = %s", (pid,)),
+        sample_values(products, "id", p_count))
+    log_result(result_dir, "delete", "products_by_id", total_time, p_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda email: cursor.execute("DELETE FROM users WHERE email = %s", (email,)),
+        sample_values(users, "email", u_count))
+    log_result(result_dir, "delete", "users", total_time, u_count, histogram)
+
+
+# Zapytania złożone - te same teksty służą do pomiaru czasu i do przechwytywania planów
+COMPLEX_QUERIES = {
+    # 1. Najpopularniejsze produkty
+    "popular_products": '''
+        SELECT p.id, p.name, COUNT(oi.product_id) as order_count
+        FROM products p
+        JOIN order_items oi ON p.id = oi.product_id
+        GROUP BY p.id, p.name
+        ORDER BY order_count DESC
+        LIMIT 10
+    ''',
+    # 2. Średnia ocena produktów
+    "avg_product_rating": '''
+        SELECT p.id, p.name, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
+        FROM products p
+        JOIN reviews r ON p.id = r.product_id
+        GROUP BY p.id, p.name
+        HAVING COUNT(r.id) >= 5
+        ORDER BY avg_rating DESC
+        LIMIT 10
+    ''',
+    # 3. Analiza wartości zamówień klientów
+    "customer_spending": '''
+        SELECT u.id, u.email, SUM(oi.price * oi.quantity) as total_spent
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        JOIN order_items oi ON o.id = oi.order_id
+        GROUP BY u.id, u.email
+        ORDER BY total_spent DESC
+        LIMIT 20
+    ''',
+    # 4. Wyszukiwanie produktów z filtrowaniem
+    "product_search": '''
+        SELECT p.id, p.name, p.price
+        FROM products p
+        WHERE (p.name LIKE '%laptop%' OR p.description LIKE '%laptop%')
+        AND p.price BETWEEN 100 AND 500
+        AND p.stock > 0
+        ORDER BY p.price ASC
+    ''',
+    # 5. Dashboard sprzedażowy
+    "sales_dashboard": '''
+        SELECT DATE(o.order_date) as date, 
+              COUNT(o.id) as order_count, 
+              SUM(oi.price * oi.quantity) as revenue
+        FROM orders o
+        JOIN order_items oi ON o.id = oi.order_id
+        WHERE o.order_date >= NOW() - INTERVAL '30 days'
+        GROUP BY DATE(o.order_date)
+        ORDER BY date
+    ''',
+    # 6. Rekomendacje produktów
+    "product_recommendations": '''
+        SELECT oi1.product_id, oi2.product_id, COUNT(*) as frequency
+        FROM order_items oi1
+        JOIN order_items oi2 ON oi1.order_id = oi2.order_id AND oi1.product_id < oi2.product_id
+        GROUP BY oi1.product_id, oi2.product_id
+        ORDER BY frequency DESC
+        LIMIT 10
+    ''',
+    # 7. Wyświetla tylko recenzje od użytkowników, którzy kupili dany produkt
+    "join_with_comments": '''
+        SELECT 
+            u.id AS user_id,
+            u.email,
+            o.id AS order_id,
+            o.order_date,
+            p.id AS product_id,
+            p.name AS product_name,
+            oi.quantity,
+            oi.price AS item_price,
+            r.rating,
+            r.comment
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        JOIN order_items oi ON o.id = oi.order_id
+        JOIN products p ON oi.product_id = p.id
+        INNER JOIN reviews r ON r.product_id = oi.product_id AND r.user_id = o.user_id
+    ''',
+}
 
 
 def test_complex_queries(cursor, result_dir):
     print("🔍 COMPLEX QUERIES...")
-    
-    # 1. Najpopularniejsze produkty
-    log_result(result_dir, "complex", "popular_products", measure_time(lambda: [
-        cursor.execute('''
-            SELECT p.id, p.name, COUNT(oi.product_id) as order_count
-            FROM products p
-            JOIN order_items oi ON p.id = oi.product_id
-            GROUP BY p.id, p.name
-            ORDER BY order_count DESC
-            LIMIT 10
-        '''), cursor.fetchall()
-    ]), 1)
+    for name, sql in COMPLEX_QUERIES.items():
+        log_result(result_dir, "complex", name, measure_time(lambda: [cursor.execute(sql), cursor.fetchall()]), 1)
+
+
+# Indeksowane warianty product_search: nazwa -> ([(indeks, CREATE INDEX ...)], zapytanie)
+SEARCH_VARIANTS = {
+    # pg_trgm obsługuje LIKE '%...%' z indeksu GIN - zapytanie bez zmian
+    "trgm": ([
+        ("bench_idx_products_name_trgm",
+         "CREATE INDEX bench_idx_products_name_trgm ON products USING gin (name gin_trgm_ops)"),
+        ("bench_idx_products_description_trgm",
+         "CREATE INDEX bench_idx_products_description_trgm ON products USING gin (description gin_trgm_ops)"),
+    ], COMPLEX_QUERIES["product_search"]),
+    # Wyszukiwanie pełnotekstowe dopasowuje słowa (ze stemmingiem), a nie dowolne podciągi
+    "fts": ([
+        ("bench_idx_products_fts",
+         "CREATE INDEX bench_idx_products_fts ON products "
+         "USING gin (to_tsvector('english', name || ' ' || coalesce(description, '')))"),
+    ], '''
+        SELECT p.id, p.name, p.price
+        FROM products p
+        WHERE to_tsvector('english', p.name || ' ' || coalesce(p.description, '')) @@ to_tsquery('english', 'laptop')
+        AND p.price BETWEEN 100 AND 500
+        AND p.stock > 0
+        ORDER BY p.price ASC
+    '''),
+}
+# Liczba wykonań każdego wariantu wyszukiwania
+SEARCH_QUERIES = 20
 
-    
-    # 2. Średnia ocena produktów
-    log_result(result_dir, "complex", "avg_product_rating", measure_time(lambda: [
-        cursor.execute('''
-            SELECT p.id, p.name, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
-            FROM products p
-            JOIN reviews r ON p.id = r.product_id
-            GROUP BY p.id, p.name
-            HAVING COUNT(r.id) >= 5
-            ORDER BY avg_rating DESC
-            LIMIT 10
-        '''), cursor.fetchall()
-    ]), 1)
 
-    
-    # 3. Analiza wartości zamówień klientów
-    log_result(result_dir, "complex", "customer_spending", measure_time(lambda: [
-        cursor.execute('''
-            SELECT u.id, u.email, SUM(oi.price * oi.quantity) as total_spent
-            FROM users u
-            JOIN orders o ON u.id = o.user_id
+def test_search(conn, cursor, result_dir):
+    print("🔎 PRODUCT SEARCH...")
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    conn.commit()
+
+    def run_queries(variant, sql):
+        total_time, histogram = measure_each(lambda _: (cursor.execute(sql), cursor.fetchall()),
+                                             range(SEARCH_QUERIES))
+        log_result(result_dir, "complex", f"product_search_{variant}", total_time, SEARCH_QUERIES, histogram)
+
+    run_queries("scan", COMPLEX_QUERIES["product_search"])
+    for variant, (indexes, sql) in SEARCH_VARIANTS.items():
+        build_time = measure_time(lambda: [[cursor.execute(create) for _, create in indexes], conn.commit()])
+        log_result(result_dir, "index_build", f"product_search_{variant}", build_time, 1)
+        run_queries(variant, sql)
+        if math.isnan(build_time):
+            # Budowa się nie udała - nie ma czego usuwać
+            continue
+        # Usuwamy od razu, żeby indeksy nie wpływały na kolejne warianty i fazy
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+        conn.commit()
+
+
+def plan_rows_examined(node):
+    """Wiersze odczytane przez węzły skanujące tabele (zwrócone + odrzucone przez filtr) razy liczba pętli"""
+    rows = 0
+    if "Relation Name" in node:
+        rows = (node.get("Actual Rows", 0) + node.get("Rows Removed by Filter", 0)) * node.get("Actual Loops", 1)
+    return rows + sum(plan_rows_examined(child) for child in node.get("Plans", []))
+
+
+def capture_plans(cursor, result_dir):
+    print("🧭 PLANY ZAPYTAŃ...")
+    for name, sql in COMPLEX_QUERIES.items():
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+        plan = cursor.fetchone()[0]
+        root = plan[0]["Plan"]
+        plans.save_plan(result_dir, "postgresql", name, plan, plan_rows_examined(root),
+                        root.get("Shared Hit Blocks", 0), root.get("Shared Read Blocks", 0))
+
+
+# Agregaty dashboardów: (definicja - klucz w pierwszej kolumnie, klucz, odczyt z widoku)
+MATERIALIZED_VIEWS = {
+    "popular_products": (
+        "SELECT product_id, COUNT(*) AS order_count FROM order_items GROUP BY product_id",
+        "product_id",
+        '''
+            SELECT p.id, p.name, mv.order_count
+            FROM mv_popular_products mv
+            JOIN products p ON p.id = mv.product_id
+            ORDER BY mv.order_count DESC
+            LIMIT 10
+        '''),
+    "customer_spending": (
+        '''
+            SELECT o.user_id, SUM(oi.price * oi.quantity) AS total_spent
+            FROM orders o
             JOIN order_items oi ON o.id = oi.order_id
-            GROUP BY u.id, u.email
-            ORDER BY total_spent DESC
+            GROUP BY o.user_id
+        ''',
+        "user_id",
+        '''
+            SELECT u.id, u.email, mv.total_spent
+            FROM mv_customer_spending mv
+            JOIN users u ON u.id = mv.user_id
+            ORDER BY mv.total_spent DESC
             LIMIT 20
         '''),
-        cursor.fetchall()
-    ]), 1)
-    
-    # 4. Wyszukiwanie produktów z filtrowaniem
-    log_result(result_dir, "complex", "product_search", measure_time(lambda: [
-        cursor.execute('''
-            SELECT p.id, p.name, p.price
-            FROM products p
-            WHERE (p.name LIKE '%laptop%' OR p.description LIKE '%laptop%')
-            AND p.price BETWEEN 100 AND 500
-            AND p.stock > 0
-            ORDER BY p.price ASC
-        '''),
-        cursor.fetchall()
-    ]), 1)
-    
-    # 5. Dashboard sprzedażowy
-    log_result(result_dir, "complex", "sales_dashboard", measure_time(lambda: [
-        cursor.execute('''
-            SELECT DATE(o.order_date) as date, 
-                  COUNT(o.id) as order_count, 
-                  SUM(oi.price * oi.quantity) as revenue
+    "sales_dashboard": (
+        '''
+            SELECT DATE(o.order_date) AS date, COUNT(o.id) AS order_count, SUM(oi.price * oi.quantity) AS revenue
             FROM orders o
             JOIN order_items oi ON o.id = oi.order_id
-            WHERE o.order_date >= NOW() - INTERVAL '30 days'
             GROUP BY DATE(o.order_date)
+        ''',
+        "date",
+        '''
+            SELECT date, order_count, revenue
+            FROM mv_sales_dashboard
+            WHERE date >= CURRENT_DATE - 30
             ORDER BY date
         '''),
-        cursor.fetchall()
-    ]), 1)
-    
-    # 6. Rekomendacje produktów
-    log_result(result_dir, "complex", "product_recommendations", measure_time(lambda: [
-        cursor.execute('''
-            SELECT oi1.product_id, oi2.product_id, COUNT(*) as frequency
-            FROM order_items oi1
-            JOIN order_items oi2 ON oi1.order_id = oi2.order_id AND oi1.product_id < oi2.product_id
-            GROUP BY oi1.product_id, oi2.product_id
-            ORDER BY frequency DESC
-            LIMIT 10
-        '''), cursor.fetchall()
-    ]), 1)
+}
 
-    # 7. Wyświetla tylko recenzje od użytkowników, którzy kupili dany produkt
-    log_result(result_dir, "complex", "join_with_comments", measure_time(lambda: [
-        cursor.execute('''
-            SELECT 
-                u.id AS user_id,
-                u.email,
-                o.id AS order_id,
-                o.order_date,
-                p.id AS product_id,
-                p.name AS product_name,
-                oi.quantity,
-                oi.price AS item_price,
-                r.rating,
-                r.comment
-            FROM users u
-            JOIN orders o ON u.id = o.user_id
-            JOIN order_items oi ON o.id = oi.order_id
-            JOIN products p ON oi.product_id = p.id
-            INNER JOIN reviews r ON r.product_id = oi.product_id AND r.user_id = o.user_id
-        '''),
-        cursor.fetchall()
-    ]), 1)
 
+def test_materialized(conn, cursor, result_dir):
+    print("🧊 MATERIALIZED VIEWS...")
+    build_times, read_times = {}, {}
+    for name, (definition, key, read_sql) in MATERIALIZED_VIEWS.items():
+        # Unikalny indeks jest wymagany przez REFRESH ... CONCURRENTLY
+        build_times[name] = measure_time(lambda: [
+            cursor.execute(f"DROP MATERIALIZED VIEW IF EXISTS mv_{name}"),
+            cursor.execute(f"CREATE MATERIALIZED VIEW mv_{name} AS {definition}"),
+            cursor.execute(f"CREATE UNIQUE INDEX ON mv_{name} ({key})"),
+            conn.commit()
+        ])
+        total_time, histogram = measure_each(lambda _: (cursor.execute(read_sql), cursor.fetchall()),
+                                             range(materialized.MATERIALIZED_READS))
+        log_result(result_dir, "complex", f"{name}_materialized", total_time,
+                   materialized.MATERIALIZED_READS, histogram)
+        read_times[name] = total_time / materialized.MATERIALIZED_READS
+
+    # Nowe dane po zbudowaniu widoków - mierzymy, jak bardzo są nieaktualne i ile kosztuje odświeżenie.
+    # Dane ładowane są z jawnymi id, więc sekwencję SERIAL trzeba najpierw przestawić za ostatni wiersz
+    cursor.execute("SELECT max(id) FROM order_items")
+    burst_from = cursor.fetchone()[0]
+    cursor.execute("SELECT setval(pg_get_serial_sequence('order_items', 'id'), %s)", (burst_from,))
+    cursor.execute(materialized.WRITE_BURST_SQL)
+    conn.commit()
+    for name, (definition, key, read_sql) in MATERIALIZED_VIEWS.items():
+        cursor.execute(definition)
+        live = materialized.rows_by_key(cursor.fetchall())
+        cursor.execute(f"SELECT * FROM mv_{name}")
+        stale = materialized.stale_rows(live, materialized.rows_by_key(cursor.fetchall()))
+        refresh_time = measure_time(lambda: [
+            cursor.execute(f"REFRESH MATERIALIZED VIEW CONCURRENTLY mv_{name}"),
+            conn.commit()
+        ])
+        materialized.log_view(result_dir, "postgresql", name, build_times[name], read_times[name],
+                              stale, len(live), refresh_time)
+    cursor.execute(materialized.WRITE_BURST_CLEANUP_SQL, (burst_from,))
+    conn.commit()
 
-def main():
+
+def main(insert_modes=INSERT_MODES, copy_chunk_size=COPY_CHUNK_SIZE, latency_dump=LATENCY_DUMP,
+         concurrency_levels=None, ops_per_client=concurrency.OPS_PER_CLIENT,
+         execution="sync", async_in_flight=async_runner.ASYNC_IN_FLIGHT,
+         pool_sizes=None, pool_client_levels=pooling.POOL_CLIENT_LEVELS,
+         read_batch_sizes=READ_BATCH_SIZES, bulk_batch_size=BULK_BATCH_SIZE,
+         prepared_statements=False, index_profile="none", query_plans=True,
+         warmup=repetitions.WARMUP, repeat=repetitions.REPETITIONS,
+         commit_mode="single", commit_every=commit_policy.COMMIT_EVERY, materialized_views=False,
+         search=False, dataset=None):
+    if execution != "sync" and asyncpg is None:
+        raise SystemExit("❌ Tryb asyncio wymaga pakietu asyncpg (pip install asyncpg).")
+    global LATENCY_DUMP, RESULTS_FILE, COMMITS
+    LATENCY_DUMP = latency_dump
+    RESULTS_FILE = index_profiles.results_file("postgresql", index_profile)
     result_dir = setup_results_dir()
     
-    print("🔄 Wczytywanie danych CSV...")
-    users = load_csv("users.csv")
-    products = load_csv("products.csv")
-    orders = load_csv("orders.csv")
-    order_items = load_csv("order_items.csv")
-    reviews = load_csv("reviews.csv")
+    if dataset is None:
+        print("🔄 Wczytywanie danych...")
+        dataset = harness.load_dataset()
+    users, products, orders = dataset["users"], dataset["products"], dataset["orders"]
+    order_items, reviews = dataset["order_items"], dataset["reviews"]
 
     print("🔌 Łączenie z bazą PostgreSQL...")
     conn = connect()
     cursor = conn.cursor()
-
-    clear_tables(cursor)
-    test_insert(cursor, result_dir, users, products, orders, order_items, reviews)
+    # Złapany błąd operacji cofa transakcję - kolejne scenariusze nie dziedziczą jej stanu
+    latency.set_error_hook(conn.rollback)
+    index_profiles.apply_profile(cursor, "postgresql", index_profile)
     conn.commit()
 
-    test_read(cursor, result_dir, users, products, orders, reviews)
-    test_update(cursor, result_dir, users, products, orders, reviews)
+    # Każdy tryb ładuje dane od zera, ostatni pozostawia je dla kolejnych testów
+    for mode in insert_modes:
+        clear_tables(cursor)
+        conn.commit()
+        test_insert(cursor, result_dir, users, products, orders, order_items, reviews, mode, copy_chunk_size)
+        conn.commit()
+
+    COMMITS = commit_policy.CommitPolicy(commit_mode, commit_every)
+    COMMITS.attach(conn)
+
+    if execution in ("sync", "both"):
+        # Fazy niszczące dane (INSERT, DELETE) nie są powtarzane
+        read_keys = {}
+        REPEATS.run_phase(lambda: test_read(cursor, result_dir, users, products, orders, reviews, read_keys), warmup, repeat)
+        REPEATS.run_phase(lambda: test_batched_read(cursor, result_dir, read_keys, read_batch_sizes), warmup, repeat)
+        REPEATS.run_phase(lambda: test_update(cursor, result_dir, users, products, orders, reviews), warmup, repeat)
+        REPEATS.run_phase(lambda: test_bulk_update(cursor, result_dir, users, products, orders, reviews,
+                                                   bulk_batch_size), warmup, repeat)
+        if prepared_statements:
+            test_prepared(cursor, result_dir, dataset)
+    if execution in ("async", "both"):
+        # Połączenia z puli nie mogą czekać na blokady otwartej transakcji
+        conn.commit()
+        asyncio.run(test_async(result_dir, "read", dataset, async_in_flight))
+        asyncio.run(test_async(result_dir, "update", dataset, async_in_flight))
+
+    if concurrency_levels:
+        # Klienci testu współbieżności nie mogą czekać na blokady otwartej transakcji
+        conn.commit()
+        test_concurrency(result_dir, users, products, orders, concurrency_levels, ops_per_client)
+
+    if pool_sizes:
+        conn.commit()
+        test_pool_sweep(result_dir, users, products, pool_sizes, pool_client_levels, ops_per_client)
     
     # Testy złożonych zapytań
-    test_complex_queries(cursor, result_dir)
+    REPEATS.run_phase(lambda: test_complex_queries(cursor, result_dir), warmup, repeat)
+    if query_plans:
+        capture_plans(cursor, result_dir)
+    if search:
+        test_search(conn, cursor, result_dir)
+    if materialized_views:
+        test_materialized(conn, cursor, result_dir)
     
-    test_delete(cursor, result_dir, users, products, orders, reviews, order_items)
+    if execution in ("sync", "both"):
+        test_delete(cursor, result_dir, users, products, orders, reviews, order_items)
+        test_bulk_delete(cursor, result_dir, users, products, orders, reviews, bulk_batch_size)
     conn.commit()
+    if execution in ("async", "both"):
+        asyncio.run(test_async(result_dir, "delete", dataset, async_in_flight))
 
+    REPEATS.write_stats(result_dir, "postgresql")
     cursor.close()
     conn.close()
+    latency.set_error_hook(None)
     print(f"✅ Testy zakończone. Wyniki zapisane w '{result_dir}'")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Testy wydajności CRUD dla PostgreSQL")
+    parser.add_argument("--insert-modes", nargs="+", default=INSERT_MODES,
+                        choices=["executemany", "copy_text", "copy_binary"],
+                        help="Tryby ładowania danych w fazie INSERT (uruchamiane po kolei)")
+    parser.add_argument("--copy-chunk-size", type=int, default=COPY_CHUNK_SIZE,
+                        help="Liczba wierszy w jednym poleceniu COPY")
+    parser.add_argument("--latency-dump", action="store_true",
+                        help="Zapisz surowe czasy pojedynczych zapytań (ns) dla każdej encji")
+    parser.add_argument("--concurrency", action="store_true",
+                        help="Uruchom test skalowania READ/UPDATE dla wielu równoległych klientów")
+    parser.add_argument("--concurrency-levels", nargs="+", type=int, default=concurrency.CONCURRENCY_LEVELS,
+                        help="Liczby równoległych klientów w teście skalowania")
+    parser.add_argument("--ops-per-client", type=int, default=concurrency.OPS_PER_CLIENT,
+                        help="Liczba zapytań wykonywanych przez każdego klienta")
+    parser.add_argument("--execution", choices=["sync", "async", "both"], default="sync",
+                        help="Tryb wykonania faz READ/UPDATE/DELETE: synchroniczny, asyncio lub oba")
+    parser.add_argument("--async-in-flight", type=int, default=async_runner.ASYNC_IN_FLIGHT,
+                        help="Liczba zapytań w locie w trybie asyncio")
+    parser.add_argument("--pool-sweep", action="store_true",
+                        help="Uruchom test puli połączeń: rozmiar puli względem liczby klientów")
+    parser.add_argument("--pool-sizes", nargs="+", type=int, default=pooling.POOL_SIZES,
+                        help="Rozmiary puli połączeń w teście puli")
+    parser.add_argument("--pool-clients", nargs="+", type=int, default=pooling.POOL_CLIENT_LEVELS,
+                        help="Liczby równoległych klientów w teście puli")
+    parser.add_argument("--read-batch-sizes", nargs="*", type=int, default=READ_BATCH_SIZES,
+                        help="Rozmiary paczek kluczy w odczycie wsadowym (brak wartości wyłącza scenariusz)")
+    parser.add_argument("--bulk-batch-size", type=int, default=BULK_BATCH_SIZE,
+                        help="Liczba wierszy w jednej instrukcji UPDATE/DELETE wsadowego")
+    parser.add_argument("--prepared", action="store_true",
+                        help="Porównaj zapytania punktowe READ/UPDATE przez prepared statements z protokołem tekstowym")
+    parser.add_argument("--index-profile", choices=list(index_profiles.INDEX_PROFILES), default="none",
+                        help="Profil indeksów drugorzędnych (wyniki trafiają do <db>_<profil>_indexes.csv)")
+    parser.add_argument("--skip-plans", action="store_true",
+                        help="Nie zapisuj planów wykonania zapytań złożonych do results/records_N/plans/")
+    parser.add_argument("--warmup", type=int, default=repetitions.WARMUP,
+                        help="Liczba przebiegów rozgrzewkowych (odrzucanych) po pierwszym, zimnym przebiegu")
+    parser.add_argument("--repetitions", type=int, default=repetitions.REPETITIONS,
+                        help="Liczba mierzonych ciepłych powtórzeń faz READ/UPDATE/COMPLEX (statystyki w <db>_stats.csv)")
+    parser.add_argument("--commit-policy", choices=commit_policy.COMMIT_POLICIES, default="single",
+                        help="Zatwierdzanie transakcji po INSERT: jedna transakcja, autocommit lub commit co N operacji")
+    parser.add_argument("--commit-every", type=int, default=commit_policy.COMMIT_EVERY,
+                        help="Liczba operacji między commitami w polityce every_n")
+    parser.add_argument("--materialized", action="store_true",
+                        help="Porównaj agregaty dashboardów liczone z góry: odczyt, nieaktualność i koszt odświeżenia")
+    parser.add_argument("--search", action="store_true",
+                        help="Porównaj product_search (LIKE) z indeksowanymi wariantami wyszukiwania")
+    args = parser.parse_args()
+
+    with harness.tag_partial_run():
+        main(args.insert_modes, args.copy_chunk_size, args.latency_dump,
+             args.concurrency_levels if args.concurrency else None, args.ops_per_client,
+             args.execution, args.async_in_flight,
+             args.pool_sizes if args.pool_sweep else None, args.pool_clients,
+             args.read_batch_sizes, args.bulk_batch_size, args.prepared,
+             args.index_profile, not args.skip_plans, args.warmup, args.repetitions,
+             args.commit_policy, args.commit_every, args.materialized,
+             args.search)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import csv
+import os
+from datetime import datetime, timezone
+
+# Zapytania punktowe z faz READ/UPDATE: (operacja, encja, tabela, pole klucza, SQL, parametry(klucz))
+POINT_QUERIES = [
+    ("read", "users", "users", "email",
+     "SELECT * FROM users WHERE email = %s", lambda key: (key,)),
+    ("read", "products", "products", "name",
+     "SELECT * FROM products WHERE name = %s", lambda key: (key,)),
+    ("read", "products_by_id", "products", "id",
+     "SELECT * FROM products WHERE id = %s", lambda key: (key,)),
+    ("read", "orders", "orders", "user_id",
+     "SELECT * FROM orders WHERE user_id = %s", lambda key: (key,)),
+    ("read", "reviews", "reviews", "product_id",
+     "SELECT * FROM reviews WHERE product_id = %s", lambda key: (key,)),
+    ("update", "users", "users", "email",
+     "UPDATE users SET registration_date = %s WHERE email = %s",
+     lambda key: (datetime.now(timezone.utc), key)),
+    ("update", "products", "products", "name",
+     "UPDATE products SET stock = stock + 1 WHERE name = %s", lambda key: (key,)),
+    ("update", "products_by_id", "products", "id",
+     "UPDATE products SET stock = stock + 1 WHERE id = %s", lambda key: (key,)),
+    ("update", "orders", "orders", "id",
+     "UPDATE orders SET status = 'Completed' WHERE id = %s", lambda key: (key,)),
+    ("update", "reviews", "reviews", "id",
+     "UPDATE reviews SET rating = 5 WHERE id = %s", lambda key: (key,)),
+]
+
+PREPARED_COLUMNS = ["operation", "database", "entity", "count",
+                    "text_avg_ms", "prepared_avg_ms", "saving_ms", "saving_pct"]
+
+
+def numbered_placeholders(sql):
+    """Zamienia %s na $1, $2, ... (składnia PREPARE w PostgreSQL)"""
+    parts = sql.split("%s")
+    return "".join(f"{part}${i}" for i, part in enumerate(parts[:-1], 1)) + parts[-1]
+
+
+def measure_modes(measure, text_query, prepared_query, keys, prepared_first):
+    """Mierzy oba tryby na tych samych kluczach bez przewagi drugiego w kolejności.
+
+    Nie mierzony przebieg rozgrzewający ładuje bufory (a przy UPDATE zmienia te same wiersze),
+    a prepared_first odwraca kolejność trybów - wywołujący przełącza go co zapytanie.
+    Zwraca (czas tekstowy, czas prepared, histogram prepared).
+    """
+    measure(text_query, keys)
+    if prepared_first:
+        prepared_time, histogram = measure(prepared_query, keys)
+        text_time, _ = measure(text_query, keys)
+    else:
+        text_time, _ = measure(text_query, keys)
+        prepared_time, histogram = measure(prepared_query, keys)
+    return text_time, prepared_time, histogram
+
+
+def log_saving(result_dir, database, operation, entity, count, text_time, prepared_time):
+    """Zapisuje oszczędność na parsowaniu/planowaniu względem protokołu tekstowego"""
+    result_file = os.path.join(result_dir, f"{database}_prepared.csv")
+    file_exists = os.path.isfile(result_file)
+    text_avg = text_time / count * 1000 if count else 0
+    prepared_avg = prepared_time / count * 1000 if count else 0
+    saving = text_avg - prepared_avg
+    saving_pct = saving / text_avg * 100 if text_avg else 0
+    with open(result_file, "a", newline="") as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(PREPARED_COLUMNS)
+        writer.writerow([
+            operation, database, entity, count,
+            round(text_avg, 4), round(prepared_avg, 4), round(saving, 4), round(saving_pct, 2)
+        ])
+    print(f"   {operation} {entity}: {text_avg:.3f} ms -> {prepared_avg:.3f} ms ({saving_pct:+.1f}%)")
@@ -0,0 +1,75 @@
+import csv
+import math
+import os
+import statistics
+from collections import defaultdict
+
+# Domyślnie scenariusz wykonywany jest raz - bez rozgrzewki i powtórzeń
+WARMUP = 0
+REPETITIONS = 0
+
+# Wartości krytyczne rozkładu t-Studenta dla dwustronnego 95% przedziału ufności, df = 1..30
+T_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+STATS_COLUMNS = ["operation", "database", "entity", "run", "runs",
+                 "median_time", "mean_time", "stddev", "ci95_low", "ci95_high"]
+
+
+def summarize(values):
+    """Zwraca (mediana, średnia, odchylenie standardowe, dolna i górna granica 95% CI średniej)"""
+    median = statistics.median(values)
+    mean = statistics.fmean(values)
+    if len(values) < 2:
+        return median, mean, None, None, None
+    stddev = statistics.stdev(values)
+    df = len(values) - 1
+    margin = (T_95[df - 1] if df <= len(T_95) else 1.96) * stddev / math.sqrt(len(values))
+    return median, mean, stddev, mean - margin, mean + margin
+
+
+class Repetitions:
+    """Zbiera avg_time kolejnych przebiegów scenariuszy.
+
+    Pierwszy przebieg fazy jest zimny (i tylko on trafia do pliku <db>_results.csv),
+    przebiegi rozgrzewkowe są odrzucane, a kolejne K przebiegów to pomiary ciepłe.
+    """
+
+    def __init__(self):
+        self.run = "cold"
+        self.times = defaultdict(list)
+
+    @property
+    def is_cold(self):
+        return self.run == "cold"
+
+    def record(self, operation, entity, avg_time):
+        if self.run != "warmup":
+            self.times[(operation, entity, self.run)].append(avg_time)
+
+    def run_phase(self, phase, warmup=WARMUP, repetitions=REPETITIONS):
+        self.run = "cold"
+        phase()
+        self.run = "warmup"
+        for _ in range(warmup):
+            phase()
+        self.run = "warm"
+        for _ in range(repetitions):
+            phase()
+        self.run = "cold"
+
+    def write_stats(self, result_dir, database):
+        """Zapisuje zimne i ciepłe statystyki do <db>_stats.csv (tylko gdy były powtórzenia)"""
+        if any(run == "warm" for _, _, run in self.times):
+            result_file = os.path.join(result_dir, f"{database}_stats.csv")
+            file_exists = os.path.isfile(result_file)
+            with open(result_file, "a", newline="") as f:
+                writer = csv.writer(f)
+                if not file_exists:
+                    writer.writerow(STATS_COLUMNS)
+                for (operation, entity, run), values in self.times.items():
+                    stats = summarize(values)
+                    writer.writerow([operation, database, entity, run, len(values)]
+                                    + ["" if value is None else round(value, 6) for value in stats])
+        self.times.clear()
@@ -36,6 +36,6 @@ fi
 # Instalowanie wymaganych bibliotek
 echo "Instalowanie wymaganych bibliotek..."
 pip install --upgrade pip
-pip install mysql-connector-python psycopg2-binary pymysql redis pymongo faker
+pip install mysql-connector-python psycopg2-binary pymysql redis pymongo faker numpy asyncpg aiomysql motor
 
 echo "Środowisko gotowe. Możesz uruchomić testy!"
@@ -0,0 +1,593 @@
+import itertools
+import os
+import sqlite3
+import harness
+from harness import chunked, get_record_count, sample_values, setup_results_dir
+import latency
+import concurrency
+import commit_policy
+import repetitions
+import plans
+import index_profiles
+from datetime import datetime, timezone
+
+# 📁 Plik bazy SQLite - tworzony od zera dla każdej konfiguracji z macierzy strojenia
+DB_FILE = os.environ.get("BENCH_SQLITE_FILE", "shop.sqlite")
+# Ten sam schemat co w PostgreSQL (SERIAL zamieniany na INTEGER PRIMARY KEY)
+SCHEMA_FILE = "init_postgres.sql"
+# Czas oczekiwania na blokadę pliku bazy (s) - istotny w teście współbieżności
+BUSY_TIMEOUT = 30
+
+# Macierz strojenia: każda kombinacja to osobny przebieg wszystkich scenariuszy
+JOURNAL_MODES = ["delete", "wal"]
+SYNCHRONOUS_LEVELS = ["full", "normal"]
+# mmap_size w MiB (0 - bez mmap) i rozmiar pamięci podręcznej stron w KiB (2000 - domyślny SQLite)
+MMAP_SIZES = [0]
+CACHE_SIZES = [2000]
+
+# Rozmiary paczek kluczy w scenariuszu odczytu wsadowego
+READ_BATCH_SIZES = [10, 100, 1000]
+# Liczba wierszy w jednej instrukcji UPDATE/DELETE wsadowego
+BULK_BATCH_SIZE = 1000
+# Czy zapisywać surowe czasy pojedynczych zapytań do results/records_N/latency/
+LATENCY_DUMP = False
+# Etykieta bieżącej konfiguracji (kolumna database) i plik wyników - ustawiane w run_config
+DATABASE = "sqlite"
+RESULTS_FILE = "sqlite_results.csv"
+# Pragmy bieżącej konfiguracji - ustawiane na każdym połączeniu w connect()
+PRAGMAS = {}
+# Przebiegi faz: do pliku wyników trafia tylko pierwszy (zimny), statystyki powtórzeń do <db>_stats.csv
+REPEATS = repetitions.Repetitions()
+# Polityka zatwierdzania transakcji w fazach po INSERT (ustawiana w run_config)
+COMMITS = commit_policy.CommitPolicy()
+
+# Znaczniki czasu zapisywane jako tekst ISO 8601, jak w plikach CSV
+sqlite3.register_adapter(datetime, datetime.isoformat)
+
+
+def measure_time(func):
+    return harness.measure_time(lambda: (func(), COMMITS.tick()))
+
+
+def measure_each(func, values):
+    return latency.measure_each(COMMITS.wrap(func), values, keep_samples=LATENCY_DUMP)
+
+
+def log_result(result_dir, operation, entity, total_time, count, histogram=None, errors=None):
+    REPEATS.record(operation, entity, total_time / count if count else 0)
+    if REPEATS.is_cold:
+        harness.write_result(result_dir, RESULTS_FILE, DATABASE, operation, entity, total_time, count, histogram,
+                             errors)
+
+
+def config_label(journal_mode, synchronous, mmap_size, cache_size):
+    """Etykieta konfiguracji, np. sqlite_wal_normal_mmap256_cache65536 (mmap w MiB, cache w KiB)"""
+    return f"sqlite_{journal_mode}_{synchronous}_mmap{mmap_size}_cache{cache_size}"
+
+
+def connect():
+    conn = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT)
+    for name, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def reset_database():
+    """Usuwa plik bazy razem z plikami dziennika z poprzedniej konfiguracji"""
+    for suffix in ["", "-journal", "-wal", "-shm"]:
+        if os.path.exists(DB_FILE + suffix):
+            os.remove(DB_FILE + suffix)
+
+
+def create_schema(cursor):
+    with open(SCHEMA_FILE, encoding="utf-8") as f:
+        cursor.executescript(f.read().replace("SERIAL PRIMARY KEY", "INTEGER PRIMARY KEY"))
+
+
+def insert_all(cursor, table, data, columns):
+    placeholders = ", ".join(["?"] * len(columns))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    values = [tuple(row[col] for col in columns) for row in data]
+    cursor.executemany(sql, values)
+
+
+def test_insert(cursor, result_dir, users, products, orders, order_items, reviews):
+    print("📝 INSERT...")
+    tables = [("users", users), ("products", products), ("orders", orders),
+              ("order_items", order_items), ("reviews", reviews)]
+    for table, data in tables:
+        log_result(result_dir, "insert", table,
+                   measure_time(lambda: insert_all(cursor, table, data, data[0].keys())), len(data))
+
+
+def test_read(cursor, result_dir, users, products, orders, reviews, read_keys):
+    print("🔍 READ...")
+    # Ograniczamy liczbę próbek dla dużych zbiorów danych
+    record_count = get_record_count()
+    sample_size = min(record_count // 10, 1000)  # 10% lub max 1000
+
+    u_count = min(len(users) // 10, sample_size)
+    p_count = min(len(products) // 10, sample_size)
+    o_count = min(len(orders) // 10, sample_size)
+    r_count = min(len(reviews) // 10, sample_size)
+
+    # Klucze zapamiętywane w read_keys - test_batched_read pobiera paczkami dokładnie te same
+    read_keys.update({
+        "users": sample_values(users, "email", u_count),
+        "products": sample_values(products, "name", p_count),
+        "products_by_id": sample_values(products, "id", p_count),
+        "orders": sample_values(orders, "user_id", o_count),
+        "reviews": sample_values(reviews, "product_id", r_count),
+    })
+
+    total_time, histogram = measure_each(
+        lambda email: (cursor.execute("SELECT * FROM users WHERE email = ?", (email,)), cursor.fetchall()),
+        read_keys["users"])
+    log_result(result_dir, "read", "users", total_time, u_count, histogram)
+    total_time, histogram = measure_each(
+        lambda name: (cursor.execute("SELECT * FROM products WHERE name = ?", (name,)), cursor.fetchall()),
+        read_keys["products"])
+    log_result(result_dir, "read", "products", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: (cursor.execute("SELECT * FROM products WHERE id = ?", (pid,)), cursor.fetchall()),
+        read_keys["products_by_id"])
+    log_result(result_dir, "read", "products_by_id", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda uid: (cursor.execute("SELECT * FROM orders WHERE user_id = ?", (uid,)), cursor.fetchall()),
+        read_keys["orders"])
+    log_result(result_dir, "read", "orders", total_time, o_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: (cursor.execute("SELECT * FROM reviews WHERE product_id = ?", (pid,)), cursor.fetchall()),
+        read_keys["reviews"])
+    log_result(result_dir, "read", "reviews", total_time, r_count, histogram)
+
+
+def test_batched_read(cursor, result_dir, read_keys, batch_sizes):
+    print("📦 BATCHED READ...")
+    # Te same klucze co w ostatnim przebiegu test_read, pobierane paczkami (IN (...))
+    scenarios = [
+        ("users", "SELECT * FROM users WHERE email IN ({keys})"),
+        ("products", "SELECT * FROM products WHERE name IN ({keys})"),
+        ("products_by_id", "SELECT * FROM products WHERE id IN ({keys})"),
+        ("orders", "SELECT * FROM orders WHERE user_id IN ({keys})"),
+        ("reviews", "SELECT * FROM reviews WHERE product_id IN ({keys})"),
+    ]
+    for entity, sql in scenarios:
+        count = len(read_keys[entity])
+        for batch_size in batch_sizes:
+            total_time, histogram = measure_each(
+                lambda batch: (cursor.execute(sql.format(keys=", ".join(["?"] * len(batch))), batch),
+                               cursor.fetchall()),
+                chunked(read_keys[entity], batch_size))
+            # avg_time liczony na klucz - porównywalny z pojedynczymi odczytami
+            log_result(result_dir, "read", f"{entity}_batch{batch_size}", total_time, count,
+                       errors=histogram.errors)
+
+
+def test_update(cursor, result_dir, users, products, orders, reviews):
+    print("✏️ UPDATE...")
+    # Ograniczamy liczbę próbek dla dużych zbiorów danych
+    record_count = get_record_count()
+    sample_size = min(record_count // 10, 1000)  # 10% lub max 1000
+
+    u_count = min(len(users) // 10, sample_size)
+    p_count = min(len(products) // 10, sample_size)
+    o_count = min(len(orders) // 10, sample_size)
+    r_count = min(len(reviews) // 10, sample_size)
+
+    total_time, histogram = measure_each(
+        lambda email: cursor.execute("UPDATE users SET registration_date = ? WHERE email = ?",
+                                     (datetime.now(timezone.utc), email)),
+        sample_values(users, "email", u_count))
+    log_result(result_dir, "update", "users", total_time, u_count, histogram)
+    total_time, histogram = measure_each(
+        lambda name: cursor.execute("UPDATE products SET stock = stock + 1 WHERE name = ?", (name,)),
+        sample_values(products, "name", p_count))
+    log_result(result_dir, "update", "products", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda pid: cursor.execute("UPDATE products SET stock = stock + 1 WHERE id = ?", (pid,)),
+        sample_values(products, "id", p_count))
+    log_result(result_dir, "update", "products_by_id", total_time, p_count, histogram)
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("UPDATE orders SET status = 'Completed' WHERE id = ?", (oid,)),
+        sample_values(orders, "id", o_count))
+    log_result(result_dir, "update", "orders", total_time, o_count, histogram)
+    total_time, histogram = measure_each(
+        lambda rid: cursor.execute("UPDATE reviews SET rating = 5 WHERE id = ?", (rid,)),
+        sample_values(reviews, "id", r_count))
+    log_result(result_dir, "update", "reviews", total_time, r_count, histogram)
+
+
+def bulk_update_scenarios(users, products, orders, reviews, count_fn):
+    """Scenariusze UPDATE wsadowego: (encja, tabela, klucz, kolumna, przypisanie, klucze, wartość)"""
+    now = datetime.now(timezone.utc)
+    return [
+        ("users", "users", "email", "registration_date", "{value}",
+         sample_values(users, "email", count_fn(users)), now),
+        ("products", "products", "name", "stock", "stock + {value}",
+         sample_values(products, "name", count_fn(products)), 1),
+        ("products_by_id", "products", "id", "stock", "stock + {value}",
+         sample_values(products, "id", count_fn(products)), 1),
+        ("orders", "orders", "id", "status", "{value}",
+         sample_values(orders, "id", count_fn(orders)), "Completed"),
+        ("reviews", "reviews", "id", "rating", "{value}",
+         sample_values(reviews, "id", count_fn(reviews)), 5),
+    ]
+
+
+def bulk_delete_scenarios(users, products, orders, reviews, count_fn):
+    """Scenariusze DELETE wsadowego: (encja, tabela, klucz, klucze)"""
+    return [
+        ("reviews", "reviews", "id", sample_values(reviews, "id", count_fn(reviews))),
+        ("order_items", "order_items", "order_id", sample_values(orders, "id", count_fn(orders))),
+        ("orders", "orders", "id", sample_values(orders, "id", count_fn(orders))),
+        ("products_by_id", "products", "id", sample_values(products, "id", count_fn(products))),
+        ("users", "users", "email", sample_values(users, "email", count_fn(users))),
+    ]
+
+
+def update_case_batch(cursor, table, key, column, assignment, keys, value):
+    """Jeden UPDATE z wyrażeniem CASE dla całej paczki kluczy"""
+    case = f"CASE {key} {' '.join(['WHEN ? THEN ?'] * len(keys))} END"
+    placeholders = ", ".join(["?"] * len(keys))
+    params = [p for k in keys for p in (k, value)] + list(keys)
+    cursor.execute(f"UPDATE {table} SET {column} = {assignment.format(value=case)} "
+                   f"WHERE {key} IN ({placeholders})", params)
+
+
+def test_bulk_update(cursor, result_dir, users, products, orders, reviews, batch_size):
+    print("📦 BULK UPDATE...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 10, 1000)  # jak w test_update
+    scenarios = bulk_update_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 10, sample_size))
+
+    for entity, table, key, column, assignment, keys, value in scenarios:
+        # executemany - ta sama przygotowana instrukcja wykonywana dla każdego wiersza
+        sql = f"UPDATE {table} SET {column} = {assignment.format(value='?')} WHERE {key} = ?"
+        total_time = measure_time(lambda: cursor.executemany(sql, [(value, k) for k in keys]))
+        log_result(result_dir, "update", f"{entity}_executemany", total_time, len(keys))
+
+        # CASE - jedna instrukcja na batch_size wierszy
+        total_time = measure_time(lambda: [
+            update_case_batch(cursor, table, key, column, assignment, batch, value)
+            for batch in chunked(keys, batch_size)])
+        log_result(result_dir, "update", f"{entity}_case", total_time, len(keys))
+
+
+def test_bulk_delete(cursor, result_dir, users, products, orders, reviews, batch_size):
+    print("📦 BULK DELETE...")
+    record_count = get_record_count()
+    sample_size = min(record_count // 20, 500)  # jak w test_delete
+    scenarios = bulk_delete_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 20, sample_size))
+
+    for entity, table, key, keys in scenarios:
+        # executemany - ta sama przygotowana instrukcja wykonywana dla każdego klucza
+        total_time = measure_time(lambda: cursor.executemany(
+            f"DELETE FROM {table} WHERE {key} = ?", [(k,) for k in keys]))
+        log_result(result_dir, "delete", f"{entity}_executemany", total_time, len(keys))
+
+    # Druga próbka, żeby wariant paczkowy nie trafiał w usunięte już wiersze
+    scenarios = bulk_delete_scenarios(users, products, orders, reviews,
+                                      lambda data: min(len(data) // 20, sample_size))
+    for entity, table, key, keys in scenarios:
+        # IN (...) - jedna instrukcja na batch_size kluczy
+        total_time = measure_time(lambda: [
+            cursor.execute(f"DELETE FROM {table} WHERE {key} IN ({', '.join(['?'] * len(batch))})", batch)
+            for batch in chunked(keys, batch_size)])
+        log_result(result_dir, "delete", f"{entity}_in_list", total_time, len(keys))
+
+
+def sweep_client(sql, fetch=False):
+    """Fabryka klientów testu współbieżności - każdy ma własne połączenie w trybie autocommit"""
+    def open_client():
+        conn = connect()
+        conn.isolation_level = None
+        cursor = conn.cursor()
+
+        def operation(value):
+            cursor.execute(sql, (value,))
+            if fetch:
+                cursor.fetchall()
+
+        def close():
+            cursor.close()
+            conn.close()
+
+        return operation, close
+    return open_client
+
+
+def test_concurrency(result_dir, users, products, orders, levels, ops_per_client):
+    print("👥 CONCURRENCY...")
+    # Zapisy w SQLite są szeregowane blokadą pliku - w trybie WAL czytelnicy nie czekają na piszących
+    scenarios = [
+        ("read_users", "SELECT * FROM users WHERE email = ?", True, users, "email"),
+        ("read_products_by_id", "SELECT * FROM products WHERE id = ?", True, products, "id"),
+        ("update_products_by_id", "UPDATE products SET stock = stock + 1 WHERE id = ?", False, products, "id"),
+        ("update_orders", "UPDATE orders SET status = 'Completed' WHERE id = ?", False, orders, "id"),
+    ]
+    for scenario, sql, fetch, data, field in scenarios:
+        concurrency.run_sweep(result_dir, DATABASE, scenario, sweep_client(sql, fetch),
+                              lambda count: sample_values(data, field, count), levels, ops_per_client)
+
+
+def test_delete(cursor, result_dir, users, products, orders, reviews, order_items):
+    print("🗑️ DELETE...")
+    # Ograniczamy liczbę próbek dla dużych zbiorów danych
+    record_count = get_record_count()
+    sample_size = min(record_count // 20, 500)  # 5% lub max 500
+
+    u_count = min(len(users) // 20, sample_size)
+    p_count = min(len(products) // 20, sample_size)
+    o_count = min(len(orders) // 20, sample_size)
+    r_count = min(len(reviews) // 20, sample_size)
+    oi_count = min(len(order_items) // 20, sample_size)
+
+    total_time, histogram = measure_each(
+        lambda rid: cursor.execute("DELETE FROM reviews WHERE id = ?", (rid,)),
+        sample_values(reviews, "id", r_count))
+    log_result(result_dir, "delete", "reviews", total_time, r_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("DELETE FROM order_items WHERE order_id = ?", (oid,)),
+        sample_values(orders, "id", oi_count))
+    log_result(result_dir, "delete", "order_items", total_time, oi_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda oid: cursor.execute("DELETE FROM orders WHERE id = ?", (oid,)),
+        sample_values(orders, "id", o_count))
+    log_result(result_dir, "delete", "orders", total_time, o_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda name: cursor.execute("DELETE FROM products WHERE name = ?", (name,)),
+        sample_values(products, "name", p_count))
+    log_result(result_dir, "delete", "products", total_time, p_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda pid: cursor.execute("DELETE FROM products WHERE id = ?", (pid,)),
+        sample_values(products, "id", p_count))
+    log_result(result_dir, "delete", "products_by_id", total_time, p_count, histogram)
+
+    total_time, histogram = measure_each(
+        lambda email: cursor.execute("DELETE FROM users WHERE email = ?", (email,)),
+        sample_values(users, "email", u_count))
+    log_result(result_dir, "delete", "users", total_time, u_count, histogram)
+
+
+# Zapytania złożone - te same teksty służą do pomiaru czasu i do przechwytywania planów
+COMPLEX_QUERIES = {
+    # 1. Najpopularniejsze produkty
+    "popular_products": '''
+        SELECT p.id, p.name, COUNT(oi.product_id) as order_count
+        FROM products p
+        JOIN order_items oi ON p.id = oi.product_id
+        GROUP BY p.id, p.name
+        ORDER BY order_count DESC
+        LIMIT 10
+    ''',
+    # 2. Średnia ocena produktów
+    "avg_product_rating": '''
+        SELECT p.id, p.name, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
+        FROM products p
+        JOIN reviews r ON p.id = r.product_id
+        GROUP BY p.id, p.name
+        HAVING COUNT(r.id) >= 5
+        ORDER BY avg_rating DESC
+        LIMIT 10
+    ''',
+    # 3. Analiza wartości zamówień klientów
+    "customer_spending": '''
+        SELECT u.id, u.email, SUM(oi.price * oi.quantity) as total_spent
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        JOIN order_items oi ON o.id = oi.order_id
+        GROUP BY u.id, u.email
+        ORDER BY total_spent DESC
+        LIMIT 20
+    ''',
+    # 4. Wyszukiwanie produktów z filtrowaniem (LIKE w SQLite nie rozróżnia wielkości liter ASCII - jak w MySQL)
+    "product_search": '''
+        SELECT p.id, p.name, p.price
+        FROM products p
+        WHERE (p.name LIKE '%laptop%' OR p.description LIKE '%laptop%')
+        AND p.price BETWEEN 100 AND 500
+        AND p.stock > 0
+        ORDER BY p.price ASC
+    ''',
+    # 5. Dashboard sprzedażowy (daty zapisane jako tekst ISO 8601 - porównanie tekstowe)
+    "sales_dashboard": '''
+        SELECT DATE(o.order_date) as date,
+              COUNT(o.id) as order_count,
+              SUM(oi.price * oi.quantity) as revenue
+        FROM orders o
+        JOIN order_items oi ON o.id = oi.order_id
+        WHERE o.order_date >= strftime('%Y-%m-%dT%H:%M:%S', 'now', '-30 days')
+        GROUP BY DATE(o.order_date)
+        ORDER BY date
+    ''',
+    # 6. Rekomendacje produktów
+    "product_recommendations": '''
+        SELECT oi1.product_id, oi2.product_id, COUNT(*) as frequency
+        FROM order_items oi1
+        JOIN order_items oi2 ON oi1.order_id = oi2.order_id AND oi1.product_id < oi2.product_id
+        GROUP BY oi1.product_id, oi2.product_id
+        ORDER BY frequency DESC
+        LIMIT 10
+    ''',
+    # 7. Wyświetla tylko recenzje od użytkowników, którzy kupili dany produkt
+    "join_with_comments": '''
+        SELECT
+            u.id AS user_id,
+            u.email,
+            o.id AS order_id,
+            o.order_date,
+            p.id AS product_id,
+            p.name AS product_name,
+            oi.quantity,
+            oi.price AS item_price,
+            r.rating,
+            r.comment
+        FROM users u
+        JOIN orders o ON u.id = o.user_id
+        JOIN order_items oi ON o.id = oi.order_id
+        JOIN products p ON oi.product_id = p.id
+        INNER JOIN reviews r ON r.product_id = oi.product_id AND r.user_id = o.user_id
+    ''',
+}
+
+
+def test_complex_queries(cursor, result_dir):
+    print("🔍 COMPLEX QUERIES...")
+    for name, sql in COMPLEX_QUERIES.items():
+        log_result(result_dir, "complex", name, measure_time(lambda: [cursor.execute(sql), cursor.fetchall()]), 1)
+
+
+def query_plan_tree(rows):
+    """Wiersze EXPLAIN QUERY PLAN (id, parent, notused, detail) jako drzewo węzłów {"detail", "plans"}"""
+    nodes = {0: {"plans": []}}
+    for node_id, parent, _, detail in rows:
+        nodes[node_id] = {"detail": detail, "plans": []}
+        nodes[parent]["plans"].append(nodes[node_id])
+    return nodes[0]["plans"]
+
+
+def capture_plans(cursor, result_dir):
+    print("🧭 PLANY ZAPYTAŃ...")
+    for name, sql in COMPLEX_QUERIES.items():
+        # EXPLAIN QUERY PLAN podaje tylko strukturę planu - SQLite nie zwraca liczby odczytanych wierszy
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plans.save_plan(result_dir, DATABASE, name, query_plan_tree(cursor.fetchall()), None)
+
+
+def run_config(result_dir, dataset, journal_mode, synchronous, mmap_size, cache_size, concurrency_levels,
+               ops_per_client, read_batch_sizes, bulk_batch_size, index_profile, query_plans, warmup, repeat,
+               commit_mode, commit_every):
+    """Pełny przebieg scenariuszy na świeżej bazie z jedną konfiguracją pragm"""
+    global DATABASE, RESULTS_FILE, PRAGMAS, COMMITS
+    DATABASE = config_label(journal_mode, synchronous, mmap_size, cache_size)
+    RESULTS_FILE = index_profiles.results_file(DATABASE, index_profile)
+    # cache_size ujemne - rozmiar w KiB zamiast liczby stron
+    PRAGMAS = {"journal_mode": journal_mode, "synchronous": synchronous,
+               "mmap_size": mmap_size * 1024 * 1024, "cache_size": -cache_size, "foreign_keys": "ON"}
+    users, products, orders = dataset["users"], dataset["products"], dataset["orders"]
+    order_items, reviews = dataset["order_items"], dataset["reviews"]
+
+    print(f"🔌 Tworzenie bazy SQLite ({DATABASE})...")
+    reset_database()
+    conn = connect()
+    cursor = conn.cursor()
+    active_mode = cursor.execute("PRAGMA journal_mode").fetchone()[0]
+    if active_mode != journal_mode:
+        print(f"⚠️ Tryb dziennika '{journal_mode}' niedostępny - SQLite używa '{active_mode}'")
+    create_schema(cursor)
+    index_profiles.apply_profile(cursor, "sqlite", index_profile)
+    conn.commit()
+
+    test_insert(cursor, result_dir, users, products, orders, order_items, reviews)
+    conn.commit()
+
+    COMMITS = commit_policy.CommitPolicy(commit_mode, commit_every)
+    if commit_mode == "autocommit":
+        # sqlite3 nie ma atrybutu autocommit przed Pythonem 3.12 - odpowiednikiem jest isolation_level=None
+        conn.isolation_level = None
+    else:
+        COMMITS.attach(conn)
+
+    # Fazy niszczące dane (INSERT, DELETE) nie są powtarzane
+    read_keys = {}
+    REPEATS.run_phase(lambda: test_read(cursor, result_dir, users, products, orders, reviews, read_keys), warmup, repeat)
+    REPEATS.run_phase(lambda: test_batched_read(cursor, result_dir, read_keys, read_batch_sizes), warmup, repeat)
+    REPEATS.run_phase(lambda: test_update(cursor, result_dir, users, products, orders, reviews), warmup, repeat)
+    REPEATS.run_phase(lambda: test_bulk_update(cursor, result_dir, users, products, orders, reviews,
+                                               bulk_batch_size), warmup, repeat)
+
+    if concurrency_levels:
+        # Klienci testu współbieżności nie mogą czekać na blokadę otwartej transakcji
+        conn.commit()
+        test_concurrency(result_dir, users, products, orders, concurrency_levels, ops_per_client)
+
+    # Testy złożonych zapytań
+    REPEATS.run_phase(lambda: test_complex_queries(cursor, result_dir), warmup, repeat)
+    if query_plans:
+        capture_plans(cursor, result_dir)
+
+    test_delete(cursor, result_dir, users, products, orders, reviews, order_items)
+    test_bulk_delete(cursor, result_dir, users, products, orders, reviews, bulk_batch_size)
+    conn.commit()
+
+    REPEATS.write_stats(result_dir, DATABASE)
+    cursor.close()
+    conn.close()
+
+
+def main(journal_modes=JOURNAL_MODES, synchronous_levels=SYNCHRONOUS_LEVELS, mmap_sizes=MMAP_SIZES,
+         cache_sizes=CACHE_SIZES, latency_dump=LATENCY_DUMP, concurrency_levels=None,
+         ops_per_client=concurrency.OPS_PER_CLIENT, read_batch_sizes=READ_BATCH_SIZES,
+         bulk_batch_size=BULK_BATCH_SIZE, index_profile="none", query_plans=True,
+         warmup=repetitions.WARMUP, repeat=repetitions.REPETITIONS,
+         commit_mode="single", commit_every=commit_policy.COMMIT_EVERY, dataset=None):
+    global LATENCY_DUMP
+    LATENCY_DUMP = latency_dump
+    result_dir = setup_results_dir()
+
+    if dataset is None:
+        print("🔄 Wczytywanie danych...")
+        dataset = harness.load_dataset()
+
+    # Dane wczytywane raz, baza tworzona od zera dla każdej kombinacji pragm
+    for journal_mode, synchronous, mmap_size, cache_size in itertools.product(
+            journal_modes, synchronous_levels, mmap_sizes, cache_sizes):
+        run_config(result_dir, dataset, journal_mode, synchronous, mmap_size, cache_size, concurrency_levels,
+                   ops_per_client, read_batch_sizes, bulk_batch_size, index_profile, query_plans, warmup, repeat,
+                   commit_mode, commit_every)
+
+    print(f"✅ Testy zakończone. Wyniki zapisane w '{result_dir}'")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Testy wydajności CRUD dla SQLite (macierz strojenia pragm)")
+    parser.add_argument("--journal-modes", nargs="+", default=JOURNAL_MODES,
+                        choices=["delete", "truncate", "persist", "memory", "wal", "off"],
+                        help="Wartości PRAGMA journal_mode w macierzy strojenia")
+    parser.add_argument("--synchronous", nargs="+", default=SYNCHRONOUS_LEVELS,
+                        choices=["off", "normal", "full", "extra"],
+                        help="Wartości PRAGMA synchronous w macierzy strojenia")
+    parser.add_argument("--mmap-sizes", nargs="+", type=int, default=MMAP_SIZES,
+                        help="Wartości PRAGMA mmap_size w MiB (0 - bez mmap)")
+    parser.add_argument("--cache-sizes", nargs="+", type=int, default=CACHE_SIZES,
+                        help="Rozmiary pamięci podręcznej stron (PRAGMA cache_size) w KiB")
+    parser.add_argument("--latency-dump", action="store_true",
+                        help="Zapisz surowe czasy pojedynczych zapytań (ns) dla każdej encji")
+    parser.add_argument("--concurrency", action="store_true",
+                        help="Uruchom test skalowania READ/UPDATE dla wielu równoległych klientów")
+    parser.add_argument("--concurrency-levels", nargs="+", type=int, default=concurrency.CONCURRENCY_LEVELS,
+                        help="Liczby równoległych klientów w teście skalowania")
+    parser.add_argument("--ops-per-client", type=int, default=concurrency.OPS_PER_CLIENT,
+                        help="Liczba zapytań wykonywanych przez każdego klienta")
+    parser.add_argument("--read-batch-sizes", nargs="*", type=int, default=READ_BATCH_SIZES,
+                        help="Rozmiary paczek kluczy w odczycie wsadowym (brak wartości wyłącza scenariusz)")
+    parser.add_argument("--bulk-batch-size", type=int, default=BULK_BATCH_SIZE,
+                        help="Liczba wierszy w jednej instrukcji UPDATE/DELETE wsadowego")
+    parser.add_argument("--index-profile", choices=list(index_profiles.INDEX_PROFILES), default="none",
+                        help="Profil indeksów drugorzędnych (wyniki trafiają do <db>_<profil>_indexes.csv)")
+    parser.add_argument("--skip-plans", action="store_true",
+                        help="Nie zapisuj planów wykonania zapytań złożonych do results/records_N/plans/")
+    parser.add_argument("--warmup", type=int, default=repetitions.WARMUP,
+                        help="Liczba przebiegów rozgrzewkowych (odrzucanych) po pierwszym, zimnym przebiegu")
+    parser.add_argument("--repetitions", type=int, default=repetitions.REPETITIONS,
+                        help="Liczba mierzonych ciepłych powtórzeń faz READ/UPDATE/COMPLEX (statystyki w <db>_stats.csv)")
+    parser.add_argument("--commit-policy", choices=commit_policy.COMMIT_POLICIES, default="single",
+                        help="Zatwierdzanie transakcji po INSERT: jedna transakcja, autocommit lub commit co N operacji")
+    parser.add_argument("--commit-every", type=int, default=commit_policy.COMMIT_EVERY,
+                        help="Liczba operacji między commitami w polityce every_n")
+    args = parser.parse_args()
+
+    with harness.tag_partial_run():
+        main(args.journal_modes, args.synchronous, args.mmap_sizes, args.cache_sizes, args.latency_dump,
+             args.concurrency_levels if args.concurrency else None, args.ops_per_client,
+             args.read_batch_sizes, args.bulk_batch_size, args.index_profile, not args.skip_plans,
+             args.warmup, args.repetitions, args.commit_policy, args.commit_every)